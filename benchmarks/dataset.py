@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# benchmarks/dataset.py
+"""Generate a synthetic workout database for the load benchmarks.
+
+Usage: python -m benchmarks.dataset --workouts 100000 [--exercises 200] [--per-workout 4] [--out bench.db]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import insert
+
+from server.app import create_app
+from server.models import db, Exercise, Workout, WorkoutExercise
+from server.rollups import rebuild_rollups
+
+CATEGORIES = ["Strength", "Cardio", "Mobility", "Flexibility"]
+NOTE_WORDS = ["morning", "evening", "easy", "hard", "tempo", "interval", "recovery",
+              "strength", "cardio", "long", "quick", "upper", "lower", "full", "body"]
+START = date(2020, 1, 1)
+DAYS = 3 * 365
+
+# Rows per executemany; keeps memory flat up to 10M workouts
+CHUNK_SIZE = 20000
+
+
+def _chunked(rows):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def generate(app, workouts, exercises=200, per_workout=4, seed=0):
+    """Bulk insert a deterministic dataset into ``app``'s (empty) database.
+
+    Rows go straight through Core on one connection, so the per-commit
+    session hooks stay out of the way; the rollups are rebuilt once at the
+    end and the FTS triggers index rows as they are inserted.
+    """
+    rng = random.Random(seed)
+    per_workout = min(per_workout, exercises)
+
+    exercise_rows = [
+        {"id": i, "name": f"Exercise {i:05d}", "category": CATEGORIES[i % len(CATEGORIES)],
+         "equipment_needed": i % 3 == 0}
+        for i in range(1, exercises + 1)
+    ]
+
+    def workout_rows():
+        for i in range(1, workouts + 1):
+            yield {
+                "id": i,
+                "date": START + timedelta(days=rng.randrange(DAYS)),
+                "duration_minutes": rng.randint(10, 120),
+                "notes": " ".join(rng.sample(NOTE_WORDS, 3)) + f" session {i}",
+            }
+
+    def link_rows():
+        link_id = 0
+        for workout_id in range(1, workouts + 1):
+            for exercise_id in rng.sample(range(1, exercises + 1), per_workout):
+                link_id += 1
+                if exercise_id % len(CATEGORIES) == 1:      # Cardio: timed
+                    yield {"id": link_id, "workout_id": workout_id, "exercise_id": exercise_id,
+                           "reps": None, "sets": None, "duration_seconds": rng.randint(300, 3600)}
+                else:
+                    yield {"id": link_id, "workout_id": workout_id, "exercise_id": exercise_id,
+                           "reps": rng.randint(5, 20), "sets": rng.randint(1, 5), "duration_seconds": None}
+
+    with app.app_context():
+        db.create_all()
+        with db.engine.begin() as conn:
+            conn.execute(insert(Exercise.__table__), exercise_rows)
+            for chunk in _chunked(workout_rows()):
+                conn.execute(insert(Workout.__table__), chunk)
+            for chunk in _chunked(link_rows()):
+                conn.execute(insert(WorkoutExercise.__table__), chunk)
+        if app.config["ROLLUPS_ENABLED"]:
+            rebuild_rollups(db.session)
+            db.session.commit()
+    return {"workouts": workouts, "exercises": exercises, "workout_exercises": workouts * per_workout}
+
+
+def bench_app(path, **config):
+    """App bound to the SQLite file at ``path``."""
+    return create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.abspath(path)}", **config})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workouts", type=int, default=10000)
+    parser.add_argument("--exercises", type=int, default=200)
+    parser.add_argument("--per-workout", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=os.path.join(tempfile.mkdtemp(), "bench.db"))
+    args = parser.parse_args()
+
+    if os.path.exists(args.out):
+        parser.error(f"{args.out} already exists")
+    started = time.perf_counter()
+    counts = generate(bench_app(args.out), args.workouts, args.exercises, args.per_workout, args.seed)
+    elapsed = time.perf_counter() - started
+    print(", ".join(f"{v} {k}" for k, v in counts.items()) + f" in {elapsed:.1f}s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
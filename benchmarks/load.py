@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# benchmarks/load.py
+"""Drive every API route with concurrent clients and check for regressions.
+
+Usage: python -m benchmarks.load [--workouts 10000] [--requests 200] [--concurrency 8]
+                                 [--runs 3] [--db bench.db] [--baseline benchmarks/baseline.json]
+                                 [--save-baseline] [--tolerance 0.25]
+
+Each route is loaded in its own phase against an in-process threaded
+server on a generated dataset, and the whole sequence is repeated
+--runs times; each figure is the median across the runs.  p50/p95/p99
+latency, throughput and SQL statements per request are compared with the stored baseline; a slower
+p95 (beyond --tolerance), any extra statements per request or any
+response other than the phase's expected status exits 1, and so does a
+route the baseline has no entry for.  Write routes queue on the
+SQLite write lock, which makes their tail too noisy to gate on, so they
+are held to their median instead.
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import event
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from benchmarks.dataset import bench_app, generate
+from server.models import db
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+# -----------------------
+# SCENARIOS
+# -----------------------
+class Context:
+    """Dataset shape plus ids created by earlier phases."""
+
+    def __init__(self, workouts, exercises):
+        self.workouts = workouts
+        self.exercises = exercises
+        self.created = {"exercises": [], "workouts": [], "batch_workouts": []}
+        self.rng = random.Random(1)
+        self.counter = itertools.count(1)
+        # Created names must not collide with an earlier run's on the same database
+        self.prefix = uuid.uuid4().hex[:8]
+
+    def name(self, kind):
+        return f"Bench {kind} {self.prefix}-{next(self.counter)}"
+
+    def workout_id(self):
+        return self.rng.randint(1, self.workouts)
+
+    def exercise_id(self):
+        return self.rng.randint(1, self.exercises)
+
+
+def _pop(ctx, kind):
+    return ctx.created[kind].pop() if ctx.created[kind] else 0
+
+
+def _created_ids(body):
+    if "created" in body:
+        return [row["id"] for row in body["created"]]
+    return [body["id"]]
+
+
+# (name, endpoint, method, build(ctx) -> (path, json body), list to collect created ids into)
+# Phases run in this order; later ones consume ids the POST phases created,
+# so every link and delete targets a fresh row.
+SCENARIOS = [
+    ("landing", "landing_page", "GET", lambda ctx: ("/", None), None),
+    ("exercises page", "get_exercises", "GET", lambda ctx: ("/exercises?limit=50", None), None),
+    ("exercises filtered", "get_exercises", "GET",
+     lambda ctx: ("/exercises?category=Cardio&limit=50", None), None),
+    ("exercise detail", "get_exercise", "GET", lambda ctx: (f"/exercises/{ctx.exercise_id()}", None), None),
+    ("workouts page", "get_workouts", "GET", lambda ctx: ("/workouts?limit=100", None), None),
+    ("workouts by date", "get_workouts", "GET",
+     lambda ctx: ("/workouts?order=date&date_from=2021-01-01&limit=100", None), None),
+    ("workouts stream", "get_workouts", "GET",
+     lambda ctx: ("/workouts?stream=1&date_from=2022-12-01", None), None),
+    ("workout detail", "get_workout", "GET", lambda ctx: (f"/workouts/{ctx.workout_id()}", None), None),
+    ("search", "get_search", "GET", lambda ctx: ("/search?q=tempo%20interval&limit=20", None), None),
+    ("export", "export_workouts", "GET",
+     lambda ctx: (f"/export/workouts?since_id={max(ctx.workouts - 500, 0)}", None), None),
+    ("stats volume", "get_weekly_volume", "GET", lambda ctx: ("/stats/volume", None), None),
+    ("stats categories", "get_category_totals", "GET", lambda ctx: ("/stats/categories", None), None),
+    ("stats top", "get_top_exercises", "GET", lambda ctx: ("/stats/top-exercises", None), None),
+    ("stats records", "get_personal_records", "GET", lambda ctx: ("/stats/records", None), None),
+    ("create exercise", "create_exercise", "POST",
+     lambda ctx: ("/exercises", {"name": ctx.name("Exercise"), "category": "Strength"}),
+     "exercises"),
+    ("create workout", "create_workout", "POST",
+     lambda ctx: ("/workouts", {"date": "2023-06-01", "duration_minutes": 30, "notes": "bench"}),
+     "workouts"),
+    ("add exercise", "add_exercise_to_workout", "POST",
+     lambda ctx: (f"/workouts/{_pop(ctx, 'workouts')}/exercises/{ctx.exercise_id()}/workout_exercises",
+                  {"reps": 10, "sets": 3, "duration_seconds": 0}), None),
+    # Unknown ids with write-behind off; measures the lookup path
+    ("write status", "get_write_status", "GET", lambda ctx: (f"/writes/{next(ctx.counter):032x}", None), None),
+    ("batch exercises", "create_exercises_batch", "POST",
+     lambda ctx: ("/exercises:batch", [{"name": ctx.name("Batch"), "category": "Cardio"}
+                                       for _ in range(20)]), "exercises"),
+    ("batch workouts", "create_workouts_batch", "POST",
+     lambda ctx: ("/workouts:batch", [{"date": "2023-07-01", "duration_minutes": 20}] * 20),
+     "batch_workouts"),
+    ("batch add exercises", "add_exercises_to_workout_batch", "POST",
+     lambda ctx: (f"/workouts/{_pop(ctx, 'batch_workouts')}/workout_exercises:batch",
+                  [{"exercise_id": e, "reps": 8, "sets": 2, "duration_seconds": 0} for e in range(1, 6)]),
+     None),
+    ("delete workout", "delete_workout", "DELETE",
+     lambda ctx: (f"/workouts/{_pop(ctx, 'batch_workouts')}", None), None),
+    ("bulk delete workouts", "delete_workouts_bulk", "DELETE",
+     lambda ctx: ("/workouts?ids=" + ",".join(str(_pop(ctx, 'batch_workouts')) for _ in range(5)), None), None),
+    ("delete exercise", "delete_exercise", "DELETE",
+     lambda ctx: (f"/exercises/{_pop(ctx, 'exercises')}", None), None),
+]
+
+
+# Every request of a phase must get this status; anything else is an error
+OK_STATUS = {"GET": 200, "POST": 201, "DELETE": 200}
+EXPECTED_STATUS = {"write status": 404}
+
+# Compared on p50: their p95 swings with lock contention from run to run
+WRITE_ROUTES = {name for name, _, method, _, _ in SCENARIOS if method != "GET"}
+
+
+def uncovered_endpoints(app):
+    """Endpoints in ``app.url_map`` that no scenario exercises."""
+    covered = {endpoint for _, endpoint, _, _, _ in SCENARIOS}
+    return sorted({rule.endpoint for rule in app.url_map.iter_rules()} - covered - {"static"})
+
+
+# -----------------------
+# SERVER
+# -----------------------
+class KeepAliveHandler(WSGIRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def instrument(app):
+    """Report the SQL statements each request ran in an X-Query-Count header."""
+    local = threading.local()
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(*args):
+        local.count = getattr(local, "count", 0) + 1
+
+    @app.before_request
+    def reset():
+        local.count = 0
+
+    @app.after_request
+    def report(resp):
+        # Streamed bodies run their queries after this point
+        resp.headers["X-Query-Count"] = str(getattr(local, "count", 0))
+        return resp
+
+
+def serve(app):
+    server = make_server("127.0.0.1", 0, app, threaded=True, request_handler=KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# -----------------------
+# LOAD GENERATOR
+# -----------------------
+def run_phase(port, method, requests, concurrency):
+    """Send ``requests`` (path, body) pairs; returns per-request stats."""
+    local = threading.local()
+
+    def send(request):
+        path, body = request
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = local.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        payload = None if body is None else json.dumps(body)
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        started = time.perf_counter()
+        conn.request(method, path, body=payload, headers=headers)
+        resp = conn.getresponse()
+        data = resp.read()
+        elapsed = time.perf_counter() - started
+        if resp.getheader("Connection", "").lower() == "close":
+            conn.close()
+            local.conn = None
+        return elapsed, resp.status, int(resp.getheader("X-Query-Count") or 0), data
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(send, requests))
+    return results, time.perf_counter() - started
+
+
+def summarize(results, wall, expected):
+    latencies = sorted(r[0] for r in results)
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": len(results),
+        "errors": sum(1 for r in results if r[1] != expected),
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p95_ms": round(cuts[94] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+        "rps": round(len(results) / wall, 1),
+        "queries": round(statistics.fmean(r[2] for r in results), 2),
+    }
+
+
+def run(app, workouts, exercises, requests, concurrency, runs=1):
+    instrument(app)
+    server = serve(app)
+    reports = []
+    try:
+        for _ in range(runs):
+            ctx = Context(workouts, exercises)
+            report = {}
+            for name, _, method, build, collect in SCENARIOS:
+                if method == "GET":
+                    # Untimed round so lazy setup and cold pages don't skew p95
+                    run_phase(server.server_port, method, [build(ctx) for _ in range(concurrency)], concurrency)
+                batch = [build(ctx) for _ in range(requests)]
+                results, wall = run_phase(server.server_port, method, batch, concurrency)
+                if collect:
+                    for r in results:
+                        if r[1] in (201, 207):
+                            ctx.created[collect] += _created_ids(json.loads(r[3]))
+                report[name] = summarize(results, wall, EXPECTED_STATUS.get(name, OK_STATUS[method]))
+            reports.append(report)
+    finally:
+        server.shutdown()
+    return combine(reports)
+
+
+def combine(reports):
+    """Per-route median of each figure across runs; errors are summed."""
+    combined = {}
+    for name in reports[0]:
+        runs = [report[name] for report in reports]
+        combined[name] = {key: statistics.median(r[key] for r in runs) for key in runs[0]}
+        combined[name]["requests"] = sum(r["requests"] for r in runs)
+        combined[name]["errors"] = sum(r["errors"] for r in runs)
+    return combined
+
+
+# -----------------------
+# BASELINE
+# -----------------------
+def regressions(report, baseline, tolerance):
+    problems = []
+    for name, current in report.items():
+        base = baseline.get(name)
+        if base is None:
+            problems.append(f"{name}: not in the baseline; rerun with --save-baseline")
+            continue
+        if current["errors"] > base["errors"]:
+            problems.append(f"{name}: {current['errors']} unexpected responses (baseline {base['errors']})")
+        cut = "p50" if name in WRITE_ROUTES else "p95"
+        if current[f"{cut}_ms"] > base[f"{cut}_ms"] * (1 + tolerance):
+            problems.append(f"{name}: {cut} {current[f'{cut}_ms']:.2f}ms vs baseline {base[f'{cut}_ms']:.2f}ms")
+        if current["queries"] > base["queries"] + 0.05:
+            problems.append(f"{name}: {current['queries']} queries/request vs baseline {base['queries']}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workouts", type=int, default=10000)
+    parser.add_argument("--exercises", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--db", help="reuse a dataset made by benchmarks.dataset")
+    parser.add_argument("--profile", default="production")
+    parser.add_argument("--no-cache", action="store_true", help="disable the response cache")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    config = {"DB_PROFILE": args.profile, "CACHE_ENABLED": not args.no_cache}
+    if args.db:
+        app = bench_app(args.db, **config)
+    else:
+        app = bench_app(os.path.join(tempfile.mkdtemp(), "bench.db"), **config)
+        generate(app, args.workouts, args.exercises)
+
+    missing = uncovered_endpoints(app)
+    if missing:
+        sys.exit(f"No load scenario for: {', '.join(missing)}")
+
+    report = run(app, args.workouts, args.exercises, args.requests, args.concurrency, args.runs)
+    print(f"{'route':<22} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} {'queries':>8} {'errors':>6}")
+    for name, r in report.items():
+        print(f"{name:<22} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} "
+              f"{r['rps']:>8.0f} {r['queries']:>8.2f} {r['errors']:>6}")
+
+    settings = {k: getattr(args, k) for k in ("workouts", "exercises", "requests", "concurrency", "runs", "profile", "no_cache")}
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"settings": settings, "routes": report}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against; rerun with --save-baseline to record one.")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline["settings"] != settings:
+        sys.exit(f"Baseline was recorded with {baseline['settings']}, not {settings}")
+    problems = regressions(report, baseline["routes"], args.tolerance)
+    if problems:
+        print("\nREGRESSIONS:")
+        for problem in problems:
+            print("  " + problem)
+        sys.exit(1)
+    print("\nNo regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# benchmarks/serializers.py
+"""Time marshmallow + stdlib JSON against compiled dumps + orjson.
+
+Usage: python -m benchmarks.serializers [--workouts 2000] [--exercises 8] [--repeat 5]
+"""
+import argparse
+import timeit
+from datetime import date, timedelta
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from server.models import Exercise, Workout, WorkoutExercise
+from server.schemas import ExerciseSchema, WorkoutSchema, WorkoutExerciseSchema
+from server.serializers import CompiledSchema, FastJSONProvider
+
+
+def build(n_workouts, per_workout):
+    catalog = [Exercise(id=i, name=f"Exercise {i}", category="Strength", equipment_needed=i % 2 == 0)
+               for i in range(1, 51)]
+    workouts = []
+    for i in range(1, n_workouts + 1):
+        w = Workout(id=i, date=date(2024, 1, 1) + timedelta(days=i % 365),
+                    duration_minutes=30 + i % 60, notes=f"Session {i}")
+        w.exercises = catalog[i % 40: i % 40 + per_workout]
+        workouts.append(w)
+    links = [WorkoutExercise(id=i, workout_id=w.id, exercise_id=e.id, reps=10, sets=3,
+                             duration_seconds=None, workout=w, exercise=e)
+             for i, (w, e) in enumerate(((w, e) for w in workouts[:500] for e in w.exercises), 1)]
+    return catalog, workouts, links
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workouts", type=int, default=2000)
+    parser.add_argument("--exercises", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    slow_json, fast_json = DefaultJSONProvider(app), FastJSONProvider(app)
+    catalog, workouts, links = build(args.workouts, args.exercises)
+    cases = [
+        ("GET /exercises", ExerciseSchema(many=True), catalog),
+        ("GET /workouts", WorkoutSchema(many=True), workouts),
+        ("workout_exercises", WorkoutExerciseSchema(many=True), links),
+    ]
+
+    print(f"{'payload':<20} {'marshmallow ms':>15} {'compiled ms':>12} {'speedup':>8}")
+    for label, schema, rows in cases:
+        fast_schema = CompiledSchema(schema)
+        assert fast_json.response(fast_schema.dump(rows)).data == slow_json.response(schema.dump(rows)).data
+        with app.app_context():
+            slow = min(timeit.repeat(lambda: slow_json.response(schema.dump(rows)), number=1, repeat=args.repeat))
+            fast = min(timeit.repeat(lambda: fast_json.response(fast_schema.dump(rows)), number=1, repeat=args.repeat))
+        print(f"{label:<20} {slow * 1000:>15.2f} {fast * 1000:>12.2f} {slow / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
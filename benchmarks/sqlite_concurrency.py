@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# benchmarks/sqlite_concurrency.py
+"""Compare read/write throughput of the development and production DB profiles.
+
+Usage: python -m benchmarks.sqlite_concurrency [--readers 8] [--writers 2] [--seconds 5]
+"""
+import argparse
+import tempfile
+import threading
+import time
+from datetime import date
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import OperationalError
+
+from server.app import create_app
+from server.models import db, Workout
+
+
+def run(profile, readers, writers, seconds, rows):
+    path = tempfile.mkdtemp()
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}/bench.db",
+        "DB_PROFILE": profile,
+    })
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(Workout), [
+            {"date": date(2025, 1, 1 + i % 28), "duration_minutes": 30} for i in range(rows)
+        ])
+        db.session.commit()
+        engine = db.engine
+
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def reader():
+        done = 0
+        with engine.connect() as conn:
+            while time.perf_counter() < deadline:
+                conn.execute(select(Workout).where(Workout.date >= date(2025, 1, 20)).limit(50)).all()
+                conn.rollback()
+                done += 1
+        with lock:
+            counts["reads"] += done
+
+    def writer():
+        done = errors = 0
+        while time.perf_counter() < deadline:
+            try:
+                with engine.begin() as conn:
+                    conn.execute(insert(Workout).values(date=date(2025, 2, 1), duration_minutes=45))
+                done += 1
+            except OperationalError:
+                errors += 1
+        with lock:
+            counts["writes"] += done
+            counts["errors"] += errors
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    engine.dispose()
+    return {k: v / seconds for k, v in counts.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'profile':<12} {'reads/s':>10} {'writes/s':>10} {'locked/s':>10}")
+    for profile in ("development", "production"):
+        result = run(profile, args.readers, args.writers, args.seconds, args.rows)
+        print(f"{profile:<12} {result['reads']:>10.0f} {result['writes']:>10.0f} {result['errors']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# conftest.py
+from contextlib import contextmanager
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+from server.app import create_app
+from server.models import db, Exercise, Workout, WorkoutExercise
+
+
+def seed(session):
+    """Load the same fixture data as server/seed.py."""
+    exercises = [
+        Exercise(name="Push Up", category="Strength", equipment_needed=False),
+        Exercise(name="Squat", category="Strength", equipment_needed=False),
+        Exercise(name="Plank", category="Strength", equipment_needed=False),
+        Exercise(name="Running", category="Cardio", equipment_needed=False),
+        Exercise(name="Dumbbell Curl", category="Strength", equipment_needed=True),
+    ]
+    workouts = [
+        Workout(date=date(2025, 11, 22), duration_minutes=45, notes="Morning strength training"),
+        Workout(date=date(2025, 11, 23), duration_minutes=30, notes="Quick cardio session"),
+    ]
+    session.add_all(exercises + workouts)
+    session.flush()
+    session.add_all([
+        WorkoutExercise(workout_id=workouts[0].id, exercise_id=exercises[0].id, reps=15, sets=3),
+        WorkoutExercise(workout_id=workouts[0].id, exercise_id=exercises[1].id, reps=20, sets=3),
+        WorkoutExercise(workout_id=workouts[1].id, exercise_id=exercises[3].id, duration_seconds=1200),
+    ])
+    session.commit()
+
+
+@pytest.fixture
+def app(tmp_path):
+    """App bound to a throwaway, seeded SQLite file."""
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'test.db'}",
+    })
+    with app.app_context():
+        db.create_all()
+        seed(db.session)
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def count_queries(app):
+    """Context manager collecting every SQL statement run inside it."""
+    @contextmanager
+    def counter():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+    return counter
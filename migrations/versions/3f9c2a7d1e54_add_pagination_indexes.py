@@ -0,0 +1,27 @@
+"""Add keyset pagination indexes
+
+Revision ID: 3f9c2a7d1e54
+Revises: b68586041cc7
+Create Date: 2026-10-18 09:12:03.412871
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2a7d1e54'
+down_revision = 'b68586041cc7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_exercises_category_id', 'exercises', ['category', 'id'], unique=False)
+    op.create_index('ix_exercises_equipment_needed_id', 'exercises', ['equipment_needed', 'id'], unique=False)
+    op.create_index('ix_workouts_date_id', 'workouts', ['date', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_workouts_date_id', table_name='workouts')
+    op.drop_index('ix_exercises_equipment_needed_id', table_name='exercises')
+    op.drop_index('ix_exercises_category_id', table_name='exercises')
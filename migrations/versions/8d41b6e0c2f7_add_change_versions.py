@@ -0,0 +1,29 @@
+"""Add change_versions table
+
+Revision ID: 8d41b6e0c2f7
+Revises: 3f9c2a7d1e54
+Create Date: 2026-10-18 11:02:37.905114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d41b6e0c2f7'
+down_revision = '3f9c2a7d1e54'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('change_versions',
+    sa.Column('tag', sa.String(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('tag')
+    )
+
+
+def downgrade():
+    op.drop_table('change_versions')
@@ -0,0 +1,30 @@
+"""Add import_checkpoints table
+
+Revision ID: a3d7e1f05b28
+Revises: f29b7d4c8a16
+Create Date: 2026-10-18 17:21:44.610239
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3d7e1f05b28'
+down_revision = 'f29b7d4c8a16'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('import_checkpoints',
+    sa.Column('job', sa.String(), nullable=False),
+    sa.Column('records', sa.Integer(), nullable=False),
+    sa.Column('completed', sa.Boolean(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('job')
+    )
+
+
+def downgrade():
+    op.drop_table('import_checkpoints')
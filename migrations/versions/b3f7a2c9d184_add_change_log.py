@@ -0,0 +1,32 @@
+"""Add change_log table
+
+Revision ID: b3f7a2c9d184
+Revises: e9c4a7b3f215
+Create Date: 2026-10-18 22:41:09.518327
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3f7a2c9d184'
+down_revision = 'e9c4a7b3f215'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('change_log',
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('tags', sa.Text(), nullable=False),
+    sa.Column('origin', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('seq')
+    )
+    op.create_index('ix_change_log_created_at', 'change_log', ['created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_change_log_created_at', table_name='change_log')
+    op.drop_table('change_log')
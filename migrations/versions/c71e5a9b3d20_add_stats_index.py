@@ -0,0 +1,23 @@
+"""Add workout_exercises index for stats
+
+Revision ID: c71e5a9b3d20
+Revises: 8d41b6e0c2f7
+Create Date: 2026-10-18 13:26:51.230448
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c71e5a9b3d20'
+down_revision = '8d41b6e0c2f7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_workout_exercises_exercise_id_workout_id', 'workout_exercises', ['exercise_id', 'workout_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_workout_exercises_exercise_id_workout_id', table_name='workout_exercises')
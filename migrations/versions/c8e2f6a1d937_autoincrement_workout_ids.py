@@ -0,0 +1,68 @@
+"""Never reuse workout or entry ids
+
+Revision ID: c8e2f6a1d937
+Revises: b3f7a2c9d184
+Create Date: 2026-10-19 09:14:52.306118
+
+A plain INTEGER PRIMARY KEY hands out max(id) + 1, so deleting the newest
+workout let the next insert take its id, which could belong to an archived
+workout or one already exported.  AUTOINCREMENT never reuses an id.  Other
+databases' sequences already behave this way.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8e2f6a1d937'
+down_revision = 'b3f7a2c9d184'
+branch_labels = None
+depends_on = None
+
+# (table, archive table holding ids it handed out earlier)
+TABLES = (
+    ('workouts', 'workouts_archive'),
+    ('workout_exercises', 'workout_exercises_archive'),
+)
+
+# Rebuilding workouts drops its search triggers (see f29b7d4c8a16)
+FTS_TRIGGERS = (
+    "CREATE TRIGGER workouts_fts_ai AFTER INSERT ON workouts BEGIN "
+    "INSERT INTO workouts_fts(rowid, notes) VALUES (new.id, new.notes); END",
+    "CREATE TRIGGER workouts_fts_ad AFTER DELETE ON workouts BEGIN "
+    "INSERT INTO workouts_fts(workouts_fts, rowid, notes) VALUES ('delete', old.id, old.notes); END",
+    "CREATE TRIGGER workouts_fts_au AFTER UPDATE OF notes ON workouts BEGIN "
+    "INSERT INTO workouts_fts(workouts_fts, rowid, notes) VALUES ('delete', old.id, old.notes); "
+    "INSERT INTO workouts_fts(rowid, notes) VALUES (new.id, new.notes); END",
+)
+
+
+def _rebuild(autoincrement):
+    for table, _ in TABLES:
+        with op.batch_alter_table(table, recreate='always',
+                                  table_kwargs={'sqlite_autoincrement': autoincrement}):
+            pass
+    for statement in FTS_TRIGGERS:
+        op.execute(statement)
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _rebuild(True)
+    # Start past every id handed out so far, archived ones included
+    for table, archive in TABLES:
+        op.execute(
+            f"INSERT INTO sqlite_sequence(name, seq) SELECT '{table}', 0 "
+            f"WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = '{table}')"
+        )
+        op.execute(
+            f"UPDATE sqlite_sequence SET seq = max(seq, "
+            f"(SELECT coalesce(max(id), 0) FROM {table}), (SELECT coalesce(max(id), 0) FROM {archive})) "
+            f"WHERE name = '{table}'"
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _rebuild(False)
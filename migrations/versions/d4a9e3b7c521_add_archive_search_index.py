@@ -0,0 +1,51 @@
+"""Add an FTS5 search index over archived workout notes
+
+Revision ID: d4a9e3b7c521
+Revises: c8e2f6a1d937
+Create Date: 2026-10-19 10:02:18.447631
+
+Archiving deletes rows from workouts, whose trigger drops them from
+workouts_fts; this index picks them up on the archive side.  SQLite only,
+like f29b7d4c8a16.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a9e3b7c521'
+down_revision = 'c8e2f6a1d937'
+branch_labels = None
+depends_on = None
+
+FTS, SOURCE, COL = 'workouts_archive_fts', 'workouts_archive', 'notes'
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute(
+        f"CREATE VIRTUAL TABLE {FTS} USING fts5({COL}, content='{SOURCE}', content_rowid='id', tokenize='trigram')"
+    )
+    op.execute(
+        f"CREATE TRIGGER {FTS}_ai AFTER INSERT ON {SOURCE} BEGIN "
+        f"INSERT INTO {FTS}(rowid, {COL}) VALUES (new.id, new.{COL}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER {FTS}_ad AFTER DELETE ON {SOURCE} BEGIN "
+        f"INSERT INTO {FTS}({FTS}, rowid, {COL}) VALUES ('delete', old.id, old.{COL}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER {FTS}_au AFTER UPDATE OF {COL} ON {SOURCE} BEGIN "
+        f"INSERT INTO {FTS}({FTS}, rowid, {COL}) VALUES ('delete', old.id, old.{COL}); "
+        f"INSERT INTO {FTS}(rowid, {COL}) VALUES (new.id, new.{COL}); END"
+    )
+    # Index workouts archived before this revision
+    op.execute(f"INSERT INTO {FTS}({FTS}) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for suffix in ('ai', 'ad', 'au'):
+        op.execute(f"DROP TRIGGER IF EXISTS {FTS}_{suffix}")
+    op.execute(f"DROP TABLE IF EXISTS {FTS}")
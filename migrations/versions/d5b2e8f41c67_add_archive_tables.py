@@ -0,0 +1,48 @@
+"""Add workouts_archive and workout_exercises_archive tables
+
+Revision ID: d5b2e8f41c67
+Revises: a3d7e1f05b28
+Create Date: 2026-10-18 19:02:13.508114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5b2e8f41c67'
+down_revision = 'a3d7e1f05b28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('workouts_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('duration_minutes', sa.Integer(), nullable=False),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_workouts_archive_date_id', 'workouts_archive', ['date', 'id'], unique=False)
+    op.create_table('workout_exercises_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('workout_id', sa.Integer(), nullable=False),
+    sa.Column('exercise_id', sa.Integer(), nullable=False),
+    sa.Column('reps', sa.Integer(), nullable=True),
+    sa.Column('sets', sa.Integer(), nullable=True),
+    sa.Column('duration_seconds', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['exercise_id'], ['exercises.id'], ),
+    sa.ForeignKeyConstraint(['workout_id'], ['workouts_archive.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_workout_exercises_archive_workout_id', 'workout_exercises_archive', ['workout_id'], unique=False)
+    op.create_index('ix_workout_exercises_archive_exercise_id_workout_id', 'workout_exercises_archive', ['exercise_id', 'workout_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_workout_exercises_archive_exercise_id_workout_id', table_name='workout_exercises_archive')
+    op.drop_index('ix_workout_exercises_archive_workout_id', table_name='workout_exercises_archive')
+    op.drop_table('workout_exercises_archive')
+    op.drop_index('ix_workouts_archive_date_id', table_name='workouts_archive')
+    op.drop_table('workouts_archive')
@@ -0,0 +1,111 @@
+"""Add stats rollup tables
+
+Revision ID: e4a8c0d6b912
+Revises: c71e5a9b3d20
+Create Date: 2026-10-18 14:48:09.517302
+
+Rollups are on by default, so the rows that already exist are rolled up
+here too; server/rollups.py keeps the tables current from then on.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4a8c0d6b912'
+down_revision = 'c71e5a9b3d20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    daily = op.create_table('rollup_daily_volume',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('workouts', sa.Integer(), nullable=False),
+    sa.Column('duration_minutes', sa.Integer(), nullable=False),
+    sa.Column('entries', sa.Integer(), nullable=False),
+    sa.Column('sets', sa.Integer(), nullable=False),
+    sa.Column('volume', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+    weekly = op.create_table('rollup_weekly_volume',
+    sa.Column('week_start', sa.Date(), nullable=False),
+    sa.Column('workouts', sa.Integer(), nullable=False),
+    sa.Column('duration_minutes', sa.Integer(), nullable=False),
+    sa.Column('entries', sa.Integer(), nullable=False),
+    sa.Column('sets', sa.Integer(), nullable=False),
+    sa.Column('volume', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('week_start')
+    )
+    category = op.create_table('rollup_category_daily_volume',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('workouts', sa.Integer(), nullable=False),
+    sa.Column('entries', sa.Integer(), nullable=False),
+    sa.Column('duration_seconds', sa.Integer(), nullable=False),
+    sa.Column('volume', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'category')
+    )
+    backfill(daily, weekly, category)
+
+
+# The source tables as of this revision
+workouts = sa.table('workouts', sa.column('id'), sa.column('date', sa.Date), sa.column('duration_minutes'))
+entries = sa.table('workout_exercises', sa.column('id'), sa.column('workout_id'), sa.column('exercise_id'),
+                   sa.column('reps'), sa.column('sets'), sa.column('duration_seconds'))
+exercises = sa.table('exercises', sa.column('id'), sa.column('category'))
+
+
+def week_start(column):
+    # Monday of column's week, as server/stats.py computes it
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        return sa.func.date(column, 'weekday 0', '-6 days', type_=sa.Date)
+    if dialect == 'postgresql':
+        return sa.cast(sa.func.date_trunc('week', column), sa.Date)
+    return sa.func.subdate(column, sa.func.weekday(column), type_=sa.Date)
+
+
+def backfill(daily, weekly, category):
+    volume = sa.func.coalesce(entries.c.sets, 0) * sa.func.coalesce(entries.c.reps, 0)
+    with_workout = entries.join(workouts, workouts.c.id == entries.c.workout_id)
+
+    per_day = (
+        sa.select(workouts.c.date.label('day'), sa.func.count(workouts.c.id).label('workouts'),
+                  sa.func.sum(workouts.c.duration_minutes).label('duration_minutes'))
+        .group_by(workouts.c.date).subquery()
+    )
+    entries_per_day = (
+        sa.select(workouts.c.date.label('day'), sa.func.count(entries.c.id).label('entries'),
+                  sa.func.sum(sa.func.coalesce(entries.c.sets, 0)).label('sets'),
+                  sa.func.sum(volume).label('volume'))
+        .select_from(with_workout).group_by(workouts.c.date).subquery()
+    )
+    op.execute(daily.insert().from_select(
+        ['day', 'workouts', 'duration_minutes', 'entries', 'sets', 'volume'],
+        sa.select(per_day.c.day, per_day.c.workouts, per_day.c.duration_minutes,
+                  *(sa.func.coalesce(entries_per_day.c[field], 0) for field in ('entries', 'sets', 'volume')))
+        .select_from(per_day.outerjoin(entries_per_day, entries_per_day.c.day == per_day.c.day))
+    ))
+
+    week = week_start(daily.c.day)
+    fields = ['workouts', 'duration_minutes', 'entries', 'sets', 'volume']
+    op.execute(weekly.insert().from_select(
+        ['week_start', *fields],
+        sa.select(week, *(sa.func.sum(daily.c[field]) for field in fields)).group_by(week)
+    ))
+
+    op.execute(category.insert().from_select(
+        ['day', 'category', 'workouts', 'entries', 'duration_seconds', 'volume'],
+        sa.select(workouts.c.date, exercises.c.category,
+                  sa.func.count(sa.distinct(entries.c.workout_id)), sa.func.count(entries.c.id),
+                  sa.func.sum(sa.func.coalesce(entries.c.duration_seconds, 0)), sa.func.sum(volume))
+        .select_from(with_workout.join(exercises, exercises.c.id == entries.c.exercise_id))
+        .group_by(workouts.c.date, exercises.c.category)
+    ))
+
+
+def downgrade():
+    op.drop_table('rollup_category_daily_volume')
+    op.drop_table('rollup_weekly_volume')
+    op.drop_table('rollup_daily_volume')
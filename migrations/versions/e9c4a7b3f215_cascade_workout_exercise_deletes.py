@@ -0,0 +1,57 @@
+"""Cascade deletes from workouts and exercises to their entries
+
+Revision ID: e9c4a7b3f215
+Revises: d5b2e8f41c67
+Create Date: 2026-10-18 20:11:37.264903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9c4a7b3f215'
+down_revision = 'd5b2e8f41c67'
+branch_labels = None
+depends_on = None
+
+# (table, column, referred table) for every entry foreign key
+FOREIGN_KEYS = [
+    ('workout_exercises', 'workout_id', 'workouts'),
+    ('workout_exercises', 'exercise_id', 'exercises'),
+    ('workout_exercises_archive', 'workout_id', 'workouts_archive'),
+    ('workout_exercises_archive', 'exercise_id', 'exercises'),
+]
+
+# SQLite leaves these constraints unnamed; batch mode names them on reflection
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+
+def _replace_foreign_keys(ondelete):
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        # No ALTER CONSTRAINT in SQLite: batch mode rebuilds each table
+        for table in dict.fromkeys(table for table, _, _ in FOREIGN_KEYS):
+            with op.batch_alter_table(table, recreate='always', naming_convention=NAMING_CONVENTION) as batch_op:
+                for fk_table, column, referred in FOREIGN_KEYS:
+                    if fk_table != table:
+                        continue
+                    name = f'fk_{table}_{column}_{referred}'
+                    batch_op.drop_constraint(name, type_='foreignkey')
+                    batch_op.create_foreign_key(name, referred, [column], ['id'], ondelete=ondelete)
+        return
+
+    inspector = sa.inspect(bind)
+    for table, column, referred in FOREIGN_KEYS:
+        for fk in inspector.get_foreign_keys(table):
+            if fk['constrained_columns'] == [column]:
+                op.drop_constraint(fk['name'], table, type_='foreignkey')
+                op.create_foreign_key(fk['name'], table, referred, [column], ['id'], ondelete=ondelete)
+
+
+def upgrade():
+    _replace_foreign_keys('CASCADE')
+
+
+def downgrade():
+    _replace_foreign_keys(None)
@@ -0,0 +1,55 @@
+"""Add FTS5 search indexes over exercise names and workout notes
+
+Revision ID: f29b7d4c8a16
+Revises: e4a8c0d6b912
+Create Date: 2026-10-18 16:05:44.812036
+
+SQLite only (3.34+ for the trigram tokenizer); other databases keep using
+the ILIKE fallback in server/search.py.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f29b7d4c8a16'
+down_revision = 'e4a8c0d6b912'
+branch_labels = None
+depends_on = None
+
+SOURCES = (
+    ('exercises_fts', 'exercises', 'name'),
+    ('workouts_fts', 'workouts', 'notes'),
+)
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for fts, source, col in SOURCES:
+        op.execute(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5({col}, content='{source}', content_rowid='id', tokenize='trigram')"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {source} BEGIN "
+            f"INSERT INTO {fts}(rowid, {col}) VALUES (new.id, new.{col}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {source} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {col}) VALUES ('delete', old.id, old.{col}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {col} ON {source} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {col}) VALUES ('delete', old.id, old.{col}); "
+            f"INSERT INTO {fts}(rowid, {col}) VALUES (new.id, new.{col}); END"
+        )
+        # Index the rows that already exist
+        op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for fts, source, _ in SOURCES:
+        for suffix in ('ai', 'ad', 'au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        op.execute(f"DROP TABLE IF EXISTS {fts}")
@@ -1,34 +1,140 @@
 # server/app.py
 import os
-from flask import Flask, request, jsonify
-from flask_migrate import Migrate
+from functools import partial
+from flask import Flask, abort, request, jsonify, url_for
+from sqlalchemy import select
 from server.db import db
 from .models import Exercise, Workout, WorkoutExercise
-from .schemas import ExerciseSchema, WorkoutSchema, WorkoutExerciseSchema
+from .schemas import ExerciseSchema, WorkoutSchema, WorkoutExerciseSchema, SearchResultSchema
+from .pagination import (
+    PaginationError, parse_date, parse_limit, keyset_page, merged_keyset_page, exercise_filters, workout_filters,
+)
+from .loading import eager_options
+from .streaming import stream_format, stream_response, stream_pages
+from .batch import BatchError, batch_items, load_batch, commit_batch, delete_workouts
+from .engine import load_database_config, engine_options, configure_engine
+from .cache import ResponseCache
+from .versions import ROUTE_TAGS, conditional, init_app as init_versions
+from .serializers import FastJSONProvider, LazySchema, compiled
+from .stats import weekly_volume, category_totals, top_exercises, personal_records
+from .rollups import init_app as init_rollups
+from .search import search, init_app as init_search
+from .importer import init_app as init_importer
+from .idempotency import IdempotencyStore
+from .upsert import UpsertError, conflict_mode, upsert
+from .export import ExportError, export_response, init_app as init_export
+from .catalog import ExerciseCatalog
+from .projection import FieldSelector, ProjectionError
+from .archive import archive_enabled, find_workout, partitions, init_app as init_archive
+from .migrate import init_app as init_migrate
+from .instrumentation import Instrumentation
+from .writebehind import WriteBehind, WriteBehindFull
+from .changes import ChangeFeed
+from .replicas import ReadReplicas
 
-def create_app():
+def create_app(config=None):
     # ----------------------
     # FLASK APP CONFIG
     # ----------------------
     app = Flask(__name__, instance_relative_config=True)
     os.makedirs(app.instance_path, exist_ok=True)
 
-    # SQLite path (ensure migrations and app use the same file)
-    DB_PATH = os.path.join(app.instance_path, "app.db")
-    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{DB_PATH}"
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['FAST_SERIALIZERS'] = True
+    if config:
+        app.config.update(config)
+
+    # Generated dump functions + orjson; output is byte-identical either way
+    if app.config['FAST_SERIALIZERS']:
+        app.json = FastJSONProvider(app)
+        fast = compiled
+    else:
+        fast = lambda schema: schema
+
+    # Database URL and tuning profile (DATABASE_URL / DB_PROFILE); the
+    # default SQLite file is shared with migrations
+    load_database_config(app)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app)
 
     # Initialize DB and Migrations
     db.init_app(app)
-    Migrate(app, db)
+    configure_engine(app, db)
+    # GET requests read from SQLALCHEMY_REPLICA_URIS, when set
+    ReadReplicas(app)
+    # `flask db` loads Flask-Migrate/Alembic on demand
+    init_migrate(app, db)
+    init_versions(app)
+    init_rollups(app)
+    init_search(app)
+    init_importer(app)
+    init_export(app)
+    init_archive(app)
+    cache = ResponseCache(app)
+    idempotency = IdempotencyStore(app)
+    # Exercise lookups on the write path are served from memory
+    catalog = ExerciseCatalog(app)
+    # Opt-in queued, group-committed entry inserts (WRITE_BEHIND)
+    writes = WriteBehind(app)
+    # Opt-in: replay other workers' commits to the caches above (CHANGE_FEED)
+    ChangeFeed(app)
+
+    # Opt-in Server-Timing headers, /metrics and sampled slow-request profiles
+    instrumentation = Instrumentation(app)
+    fast = instrumentation.wrap(fast)
+
+    def cached_get(tags):
+        # ETag check first, so a 304 never touches the cache or the rows
+        def decorator(view):
+            return conditional(tags)(cache.cached(tags)(view))
+        return decorator
 
     # Initialize Schemas
-    exercise_schema = ExerciseSchema()
-    exercises_schema = ExerciseSchema(many=True)
-    workout_schema = WorkoutSchema()
-    workouts_schema = WorkoutSchema(many=True)
-    we_schema = WorkoutExerciseSchema()
-    wes_schema = WorkoutExerciseSchema(many=True)
+    exercise_schema = fast(ExerciseSchema())
+    exercises_schema = fast(ExerciseSchema(many=True))
+    workout_schema = fast(WorkoutSchema())
+    workouts_schema = fast(WorkoutSchema(many=True))
+    we_schema = fast(WorkoutExerciseSchema())
+    wes_schema = fast(WorkoutExerciseSchema(many=True))
+
+    # Detail routes dump the nested list themselves, so skip it here
+    exercise_detail_schema = fast(ExerciseSchema(exclude=("workouts",)))
+    workout_detail_schema = fast(WorkoutSchema(exclude=("exercises",)))
+
+    # Batch and upsert responses echo plain rows, without relationships.
+    # These and the search schema are built on first use to keep startup lean
+    exercise_row_schema = LazySchema(lambda: ExerciseSchema(exclude=("workouts",)))
+    workout_row_schema = LazySchema(lambda: WorkoutSchema(exclude=("exercises",)))
+    we_row_schema = LazySchema(lambda: WorkoutExerciseSchema(exclude=("workout", "exercise")))
+
+    search_results_schema = LazySchema(lambda: fast(SearchResultSchema(many=True)))
+
+    # ?fields= / ?expand= schema variants, built per combination on first use
+    exercise_fields = FieldSelector(ExerciseSchema, ("workouts",), fast)
+    workout_fields = FieldSelector(WorkoutSchema, ("exercises",), fast)
+
+    # ----------------------
+    # PAGINATION HELPERS
+    # ----------------------
+    def paginated_response(rows, schema, next_cursor):
+        resp = jsonify(schema.dump(rows))
+        if next_cursor:
+            args = request.args.to_dict()
+            args["cursor"] = next_cursor
+            resp.headers["X-Next-Cursor"] = next_cursor
+            resp.headers["Link"] = f'<{url_for(request.endpoint, **args)}>; rel="next"'
+        return resp
+
+    @app.errorhandler(PaginationError)
+    @app.errorhandler(BatchError)
+    @app.errorhandler(UpsertError)
+    @app.errorhandler(ExportError)
+    @app.errorhandler(ProjectionError)
+    def handle_bad_request(ex):
+        return jsonify({"error": str(ex)}), 400
+
+    @app.errorhandler(WriteBehindFull)
+    def handle_write_queue_full(ex):
+        return jsonify({"error": str(ex)}), 503, {"Retry-After": "1"}
 
     # ----------------------
     # LANDING PAGE
@@ -37,21 +143,39 @@ def create_app():
     def landing_page():
         instructions = {
             "message": "Welcome to the Workout Tracker API!",
+            "idempotency": "POST requests sent with an Idempotency-Key header are safe to retry",
             "resources": {
                 "exercises": {
-                    "GET": "/exercises",
-                    "GET_SINGLE": "/exercises/<id>",
-                    "POST": "/exercises",
+                    "GET": "/exercises?limit=&cursor=&category=&equipment_needed=&stream=1|json&fields=&expand=workouts",
+                    "GET_SINGLE": "/exercises/<id>?fields=&expand=workouts",
+                    "POST": "/exercises?on_conflict=update|ignore",
+                    "POST_BATCH": "/exercises:batch",
                     "DELETE": "/exercises/<id>"
                 },
                 "workouts": {
-                    "GET": "/workouts",
-                    "GET_SINGLE": "/workouts/<id>",
+                    "GET": "/workouts?limit=&cursor=&order=id|date&date_from=&date_to=&stream=1|json&fields=&expand=exercises",
+                    "GET_SINGLE": "/workouts/<id>?fields=&expand=exercises",
                     "POST": "/workouts",
-                    "DELETE": "/workouts/<id>"
+                    "POST_BATCH": "/workouts:batch",
+                    "DELETE": "/workouts/<id>",
+                    "DELETE_BULK": "/workouts?ids=1,2,3|date_from=&date_to="
                 },
                 "workout_exercises": {
-                    "POST": "/workouts/<workout_id>/exercises/<exercise_id>/workout_exercises"
+                    "POST": "/workouts/<workout_id>/exercises/<exercise_id>/workout_exercises?on_conflict=update|ignore",
+                    "POST_BATCH": "/workouts/<workout_id>/workout_exercises:batch",
+                    "GET_WRITE_STATUS": "/writes/<tracking_id>"
+                },
+                "search": {
+                    "GET": "/search?q=&type=exercise|workout&limit=&cursor="
+                },
+                "export": {
+                    "GET": "/export/workouts?format=packed|arrow|parquet&since_id=&date_from=&date_to=&batch_size="
+                },
+                "stats": {
+                    "GET_VOLUME": "/stats/volume?date_from=&date_to=",
+                    "GET_CATEGORIES": "/stats/categories?date_from=&date_to=",
+                    "GET_TOP_EXERCISES": "/stats/top-exercises?limit=&date_from=&date_to=",
+                    "GET_RECORDS": "/stats/records?date_from=&date_to="
                 }
             }
         }
@@ -61,23 +185,61 @@ def create_app():
     # EXERCISE ROUTES
     # ----------------------
     @app.route("/exercises", methods=["GET"])
+    @cached_get(ROUTE_TAGS["get_exercises"])
     def get_exercises():
-        exercises = Exercise.query.all()
-        return jsonify(exercises_schema.dump(exercises)), 200
+        criteria, columns = exercise_filters(request.args)
+        only = exercise_fields.parse(request.args)
+        if only is None:
+            one, many = exercise_schema, exercises_schema
+        else:
+            one, many = exercise_fields.schema(only), exercise_fields.schema(only, many=True)
+        query = Exercise.query.options(
+            *exercise_fields.column_options(Exercise, only, columns), *eager_options(Exercise, many)
+        ).filter(*criteria)
+
+        fmt = stream_format(request)
+        if fmt:
+            return stream_response(query, columns, one, fmt)
+
+        exercises, next_cursor = keyset_page(
+            query, columns, request.args.get("cursor"), parse_limit(request.args)
+        )
+        return paginated_response(exercises, many, next_cursor), 200
 
     @app.route("/exercises/<int:id>", methods=["GET"])
+    @cached_get(ROUTE_TAGS["get_exercise"])
     def get_exercise(id):
-        e = Exercise.query.get_or_404(id)
-        result = exercise_schema.dump(e)
-        result['workouts'] = workout_schema.dump(e.workouts, many=True)
+        only = exercise_fields.parse(request.args)
+        detail = exercise_detail_schema if only is None else exercise_fields.schema(only - {"workouts"})
+        nested = {}
+        if only is None or "workouts" in only:
+            nested["workouts"] = workout_schema
+            # Archived workouts come first; they are the older ones
+            if archive_enabled(db.session):
+                nested["archived_workouts"] = workout_schema
+        e = Exercise.query.options(
+            *exercise_fields.column_options(Exercise, only), *eager_options(Exercise, detail, **nested)
+        ).get_or_404(id)
+        result = detail.dump(e)
+        if nested:
+            workouts = [*e.archived_workouts, *e.workouts] if "archived_workouts" in nested else e.workouts
+            result['workouts'] = workout_schema.dump(workouts, many=True)
         return jsonify(result), 200
 
     @app.route("/exercises", methods=["POST"])
+    @idempotency.idempotent
     def create_exercise():
         data = request.get_json()
+        mode = conflict_mode(request.args)
         try:
             validated = exercise_schema.load(data)
             e = Exercise(**validated)
+            if mode:
+                # Keep the values normalized by the model validators
+                values = {key: getattr(e, key) for key in validated}
+                row, inserted = upsert(db.session, Exercise, values, ["name"], mode)
+                db.session.commit()
+                return jsonify(exercise_row_schema.dump(row._mapping)), 201 if inserted else 200
             db.session.add(e)
             db.session.commit()
             return jsonify(exercise_schema.dump(e)), 201
@@ -85,6 +247,24 @@ def create_app():
             db.session.rollback()
             return jsonify({"error": str(ex)}), 400
 
+    @app.route("/exercises:batch", methods=["POST"])
+    @idempotency.idempotent
+    def create_exercises_batch():
+        items = batch_items(request.get_json())
+        valid, errors = load_batch(exercise_schema, Exercise, items)
+
+        # Names are unique: check stored rows in one query, then the batch itself
+        names = [data["name"] for _, data in valid]
+        taken = set(db.session.scalars(select(Exercise.name).where(Exercise.name.in_(names))))
+        rows = []
+        for index, data in valid:
+            if data["name"] in taken:
+                errors[index] = {"name": ["Exercise name already exists."]}
+                continue
+            taken.add(data["name"])
+            rows.append((index, data))
+        return commit_batch(Exercise, rows, errors, exercise_row_schema)
+
     @app.route("/exercises/<int:id>", methods=["DELETE"])
     def delete_exercise(id):
         e = Exercise.query.get_or_404(id)
@@ -96,18 +276,53 @@ def create_app():
     # WORKOUT ROUTES
     # ----------------------
     @app.route("/workouts", methods=["GET"])
+    @cached_get(ROUTE_TAGS["get_workouts"])
     def get_workouts():
-        workouts = Workout.query.all()
-        return jsonify(workouts_schema.dump(workouts)), 200
+        only = workout_fields.parse(request.args)
+        if only is None:
+            one, many = workout_schema, workouts_schema
+        else:
+            one, many = workout_fields.schema(only), workout_fields.schema(only, many=True)
+
+        # One keyset query per partition (server/archive.py) the range reaches
+        sources = []
+        for part in partitions(db.session, parse_date(request.args, "date_from")):
+            model = part.workouts
+            criteria, columns = workout_filters(request.args, model)
+            query = model.query.options(
+                *workout_fields.column_options(model, only, columns), *eager_options(model, many)
+            ).filter(*criteria)
+            sources.append((query, columns))
+
+        fmt = stream_format(request)
+        if fmt:
+            return stream_pages(partial(merged_keyset_page, sources), one, fmt)
+
+        workouts, next_cursor = merged_keyset_page(
+            sources, request.args.get("cursor"), parse_limit(request.args)
+        )
+        return paginated_response(workouts, many, next_cursor), 200
 
     @app.route("/workouts/<int:id>", methods=["GET"])
+    @cached_get(ROUTE_TAGS["get_workout"])
     def get_workout(id):
-        w = Workout.query.get_or_404(id)
-        result = workout_schema.dump(w)
-        result['exercises'] = we_schema.dump(w.workout_exercises, many=True)
+        only = workout_fields.parse(request.args)
+        detail = workout_detail_schema if only is None else workout_fields.schema(only - {"exercises"})
+        # The entries (not the exercises relationship) are what gets embedded
+        nested = {"workout_exercises": wes_schema} if only is None or "exercises" in only else {}
+        # Archived ids resolve too
+        w = find_workout(db.session, id, lambda model: [
+            *workout_fields.column_options(model, only), *eager_options(model, detail, **nested),
+        ])
+        if w is None:
+            abort(404)
+        result = detail.dump(w)
+        if nested:
+            result['exercises'] = we_schema.dump(w.workout_exercises, many=True)
         return jsonify(result), 200
 
     @app.route("/workouts", methods=["POST"])
+    @idempotency.idempotent
     def create_workout():
         data = request.get_json()
         try:
@@ -120,21 +335,38 @@ def create_app():
             db.session.rollback()
             return jsonify({"error": str(ex)}), 400
 
+    @app.route("/workouts:batch", methods=["POST"])
+    @idempotency.idempotent
+    def create_workouts_batch():
+        items = batch_items(request.get_json())
+        valid, errors = load_batch(workout_schema, Workout, items)
+        return commit_batch(Workout, valid, errors, workout_row_schema)
+
     @app.route("/workouts/<int:id>", methods=["DELETE"])
     def delete_workout(id):
-        w = Workout.query.get_or_404(id)
+        # Entries go through ON DELETE CASCADE; archived ids resolve too
+        w = find_workout(db.session, id, lambda model: ())
+        if w is None:
+            abort(404)
         db.session.delete(w)
         db.session.commit()
         return jsonify({"message": "Workout deleted"}), 200
 
+    @app.route("/workouts", methods=["DELETE"])
+    def delete_workouts_bulk():
+        deleted = delete_workouts(db.session, request.args)
+        return jsonify({"deleted": deleted}), 200
+
     # ----------------------
     # ADD EXERCISE TO WORKOUT
     # ----------------------
     @app.route("/workouts/<int:workout_id>/exercises/<int:exercise_id>/workout_exercises", methods=["POST"])
+    @idempotency.idempotent
     def add_exercise_to_workout(workout_id, exercise_id):
         data = request.get_json() or {}
+        mode = conflict_mode(request.args)
         workout = Workout.query.get_or_404(workout_id)
-        exercise = Exercise.query.get_or_404(exercise_id)
+        exercise = catalog.get_or_404(exercise_id)
         try:
             payload = {
                 "workout_id": workout.id,
@@ -144,14 +376,101 @@ def create_app():
                 "duration_seconds": data.get("duration_seconds")
             }
             validated = we_schema.load(payload)
+            if writes.enabled and not mode:
+                tracking_id = writes.submit(validated)
+                location = url_for("get_write_status", tracking_id=tracking_id)
+                return jsonify({"tracking_id": tracking_id, "status": "queued"}), 202, {"Location": location}
             we = WorkoutExercise(**validated)
+            if mode:
+                row, inserted = upsert(db.session, WorkoutExercise, validated, ["workout_id", "exercise_id"], mode)
+                db.session.commit()
+                return jsonify(we_row_schema.dump(row._mapping)), 201 if inserted else 200
             db.session.add(we)
             db.session.commit()
             return jsonify(we_schema.dump(we)), 201
+        except WriteBehindFull:
+            raise
         except Exception as ex:
             db.session.rollback()
             return jsonify({"error": str(ex)}), 400
 
+    @app.route("/workouts/<int:workout_id>/workout_exercises:batch", methods=["POST"])
+    @idempotency.idempotent
+    def add_exercises_to_workout_batch(workout_id):
+        workout = Workout.query.get_or_404(workout_id)
+        items = [
+            {**item, "workout_id": workout.id} if isinstance(item, dict) else item
+            for item in batch_items(request.get_json())
+        ]
+        valid, errors = load_batch(we_schema, WorkoutExercise, items)
+
+        # Exercises resolve from the catalog; existing pairs in one query
+        exercise_ids = {data["exercise_id"] for _, data in valid}
+        known = catalog.known_ids(exercise_ids)
+        taken = set(db.session.scalars(
+            select(WorkoutExercise.exercise_id).where(
+                WorkoutExercise.workout_id == workout.id,
+                WorkoutExercise.exercise_id.in_(exercise_ids),
+            )
+        ))
+        rows = []
+        for index, data in valid:
+            if data["exercise_id"] not in known:
+                errors[index] = {"exercise_id": ["Exercise not found."]}
+            elif data["exercise_id"] in taken:
+                errors[index] = {"exercise_id": ["Exercise already in this workout."]}
+            else:
+                taken.add(data["exercise_id"])
+                rows.append((index, data))
+        return commit_batch(WorkoutExercise, rows, errors, we_row_schema)
+
+    # Statuses live in the worker that queued the row (see server/writebehind.py)
+    @app.route("/writes/<tracking_id>", methods=["GET"])
+    def get_write_status(tracking_id):
+        status = writes.status(tracking_id)
+        if status is None:
+            abort(404)
+        return jsonify(status), 200
+
+    # ----------------------
+    # SEARCH ROUTE
+    # ----------------------
+    @app.route("/search", methods=["GET"])
+    @cached_get(ROUTE_TAGS["get_search"])
+    def get_search():
+        results, next_cursor = search(request.args)
+        return paginated_response(results, search_results_schema, next_cursor), 200
+
+    # ----------------------
+    # EXPORT ROUTE
+    # ----------------------
+    @app.route("/export/workouts", methods=["GET"])
+    def export_workouts():
+        return export_response(request.args)
+
+    # ----------------------
+    # STATS ROUTES
+    # ----------------------
+    @app.route("/stats/volume", methods=["GET"])
+    @cached_get(ROUTE_TAGS["stats"])
+    def get_weekly_volume():
+        return jsonify(weekly_volume(request.args)), 200
+
+    @app.route("/stats/categories", methods=["GET"])
+    @cached_get(ROUTE_TAGS["stats"])
+    def get_category_totals():
+        return jsonify(category_totals(request.args)), 200
+
+    @app.route("/stats/top-exercises", methods=["GET"])
+    @cached_get(ROUTE_TAGS["stats"])
+    def get_top_exercises():
+        return jsonify(top_exercises(request.args)), 200
+
+    @app.route("/stats/records", methods=["GET"])
+    @cached_get(ROUTE_TAGS["stats"])
+    def get_personal_records():
+        return jsonify(personal_records(request.args)), 200
+
     return app
 
 
@@ -0,0 +1,172 @@
+# server/archive.py
+from datetime import date, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import delete, func, insert, select
+
+from server.db import db
+from server.models import Workout, WorkoutExercise, ArchivedWorkout, ArchivedWorkoutExercise
+from server.versions import session_setting
+
+# Workouts moved per transaction, so the write lock is released between batches
+ARCHIVE_BATCH_SIZE = 1000
+
+WORKOUT_COLUMNS = ("id", "date", "duration_minutes", "notes")
+ENTRY_COLUMNS = ("id", "workout_id", "exercise_id", "reps", "sets", "duration_seconds")
+
+
+class Partition:
+    """A workouts table and its entries table, holding part of the history."""
+
+    __slots__ = ("name", "workouts", "entries")
+
+    def __init__(self, name, workouts, entries):
+        self.name = name
+        self.workouts = workouts
+        self.entries = entries
+
+    def __repr__(self):
+        return f"<Partition {self.name}>"
+
+
+HOT = Partition("hot", Workout, WorkoutExercise)
+ARCHIVE = Partition("archive", ArchivedWorkout, ArchivedWorkoutExercise)
+
+
+# -----------------------
+# ROUTING
+# -----------------------
+def archive_enabled(session):
+    return session_setting(session, "archive_enabled", False)
+
+
+def partitions(session, date_from=None):
+    """The partitions that can hold workouts dated ``date_from`` or later.
+
+    The hot tables are always read.  The archive is skipped when archiving is
+    off, when it is empty, or when ``date_from`` is past its newest workout
+    (one index seek), so queries for recent dates never touch it.
+    """
+    if not archive_enabled(session):
+        return [HOT]
+    newest = session.scalar(select(func.max(ArchivedWorkout.date)))
+    if newest is None or (date_from is not None and date_from > newest):
+        return [HOT]
+    return [HOT, ARCHIVE]
+
+
+def find_workout(session, id, loader_options):
+    """The hot or archived workout ``id``, or None.
+
+    ``loader_options(model)`` returns the eager-load options for either
+    workouts table.  The archive is only consulted on a hot miss.
+    """
+    for part in (HOT, ARCHIVE) if archive_enabled(session) else (HOT,):
+        workout = session.get(part.workouts, id, options=loader_options(part.workouts))
+        if workout is not None:
+            return workout
+    return None
+
+
+# -----------------------
+# MOVING ROWS
+# -----------------------
+def _copy(source, target, columns, criteria):
+    rows = select(*(getattr(source, name) for name in columns)).where(*criteria)
+    return insert(target).from_select(columns, rows)
+
+
+def archive_workouts(session, before, batch_size=ARCHIVE_BATCH_SIZE, progress=None):
+    """Move workouts dated before ``before``, with their entries, to the archive.
+
+    Each batch is an INSERT ... SELECT into the archive tables and a DELETE
+    from the hot ones, committed together; no rows are loaded into the
+    session.  Ids are kept, so archived workouts still resolve by id; the hot
+    tables never reuse an id (AUTOINCREMENT), so they stay unique across
+    both partitions.  The rollups already count both partitions, so the
+    move skips their refresh.  Returns ``(workouts, entries)`` moved.
+    """
+    moved_workouts = moved_entries = 0
+    last = 0
+    while True:
+        ids = session.scalars(
+            select(Workout.id)
+            .where(Workout.date < before, Workout.id > last)
+            .order_by(Workout.id).limit(batch_size)
+        ).all()
+        if not ids:
+            break
+        last = ids[-1]
+        in_batch = [Workout.id.between(ids[0], last), Workout.date < before]
+        entries = [WorkoutExercise.workout_id.in_(select(Workout.id).where(*in_batch))]
+
+        session.info["rollups_enabled"] = False
+        try:
+            session.execute(_copy(Workout, ArchivedWorkout, WORKOUT_COLUMNS, in_batch))
+            session.execute(_copy(WorkoutExercise, ArchivedWorkoutExercise, ENTRY_COLUMNS, entries))
+            moved_entries += session.execute(
+                delete(WorkoutExercise).where(*entries), execution_options={"synchronize_session": False}
+            ).rowcount
+            moved_workouts += session.execute(
+                delete(Workout).where(*in_batch), execution_options={"synchronize_session": False}
+            ).rowcount
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.info.pop("rollups_enabled", None)
+        if progress is not None:
+            progress(moved_workouts, moved_entries)
+    return moved_workouts, moved_entries
+
+
+def archive_cutoff(older_than=None, today=None):
+    """First date that stays hot: ``older_than`` (or ARCHIVE_AFTER_DAYS) days ago."""
+    if older_than is None:
+        older_than = current_app.config["ARCHIVE_AFTER_DAYS"]
+    return (today or date.today()) - timedelta(days=older_than)
+
+
+# -----------------------
+# CLI
+# -----------------------
+archive_cli = AppGroup("archive", help="Move old workouts to the archive tables.")
+
+
+@archive_cli.command("run")
+@click.option("--older-than", type=click.IntRange(min=0),
+              help="Archive workouts older than this many days [default: ARCHIVE_AFTER_DAYS].")
+@click.option("--batch-size", type=click.IntRange(min=1), default=ARCHIVE_BATCH_SIZE, show_default=True,
+              help="Workouts moved per transaction.")
+def run_command(older_than, batch_size):
+    """Move workouts past the cutoff, with their entries, to the archive."""
+    if not current_app.config["ARCHIVE_ENABLED"]:
+        # Reads would stop seeing the moved rows
+        raise click.ClickException("Set ARCHIVE_ENABLED on every process before archiving.")
+    before = archive_cutoff(older_than)
+
+    def progress(workouts, entries):
+        click.echo(f"  {workouts} workouts, {entries} entries moved", err=True)
+
+    workouts, entries = archive_workouts(db.session, before, batch_size, progress)
+    click.echo(f"Archived {workouts} workouts and {entries} entries dated before {before.isoformat()}.")
+
+
+@archive_cli.command("status")
+def status_command():
+    """Show how many workouts each partition holds, and their date range."""
+    for part in (HOT, ARCHIVE):
+        count, oldest, newest = db.session.execute(
+            select(func.count(part.workouts.id), func.min(part.workouts.date), func.max(part.workouts.date))
+        ).one()
+        span = f" ({oldest.isoformat()} to {newest.isoformat()})" if count else ""
+        click.echo(f"{part.name}: {count} workouts{span}")
+
+
+def init_app(app):
+    app.config.setdefault("ARCHIVE_ENABLED", False)
+    app.config.setdefault("ARCHIVE_AFTER_DAYS", 365)
+    app.cli.add_command(archive_cli)
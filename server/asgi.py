@@ -0,0 +1,28 @@
+# server/asgi.py
+"""ASGI entry point.
+
+Run with any ASGI server, e.g.::
+
+    uvicorn --factory server.asgi:create_asgi_app
+
+The Flask app is wrapped in a2wsgi's WSGIMiddleware, so both modes serve
+the same views, response cache, replica routing, exercise catalog and
+instrumentation.  The event loop owns the connections and feeds request
+bodies to the view as it reads them; the view itself runs on one of
+``ASGI_WORKER_THREADS`` threads, so concurrency is bounded by that pool,
+as under a threaded WSGI server.
+"""
+from a2wsgi import WSGIMiddleware
+
+from server.app import create_app
+
+
+def asgi_app(flask_app):
+    """Wrap ``flask_app`` for an ASGI server."""
+    flask_app.config.setdefault("ASGI_WORKER_THREADS", 32)
+    return WSGIMiddleware(flask_app, workers=flask_app.config["ASGI_WORKER_THREADS"])
+
+
+def create_asgi_app(config=None):
+    """Build a regular Flask app with ``config`` and wrap it for ASGI."""
+    return asgi_app(create_app(config))
@@ -0,0 +1,137 @@
+# server/batch.py
+from flask import jsonify
+from marshmallow import ValidationError
+from sqlalchemy import delete, insert
+from sqlalchemy.exc import IntegrityError
+
+from server.archive import partitions
+from server.db import db
+from server.pagination import date_range, parse_date
+
+MAX_BATCH_SIZE = 10000
+
+
+class BatchError(ValueError):
+    """Raised when a batch body is unusable as a whole."""
+
+
+def batch_items(data):
+    if not isinstance(data, list):
+        raise BatchError("Request body must be a JSON array")
+    if not data:
+        raise BatchError("Batch is empty")
+    if len(data) > MAX_BATCH_SIZE:
+        raise BatchError(f"Batch exceeds {MAX_BATCH_SIZE} items")
+    return data
+
+
+def load_batch(schema, model, items):
+    """Validate ``items`` and return ``(valid, errors)``.
+
+    ``valid`` is a list of ``(index, data)`` pairs and ``errors`` maps the
+    index of each rejected item to its messages.  The whole array goes
+    through ``schema.load(many=True)`` first; only a failing batch pays
+    for a second, per-item pass to find out which entries are bad.  Every
+    valid item is also run through the model's ``@validates`` hooks, since
+    Core inserts bypass them.
+    """
+    try:
+        loaded = list(enumerate(schema.load(items, many=True)))
+    except ValidationError:
+        loaded = None
+
+    valid, errors = [], {}
+    if loaded is None:
+        loaded = []
+        for index, item in enumerate(items):
+            try:
+                loaded.append((index, schema.load(item)))
+            except ValidationError as err:
+                errors[index] = err.messages
+
+    for index, data in loaded:
+        try:
+            obj = model(**data)
+        except (ValueError, TypeError) as ex:
+            errors[index] = str(ex)
+            continue
+        # Keep values normalized by the model validators (e.g. stripped names)
+        valid.append((index, {key: getattr(obj, key) for key in data}))
+    return valid, errors
+
+
+def commit_batch(model, rows, errors, schema):
+    """Insert the surviving ``(index, data)`` rows in one transaction.
+
+    All rows go through a single multi-row INSERT ... RETURNING and one
+    commit.  Conflicts that slipped past the pre-checks (a concurrent
+    writer) roll the whole insert back.
+    """
+    created = []
+    if rows:
+        # sort_by_parameter_order would degrade SQLite to one INSERT per row.
+        # New rowids are assigned in VALUES order, so ascending ids line up
+        # with the parameter list.
+        stmt = insert(model).returning(model.id)
+        try:
+            ids = sorted(db.session.execute(stmt, [data for _, data in rows]).scalars())
+            db.session.commit()
+        except IntegrityError as ex:
+            db.session.rollback()
+            return jsonify({"error": str(ex.orig)}), 400
+        for (index, data), new_id in zip(rows, ids):
+            item = schema.dump({**data, "id": new_id})
+            item["index"] = index
+            created.append(item)
+
+    body = {
+        "created": created,
+        "errors": [{"index": index, "error": errors[index]} for index in sorted(errors)],
+    }
+    # 201 when everything was created, 207 for a partial batch, 400 for none
+    if not errors:
+        status = 201
+    elif created:
+        status = 207
+    else:
+        status = 400
+    return jsonify(body), status
+
+
+def parse_ids(args):
+    """The comma-separated ``ids`` query parameter as a list, or None."""
+    raw = args.get("ids")
+    if raw is None:
+        return None
+    try:
+        ids = [int(part) for part in raw.split(",") if part.strip()]
+    except ValueError:
+        raise BatchError("ids must be a comma-separated list of integers")
+    if not ids:
+        raise BatchError("ids is empty")
+    if len(ids) > MAX_BATCH_SIZE:
+        raise BatchError(f"ids exceeds {MAX_BATCH_SIZE} items")
+    return ids
+
+
+def delete_workouts(session, args):
+    """Delete the workouts matching ``ids`` and/or ``date_from``/``date_to``.
+
+    One set-based DELETE per partition (see server/archive.py); their
+    entries go with them through ON DELETE CASCADE, so no rows are loaded.
+    Returns the number of workouts deleted.
+    """
+    ids = parse_ids(args)
+    if ids is None and not date_range(args):
+        raise BatchError("Pass ids or a date_from/date_to range")
+    deleted = 0
+    for part in partitions(session, parse_date(args, "date_from")):
+        workouts = part.workouts
+        criteria = date_range(args, workouts.date)
+        if ids is not None:
+            criteria.append(workouts.id.in_(ids))
+        deleted += session.execute(
+            delete(workouts).where(*criteria), execution_options={"synchronize_session": False}
+        ).rowcount
+    session.commit()
+    return deleted
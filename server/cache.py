@@ -0,0 +1,182 @@
+# server/cache.py
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, current_app, request
+
+from server.replicas import pinned_to_primary, read_from_replica, replica_current
+from server.streaming import stream_format
+from server.versions import on_commit
+
+
+# -----------------------
+# BACKENDS
+# -----------------------
+class LocalBackend:
+    """In-process LRU with a TTL, bounded by entry count and total bytes."""
+
+    shared = False
+
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024, ttl=60):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (expires, size, value)
+        self._versions = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def set(self, key, value, size):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, size, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key):
+        self._bytes -= self._entries.pop(key)[1]
+
+    def versions(self, tags):
+        with self._lock:
+            return [self._versions.get(tag, 0) for tag in tags]
+
+    def bump(self, tags):
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisBackend:
+    """Shared backend so every worker sees the same entries and versions."""
+
+    shared = True
+
+    def __init__(self, url, ttl=60, prefix="workout-cache:"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND='redis' requires the redis package")
+        import pickle
+        self._pickle = pickle
+        self._client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self._client.get(self.prefix + key)
+        return None if raw is None else self._pickle.loads(raw)
+
+    def set(self, key, value, size):
+        self._client.set(self.prefix + key, self._pickle.dumps(value), ex=self.ttl)
+
+    def versions(self, tags):
+        raw = self._client.mget([self.prefix + "v:" + tag for tag in tags])
+        return [int(v) if v is not None else 0 for v in raw]
+
+    def bump(self, tags):
+        pipe = self._client.pipeline()
+        for tag in tags:
+            pipe.incr(self.prefix + "v:" + tag)
+        pipe.execute()
+
+    def clear(self):
+        keys = list(self._client.scan_iter(self.prefix + "*"))
+        if keys:
+            self._client.delete(*keys)
+
+
+# -----------------------
+# RESPONSE CACHE
+# -----------------------
+class ResponseCache:
+    """Read-through cache of serialized GET responses.
+
+    Every entry is keyed by its URL plus the current version of each tag it
+    depends on (``"workouts"`` for the table, ``"workouts:3"`` for one row,
+    ``"workouts*"`` for set-based statements that touch unknown rows; see
+    server/versions.py).  Invalidation just bumps the backend's versions on
+    commit, so stale entries become unreachable and age out of the LRU.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("CACHE_ENABLED", True)
+        app.config.setdefault("CACHE_BACKEND", "local")
+        app.config.setdefault("CACHE_MAX_ENTRIES", 1024)
+        app.config.setdefault("CACHE_MAX_BYTES", 64 * 1024 * 1024)
+        app.config.setdefault("CACHE_TTL", 60)
+        app.config.setdefault("CACHE_REDIS_URL", None)
+
+        if app.config["CACHE_BACKEND"] == "redis":
+            self.backend = RedisBackend(app.config["CACHE_REDIS_URL"], ttl=app.config["CACHE_TTL"])
+        else:
+            self.backend = LocalBackend(
+                max_entries=app.config["CACHE_MAX_ENTRIES"],
+                max_bytes=app.config["CACHE_MAX_BYTES"],
+                ttl=app.config["CACHE_TTL"],
+            )
+        self.enabled = app.config["CACHE_ENABLED"]
+        app.extensions["response_cache"] = self
+        # A shared backend's versions are already bumped for every worker
+        on_commit(app, self.invalidate, remote=not self.backend.shared)
+
+    def invalidate(self, tags):
+        self.backend.bump(tags)
+
+    def cached(self, tags):
+        """Decorate a GET view; ``tags(**view_args)`` lists its dependencies."""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(**kwargs):
+                if not self.enabled or stream_format(request):
+                    return view(**kwargs)
+
+                view_tags = tags(**kwargs)
+                versions = self.backend.versions(view_tags)
+                key = request.full_path + "|" + ",".join(map(str, versions))
+                # A read pinned to the primary must see the client's writes,
+                # which a lagging replica read may have cached
+                hit = None if pinned_to_primary() else self.backend.get(key)
+                if hit is not None:
+                    status, headers, body = hit
+                    return Response(body, status=status, headers=headers)
+
+                # Checked before the view runs, so its rows are at least as new
+                storable = not read_from_replica() or replica_current(view_tags)
+                resp = current_app.make_response(view(**kwargs))
+                if storable and resp.status_code == 200 and not resp.is_streamed:
+                    body = resp.get_data()
+                    headers = [(k, v) for k, v in resp.headers if k != "Content-Length"]
+                    self.backend.set(key, (200, headers, body), len(body))
+                return resp
+            return wrapper
+        return decorator
@@ -0,0 +1,146 @@
+# server/catalog.py
+import threading
+import time
+
+from flask import abort
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from server.db import db
+from server.models import ChangeVersion, Exercise
+from server.versions import on_commit, own_rows_tag
+
+# Bumped by every commit that writes exercises rows (see server/versions.py)
+CATALOG_TAG = own_rows_tag(Exercise.__tablename__)
+
+
+class ExerciseRecord:
+    """Read-only copy of an exercises row; dumps like an Exercise."""
+
+    __slots__ = ("id", "name", "category", "equipment_needed")
+
+    def __init__(self, id, name, category, equipment_needed):
+        self.id = id
+        self.name = name
+        self.category = category
+        self.equipment_needed = equipment_needed
+
+    def __repr__(self):
+        return f"<ExerciseRecord {self.id} {self.name!r}>"
+
+
+class Snapshot:
+    """Every exercise at one catalog version, indexed by id, name and category."""
+
+    __slots__ = ("version", "records", "by_id", "by_name", "by_category")
+
+    def __init__(self, version, records):
+        self.version = version
+        self.records = tuple(records)
+        self.by_id = {r.id: r for r in self.records}
+        self.by_name = {r.name: r for r in self.records}
+        by_category = {}
+        for r in self.records:
+            by_category.setdefault(r.category, []).append(r)
+        self.by_category = {category: tuple(rs) for category, rs in by_category.items()}
+
+
+class ExerciseCatalog:
+    """Process-local snapshot of the exercises table.
+
+    Loaded at startup and swapped whole on reload, so readers never lock.
+    A commit in this process that writes exercises marks it stale at once;
+    writes from other workers are noticed by polling the ``exercises.rows``
+    version counter at most every ``CATALOG_CHECK_INTERVAL`` seconds (and
+    straight away on a lookup miss, so a new exercise is never a 404).
+    Lookups themselves never reach the database.
+    """
+
+    def __init__(self, app=None):
+        self._snapshot = None
+        self._stale = True
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("CATALOG_CHECK_INTERVAL", 1.0)
+        self.check_interval = app.config["CATALOG_CHECK_INTERVAL"]
+        app.extensions["exercise_catalog"] = self
+        on_commit(app, self._on_commit)
+        with app.app_context():
+            try:
+                self.refresh()
+            except SQLAlchemyError:
+                # No schema yet (fresh database); load on first use instead
+                self._snapshot = None
+
+    def _on_commit(self, tags):
+        if CATALOG_TAG in tags:
+            self._stale = True
+
+    # -----------------------
+    # LOADING
+    # -----------------------
+    @staticmethod
+    def _version(conn):
+        return conn.scalar(select(ChangeVersion.version).where(ChangeVersion.tag == CATALOG_TAG)) or 0
+
+    def refresh(self, check=True):
+        """Reload if stale, or if another worker bumped the version (``check``)."""
+        with self._lock:
+            with db.engine.connect() as conn:
+                self._checked_at = time.monotonic()
+                if not self._stale and self._snapshot is not None:
+                    if not check or self._version(conn) == self._snapshot.version:
+                        return self._snapshot
+                # Read the version first: a write landing in between only
+                # makes the next check reload again
+                version = self._version(conn)
+                self._stale = False
+                rows = conn.execute(
+                    select(Exercise.id, Exercise.name, Exercise.category, Exercise.equipment_needed)
+                    .order_by(Exercise.id)
+                )
+                self._snapshot = Snapshot(version, (ExerciseRecord(*row) for row in rows))
+            return self._snapshot
+
+    def snapshot(self):
+        snapshot = self._snapshot
+        if snapshot is None or self._stale:
+            return self.refresh(check=False)
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            return self.refresh()
+        return snapshot
+
+    # -----------------------
+    # LOOKUPS
+    # -----------------------
+    def get(self, id):
+        record = self.snapshot().by_id.get(id)
+        if record is None:
+            record = self.refresh().by_id.get(id)
+        return record
+
+    def get_or_404(self, id):
+        record = self.get(id)
+        if record is None:
+            abort(404)
+        return record
+
+    def by_name(self, name):
+        record = self.snapshot().by_name.get(name)
+        if record is None:
+            record = self.refresh().by_name.get(name)
+        return record
+
+    def in_category(self, category):
+        return self.snapshot().by_category.get(category, ())
+
+    def known_ids(self, ids):
+        """The subset of ``ids`` that exist, re-checking once on a miss."""
+        by_id = self.snapshot().by_id
+        if any(id not in by_id for id in ids):
+            by_id = self.refresh().by_id
+        return {id for id in ids if id in by_id}
@@ -0,0 +1,136 @@
+# server/changes.py
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from server.db import db
+from server.engine import is_sqlite
+from server.models import ChangeLogEntry, Exercise, Workout, WorkoutExercise
+from server.versions import statement_tags
+
+# What a worker invalidates when it may have missed log entries
+EVERYTHING = sorted(set().union(*(
+    statement_tags(model.__tablename__) for model in (Exercise, Workout, WorkoutExercise)
+)))
+
+# Seconds between prunes of the change log, per process
+PRUNE_INTERVAL = 60
+
+
+class ChangeFeed:
+    """Tells each worker about the other workers' commits.
+
+    With ``CHANGE_FEED`` on, every commit that changes tracked rows also
+    appends its tags to the ``change_log`` table, in the same transaction
+    (see server/versions.py).  Each process reads the entries past the last
+    sequence number it has seen, at most every ``CHANGE_FEED_POLL_INTERVAL``
+    seconds before a request (one index range scan), and hands other
+    processes' tags to its ``remote`` commit listeners.  The local response
+    cache and exercise catalog then drop what another worker changed.
+
+    Entries older than ``CHANGE_FEED_RETENTION`` seconds are pruned.  A
+    worker idle for longer may have missed some, so it invalidates
+    everything instead.  Sequence numbers follow commit order because
+    SQLite serializes writers; elsewhere a reader could step past an
+    entry committed late, so the feed only runs on SQLite.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self._last_seq = None
+        self._polled_at = time.monotonic()
+        self._pruned_at = 0.0
+        self._token = uuid.uuid4().hex[:12]
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("CHANGE_FEED", False)
+        app.config.setdefault("CHANGE_FEED_POLL_INTERVAL", 0.5)
+        app.config.setdefault("CHANGE_FEED_RETENTION", 3600)
+
+        self.app = app
+        self.enabled = app.config["CHANGE_FEED"]
+        self.poll_interval = app.config["CHANGE_FEED_POLL_INTERVAL"]
+        self.retention = app.config["CHANGE_FEED_RETENTION"]
+        app.extensions["change_feed"] = self
+        if not self.enabled:
+            return
+        if not is_sqlite(app.config["SQLALCHEMY_DATABASE_URI"]):
+            raise ValueError("CHANGE_FEED needs SQLite: log sequence numbers only follow commit order there")
+        app.before_request(self._before_request)
+        with app.app_context():
+            try:
+                with db.engine.connect() as conn:
+                    self._last_seq = self._newest(conn)
+            except SQLAlchemyError:
+                # No schema yet; start from the log's end on the first poll
+                self._last_seq = None
+
+    @property
+    def origin(self):
+        # Forked workers share the token, so the pid tells them apart
+        return f"{self._token}:{os.getpid()}"
+
+    @staticmethod
+    def _newest(conn):
+        return conn.scalar(select(func.max(ChangeLogEntry.seq))) or 0
+
+    def _before_request(self):
+        if time.monotonic() - self._polled_at >= self.poll_interval:
+            self.poll()
+
+    # -----------------------
+    # CONSUMING
+    # -----------------------
+    def poll(self):
+        """Replay other processes' new entries; returns the tags delivered."""
+        with self._lock:
+            now = time.monotonic()
+            missed = now - self._polled_at > self.retention
+            self._polled_at = now
+            with db.engine.connect() as conn:
+                if self._last_seq is None:
+                    self._last_seq = self._newest(conn)
+                    return []
+                rows = conn.execute(
+                    select(ChangeLogEntry.seq, ChangeLogEntry.tags, ChangeLogEntry.origin)
+                    .where(ChangeLogEntry.seq > self._last_seq)
+                    .order_by(ChangeLogEntry.seq)
+                ).all()
+            if rows:
+                self._last_seq = rows[-1].seq
+            tags = set()
+            for _, raw, origin in rows:
+                if origin != self.origin:
+                    tags.update(raw.split(","))
+            if missed:
+                tags = EVERYTHING
+            if now - self._pruned_at >= PRUNE_INTERVAL:
+                self._pruned_at = now
+                try:
+                    self.prune()
+                except SQLAlchemyError:
+                    pass    # e.g. the write lock is busy; the next prune catches up
+
+        tags = sorted(tags)
+        if tags:
+            for listener in self.app.extensions.get("remote_commit_listeners", ()):
+                listener(tags)
+        return tags
+
+    def prune(self):
+        """Delete entries past the retention period, keeping the newest one."""
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=self.retention)
+        with db.engine.begin() as conn:
+            # The newest row stays so SQLite never hands its seq out again
+            newest = self._newest(conn)
+            return conn.execute(
+                delete(ChangeLogEntry).where(ChangeLogEntry.created_at < cutoff, ChangeLogEntry.seq < newest)
+            ).rowcount
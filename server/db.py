@@ -1,2 +1,23 @@
+from flask import has_request_context, request
 from flask_sqlalchemy import SQLAlchemy
-db = SQLAlchemy()
+from flask_sqlalchemy.session import Session
+
+# request.environ key for the read engine chosen per request (server/replicas.py)
+READ_ENGINE_KEY = "server.read_engine"
+
+
+class RoutingSession(Session):
+    """Reads go to the request's replica engine, if it was given one.
+
+    Flushes and INSERT/UPDATE/DELETE statements always use the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_request_context():
+            replica = request.environ.get(READ_ENGINE_KEY)
+            if replica is not None and not getattr(clause, "is_dml", False):
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
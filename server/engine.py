@@ -0,0 +1,95 @@
+# server/engine.py
+import os
+
+from sqlalchemy import event
+
+# Applied on every new SQLite connection by the "production" profile
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",          # readers no longer block on the writer
+    "synchronous": "NORMAL",        # fsync at checkpoints only; safe with WAL
+    "busy_timeout": 5000,           # ms to wait for the write lock
+    "foreign_keys": "ON",
+    "cache_size": -64000,           # negative = KiB, so 64 MB per connection
+    "mmap_size": 268435456,         # 256 MB memory-mapped reads
+    "temp_store": "MEMORY",
+}
+
+# Every SQLite connection needs these, whatever the profile: ON DELETE
+# CASCADE only fires with foreign key enforcement on
+REQUIRED_SQLITE_PRAGMAS = {
+    "foreign_keys": "ON",
+}
+
+# Pool settings per profile and backend
+ENGINE_PROFILES = {
+    "development": {
+        "sqlite": {},
+        "server": {},
+    },
+    "production": {
+        "sqlite": {
+            "pool_size": 8,
+            "max_overflow": 8,
+            "pool_timeout": 10,
+        },
+        "server": {
+            "pool_size": 10,
+            "max_overflow": 20,
+            "pool_timeout": 10,
+            "pool_recycle": 1800,
+            "pool_pre_ping": True,
+        },
+    },
+}
+
+
+def load_database_config(app):
+    """Pick the database URL and profile from the environment.
+
+    ``DATABASE_URL`` points the app at any SQLAlchemy URL (defaults to the
+    instance SQLite file) and ``DB_PROFILE`` selects development/production
+    tuning.  Values already in ``app.config`` win over the environment.
+    """
+    default_url = f"sqlite:///{os.path.join(app.instance_path, 'app.db')}"
+    app.config.setdefault("SQLALCHEMY_DATABASE_URI", os.environ.get("DATABASE_URL", default_url))
+    app.config.setdefault("DB_PROFILE", os.environ.get("DB_PROFILE", "development"))
+    app.config.setdefault("SQLITE_PRAGMAS", dict(SQLITE_PRAGMAS))
+
+
+def is_sqlite(url):
+    return str(url).startswith("sqlite")
+
+
+def engine_options(app):
+    """Build SQLALCHEMY_ENGINE_OPTIONS for the configured profile."""
+    profile = app.config["DB_PROFILE"]
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"DB_PROFILE must be one of {sorted(ENGINE_PROFILES)}")
+    backend = "sqlite" if is_sqlite(app.config["SQLALCHEMY_DATABASE_URI"]) else "server"
+    options = dict(ENGINE_PROFILES[profile][backend])
+    options.update(app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}))
+    return options
+
+
+def sqlite_pragmas(config):
+    """The pragmas for the configured profile's SQLite connections."""
+    if config["DB_PROFILE"] == "production":
+        return {**config["SQLITE_PRAGMAS"], **REQUIRED_SQLITE_PRAGMAS}
+    return dict(REQUIRED_SQLITE_PRAGMAS)
+
+
+def apply_sqlite_pragmas(engine, pragmas):
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def configure_engine(app, db):
+    """Hook profile-specific behaviour onto the engine ``db`` created."""
+    with app.app_context():
+        engine = db.engine
+        if is_sqlite(engine.url):
+            apply_sqlite_pragmas(engine, sqlite_pragmas(app.config))
@@ -0,0 +1,418 @@
+# server/export.py
+import struct
+import sys
+import time
+from array import array
+from datetime import date
+
+import click
+from flask import Response, stream_with_context
+from flask.cli import with_appcontext
+from sqlalchemy import func, select
+
+from server.archive import partitions
+from server.db import db
+from server.models import Exercise
+from server.pagination import PaginationError, date_range, parse_date
+
+# Workouts per batch; with their entries this bounds the rows held in memory
+EXPORT_BATCH_SIZE = 5000
+MAX_EXPORT_BATCH_SIZE = 50000
+
+# One row per workout_exercises entry (workouts without entries get one row
+# of nulls), in output order
+COLUMNS = (
+    ("workout_id", "int64"),
+    ("date", "date"),
+    ("duration_minutes", "int32"),
+    ("notes", "string"),
+    ("entry_id", "int64"),
+    ("exercise_id", "int64"),
+    ("exercise_name", "dictionary"),
+    ("category", "dictionary"),
+    ("equipment_needed", "bool"),
+    ("reps", "int32"),
+    ("sets", "int32"),
+    ("duration_seconds", "int32"),
+)
+
+MIMETYPES = {
+    "packed": "application/octet-stream",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class ExportError(ValueError):
+    """Raised for an export that cannot be produced."""
+
+
+# -----------------------
+# QUERIES
+# -----------------------
+def _rows(part, first, last, criteria):
+    workouts, entries = part.workouts, part.entries
+    return (
+        select(
+            workouts.id, workouts.date, workouts.duration_minutes, workouts.notes,
+            entries.id, entries.exercise_id, Exercise.name, Exercise.category,
+            Exercise.equipment_needed, entries.reps, entries.sets,
+            entries.duration_seconds,
+        )
+        .outerjoin(entries, entries.workout_id == workouts.id)
+        .outerjoin(Exercise, Exercise.id == entries.exercise_id)
+        .where(workouts.id.between(first, last), *criteria)
+        .order_by(workouts.id, entries.id)
+    )
+
+
+def _row_order(row):
+    # Workout id, then entry id; a workout without entries has one row
+    return row[0], row[4] is not None, row[4]
+
+
+def export_bound(session):
+    """Highest workout id now; pass it back as ``since_id`` next time.
+
+    Workout ids are never reused (AUTOINCREMENT), so every workout created
+    later gets a higher id, even once the newest one is deleted.  Archived
+    workouts count too, so archiving the newest ones never moves it back.
+    """
+    return max(session.scalar(select(func.max(part.workouts.id))) or 0 for part in partitions(session))
+
+
+def export_batches(session, since_id=0, until_id=None, dates=None, batch_size=EXPORT_BATCH_SIZE):
+    """Yield ``{column: [values]}`` for up to ``batch_size`` workouts at a time.
+
+    Workouts are walked by id (an index range scan per batch) from
+    ``since_id`` (exclusive) to ``until_id`` (inclusive), so rows inserted
+    while the export runs do not shift it.  ``dates`` holds optional
+    ``date_from``/``date_to`` filters.  Archived workouts are merged in by
+    id when the range reaches them.  Plain Core rows keep the ORM identity
+    map out of the way.
+    """
+    dates = dates or {}
+    parts = partitions(session, parse_date(dates, "date_from"))
+    last = since_id
+    while True:
+        ids = []
+        for part in parts:
+            workouts = part.workouts
+            bound = [workouts.id > last] + ([workouts.id <= until_id] if until_id is not None else [])
+            ids += session.scalars(
+                select(workouts.id).where(*bound, *date_range(dates, workouts.date))
+                .order_by(workouts.id).limit(batch_size)
+            ).all()
+        if not ids:
+            return
+        ids = sorted(ids)[:batch_size]
+        rows = []
+        for part in parts:
+            rows += session.execute(_rows(part, ids[0], ids[-1], date_range(dates, part.workouts.date))).all()
+        if len(parts) > 1:
+            rows.sort(key=_row_order)
+        last = ids[-1]
+        values = list(zip(*rows))
+        yield {name: list(values[i]) for i, (name, _) in enumerate(COLUMNS)}
+
+
+# -----------------------
+# PACKED FORMAT
+# -----------------------
+# A dependency-free columnar layout, little-endian throughout:
+#
+#   "WXP1", u16 column count, per column: u8 name length, name, u8 kind
+#   per batch: u32 row count, then each column in order
+#   end:       u32 0
+#
+# int/date columns are a validity byte per row followed by an int32/int64
+# array (dates as days since 1970-01-01); strings are validity bytes, int32
+# offsets (rows + 1) and the UTF-8 data; bools are int8 (-1 for null).
+# Dictionary columns carry only the values first seen in this batch (u32
+# count, then u32 length + UTF-8 each) followed by int32 codes into the
+# dictionary accumulated so far (-1 for null).
+MAGIC = b"WXP1"
+KINDS = ("int32", "int64", "date", "string", "bool", "dictionary")
+TYPECODES = {"int32": "i", "int64": "q", "date": "i"}
+EPOCH = date(1970, 1, 1).toordinal()
+
+
+def _array_bytes(typecode, values):
+    data = array(typecode, values)
+    if sys.byteorder == "big":
+        data.byteswap()
+    return data.tobytes()
+
+
+def _read_array(buf, offset, typecode, count):
+    data = array(typecode)
+    end = offset + data.itemsize * count
+    data.frombytes(buf[offset:end])
+    if sys.byteorder == "big":
+        data.byteswap()
+    return data, end
+
+
+class PackedEncoder:
+    def __init__(self):
+        self.dictionaries = {name: {} for name, kind in COLUMNS if kind == "dictionary"}
+
+    def start(self):
+        parts = [MAGIC, struct.pack("<H", len(COLUMNS))]
+        for name, kind in COLUMNS:
+            encoded = name.encode()
+            parts.append(struct.pack("<B", len(encoded)) + encoded + struct.pack("<B", KINDS.index(kind)))
+        return b"".join(parts)
+
+    def write(self, columns):
+        count = len(columns[COLUMNS[0][0]])
+        parts = [struct.pack("<I", count)]
+        for name, kind in COLUMNS:
+            values = columns[name]
+            if kind in TYPECODES:
+                if kind == "date":
+                    values = [None if v is None else v.toordinal() - EPOCH for v in values]
+                parts.append(bytes(v is not None for v in values))
+                parts.append(_array_bytes(TYPECODES[kind], (0 if v is None else v for v in values)))
+            elif kind == "bool":
+                parts.append(_array_bytes("b", (-1 if v is None else int(v) for v in values)))
+            elif kind == "string":
+                encoded = [b"" if v is None else v.encode() for v in values]
+                offsets = [0]
+                for item in encoded:
+                    offsets.append(offsets[-1] + len(item))
+                parts += [bytes(v is not None for v in values), _array_bytes("i", offsets), b"".join(encoded)]
+            else:
+                parts += self._dictionary(self.dictionaries[name], values)
+        return b"".join(parts)
+
+    @staticmethod
+    def _dictionary(dictionary, values):
+        new = []
+        codes = []
+        for value in values:
+            if value is None:
+                codes.append(-1)
+                continue
+            code = dictionary.get(value)
+            if code is None:
+                code = dictionary[value] = len(dictionary)
+                new.append(value.encode())
+            codes.append(code)
+        entries = b"".join(struct.pack("<I", len(item)) + item for item in new)
+        return [struct.pack("<I", len(new)), entries, _array_bytes("i", codes)]
+
+    def finish(self):
+        return struct.pack("<I", 0)
+
+
+def read_packed(data):
+    """Decode a packed export into a list of ``{column: [values]}`` batches."""
+    view = memoryview(data)
+    if bytes(view[:4]) != MAGIC:
+        raise ExportError("Not a packed workout export")
+    (ncols,), offset = struct.unpack_from("<H", view, 4), 6
+    columns = []
+    for _ in range(ncols):
+        length = view[offset]
+        name = bytes(view[offset + 1:offset + 1 + length]).decode()
+        columns.append((name, KINDS[view[offset + 1 + length]]))
+        offset += length + 2
+
+    dictionaries = {name: [] for name, kind in columns if kind == "dictionary"}
+    batches = []
+    while True:
+        (count,), offset = struct.unpack_from("<I", view, offset), offset + 4
+        if count == 0:
+            return batches
+        batch = {}
+        for name, kind in columns:
+            if kind in TYPECODES:
+                valid, offset = view[offset:offset + count], offset + count
+                values, offset = _read_array(view, offset, TYPECODES[kind], count)
+                values = [v if ok else None for v, ok in zip(values, valid)]
+                if kind == "date":
+                    values = [None if v is None else date.fromordinal(v + EPOCH) for v in values]
+            elif kind == "bool":
+                raw, offset = _read_array(view, offset, "b", count)
+                values = [None if v < 0 else bool(v) for v in raw]
+            elif kind == "string":
+                valid, offset = view[offset:offset + count], offset + count
+                offsets, offset = _read_array(view, offset, "i", count + 1)
+                blob = bytes(view[offset:offset + offsets[-1]])
+                offset += offsets[-1]
+                values = [blob[offsets[i]:offsets[i + 1]].decode() if valid[i] else None for i in range(count)]
+            else:
+                dictionary = dictionaries[name]
+                (new,), offset = struct.unpack_from("<I", view, offset), offset + 4
+                for _ in range(new):
+                    (length,), offset = struct.unpack_from("<I", view, offset), offset + 4
+                    dictionary.append(bytes(view[offset:offset + length]).decode())
+                    offset += length
+                codes, offset = _read_array(view, offset, "i", count)
+                values = [None if code < 0 else dictionary[code] for code in codes]
+            batch[name] = values
+        batches.append(batch)
+
+
+# -----------------------
+# ARROW / PARQUET (optional pyarrow)
+# -----------------------
+class _Sink:
+    """Write-only file object handing back what pyarrow wrote since the last drain."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+class ArrowEncoder:
+    """Arrow IPC stream or Parquet, one record batch / row group per batch."""
+
+    def __init__(self, fmt):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ExportError(f"format={fmt} requires the pyarrow package; use format=packed")
+        self.pa = pa
+        types = {"int32": pa.int32(), "int64": pa.int64(), "date": pa.date32(), "string": pa.string(),
+                 "bool": pa.bool_(), "dictionary": pa.dictionary(pa.int32(), pa.string())}
+        self.schema = pa.schema([(name, types[kind]) for name, kind in COLUMNS])
+        self.sink = _Sink()
+        out = pa.PythonFile(self.sink, mode="w")
+        if fmt == "parquet":
+            self.writer = pq.ParquetWriter(out, self.schema, use_dictionary=["exercise_name", "category"])
+        else:
+            self.writer = pa.ipc.new_stream(out, self.schema)
+
+    def start(self):
+        return self.sink.drain()
+
+    def write(self, columns):
+        pa = self.pa
+        arrays = []
+        for (name, kind), field in zip(COLUMNS, self.schema):
+            if kind == "dictionary":
+                arrays.append(pa.array(columns[name], pa.string()).dictionary_encode())
+            else:
+                arrays.append(pa.array(columns[name], field.type))
+        self.writer.write_batch(pa.record_batch(arrays, schema=self.schema))
+        return self.sink.drain()
+
+    def finish(self):
+        self.writer.close()
+        return self.sink.drain()
+
+
+def encoder(fmt):
+    if fmt == "packed":
+        return PackedEncoder()
+    if fmt in ("arrow", "parquet"):
+        return ArrowEncoder(fmt)
+    raise ExportError(f"format must be one of: {', '.join(MIMETYPES)}")
+
+
+def export_stream(session, fmt="packed", since_id=0, until_id=None, dates=None,
+                  batch_size=EXPORT_BATCH_SIZE, stats=None):
+    """Yield the encoded export one batch at a time; ``stats`` counts rows."""
+    enc = encoder(fmt)
+    yield enc.start()
+    for columns in export_batches(session, since_id, until_id, dates, batch_size):
+        if stats is not None:
+            stats["rows"] += len(columns["workout_id"])
+        yield enc.write(columns)
+    yield enc.finish()
+
+
+# -----------------------
+# HTTP AND CLI
+# -----------------------
+def _int_arg(args, name, default, minimum, maximum=None):
+    raw = args.get(name)
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise PaginationError(f"{name} must be an integer")
+    if value < minimum:
+        raise PaginationError(f"{name} must be at least {minimum}")
+    return value if maximum is None else min(value, maximum)
+
+
+def export_response(args):
+    """GET /export/workouts: the history after ``since_id`` within ``date_from``/``date_to``.
+
+    ``X-Export-Until-Id`` is the last workout id the export can contain;
+    send it as ``since_id`` to fetch only newer workouts next time.
+    """
+    fmt = args.get("format", "packed")
+    since_id = _int_arg(args, "since_id", 0, 0)
+    batch_size = _int_arg(args, "batch_size", EXPORT_BATCH_SIZE, 1, MAX_EXPORT_BATCH_SIZE)
+    dates = {key: args[key] for key in ("date_from", "date_to") if key in args}
+    date_range(dates)       # a bad date is a 400, not a broken stream
+    until_id = export_bound(db.session)
+
+    body = export_stream(db.session, fmt, since_id, until_id, dates, batch_size)
+    first = next(body)      # surfaces a bad format / missing pyarrow as a 400
+    resp = Response(stream_with_context(_prepend(first, body)), mimetype=MIMETYPES[fmt])
+    resp.headers["X-Export-Until-Id"] = str(until_id)
+    resp.headers["Content-Disposition"] = f'attachment; filename="workouts.{fmt}"'
+    return resp
+
+
+def _prepend(first, rest):
+    yield first
+    yield from rest
+
+
+@click.command("export")
+@click.argument("out", type=click.File("wb"))
+@click.option("--format", "fmt", type=click.Choice(list(MIMETYPES)), default="packed", show_default=True)
+@click.option("--since-id", type=click.IntRange(min=0), default=0, help="Only workouts with a larger id.")
+@click.option("--date-from", type=click.DateTime(["%Y-%m-%d"]), help="Only workouts on or after this date.")
+@click.option("--date-to", type=click.DateTime(["%Y-%m-%d"]), help="Only workouts on or before this date.")
+@click.option("--batch-size", type=click.IntRange(min=1), default=EXPORT_BATCH_SIZE, show_default=True,
+              help="Workouts per batch.")
+@with_appcontext
+def export_command(out, fmt, since_id, date_from, date_to, batch_size):
+    """Export workouts joined with their exercises to OUT ("-" for stdout)."""
+    dates = {key: value.date().isoformat()
+             for key, value in (("date_from", date_from), ("date_to", date_to)) if value}
+    until_id = export_bound(db.session)
+    stats = {"rows": 0}
+    started = time.perf_counter()
+    try:
+        for chunk in export_stream(db.session, fmt, since_id, until_id, dates, batch_size, stats):
+            out.write(chunk)
+    except ExportError as ex:
+        raise click.ClickException(str(ex))
+    elapsed = time.perf_counter() - started
+    click.echo(f"Exported {stats['rows']} rows in {elapsed:.1f}s "
+               f"({stats['rows'] / elapsed if elapsed else 0:.0f} rows/s); "
+               f"next incremental export: --since-id {until_id}", err=True)
+
+
+def init_app(app):
+    app.cli.add_command(export_command)
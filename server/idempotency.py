@@ -0,0 +1,91 @@
+# server/idempotency.py
+import hashlib
+import threading
+from functools import wraps
+
+from flask import Response, current_app, jsonify, request
+
+from server.cache import LocalBackend, RedisBackend
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyStore:
+    """Replays the stored response when a write is retried with the same key.
+
+    A POST sent with an ``Idempotency-Key`` header has its response (2xx
+    and 4xx; a 5xx may be retried for real) kept for ``IDEMPOTENCY_TTL``
+    seconds in a bounded LRU, or in Redis with ``CACHE_BACKEND="redis"``.
+    A retry of the same URL (query string included) with the same key and
+    body gets the stored response without touching the database; reusing
+    a key for a different body is a 422 and a retry racing the original in
+    this process is a 409.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("IDEMPOTENCY_ENABLED", True)
+        app.config.setdefault("IDEMPOTENCY_MAX_KEYS", 10000)
+        app.config.setdefault("IDEMPOTENCY_MAX_BYTES", 16 * 1024 * 1024)
+        app.config.setdefault("IDEMPOTENCY_TTL", 24 * 60 * 60)
+
+        if app.config.get("CACHE_BACKEND") == "redis":
+            self.backend = RedisBackend(app.config.get("CACHE_REDIS_URL"), ttl=app.config["IDEMPOTENCY_TTL"],
+                                        prefix="workout-idempotency:")
+        else:
+            self.backend = LocalBackend(
+                max_entries=app.config["IDEMPOTENCY_MAX_KEYS"],
+                max_bytes=app.config["IDEMPOTENCY_MAX_BYTES"],
+                ttl=app.config["IDEMPOTENCY_TTL"],
+            )
+        self.enabled = app.config["IDEMPOTENCY_ENABLED"]
+        app.extensions["idempotency"] = self
+
+    def idempotent(self, view):
+        """Decorate a write view to honour ``Idempotency-Key``."""
+        @wraps(view)
+        def wrapper(**kwargs):
+            key = request.headers.get(HEADER)
+            if not self.enabled or key is None:
+                return view(**kwargs)
+            if not key or len(key) > MAX_KEY_LENGTH:
+                return jsonify({"error": f"{HEADER} must be 1-{MAX_KEY_LENGTH} characters"}), 400
+
+            # The query string picks the behaviour (?on_conflict=), so it is part of the key
+            key = f"{request.method} {request.full_path} {key}"
+            fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+            stored = self.backend.get(key)
+            if stored is not None:
+                return self._replay(stored, fingerprint)
+
+            with self._lock:
+                if key in self._in_flight:
+                    return jsonify({"error": f"A request with this {HEADER} is still in progress"}), 409
+                self._in_flight.add(key)
+            try:
+                resp = current_app.make_response(view(**kwargs))
+                if resp.status_code < 500 and not resp.is_streamed:
+                    body = resp.get_data()
+                    headers = [(k, v) for k, v in resp.headers if k != "Content-Length"]
+                    self.backend.set(key, (fingerprint, resp.status_code, headers, body), len(body))
+                return resp
+            finally:
+                with self._lock:
+                    self._in_flight.discard(key)
+        return wrapper
+
+    @staticmethod
+    def _replay(stored, fingerprint):
+        original, status, headers, body = stored
+        if original != fingerprint:
+            return jsonify({"error": f"{HEADER} was already used with a different request body"}), 422
+        resp = Response(body, status=status, headers=headers)
+        resp.headers["Idempotent-Replayed"] = "true"
+        return resp
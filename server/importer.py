@@ -0,0 +1,346 @@
+# server/importer.py
+import csv
+import itertools
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import insert, select
+
+from server.batch import load_batch
+from server.db import db
+from server.models import Exercise, Workout, WorkoutExercise, ImportCheckpoint
+from server.schemas import ExerciseSchema, WorkoutSchema, WorkoutExerciseSchema
+
+# Input records per transaction (and per checkpoint)
+BATCH_SIZE = 10000
+
+# Rejected records kept for the report; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+KINDS = ("exercises", "workouts")
+FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+EXERCISE_COLUMNS = ("name", "category", "equipment_needed")
+WORKOUT_COLUMNS = ("date", "duration_minutes", "notes")
+ENTRY_COLUMNS = ("reps", "sets", "duration_seconds")
+
+
+class ImportFailed(ValueError):
+    """Raised when an import cannot continue."""
+
+
+# -----------------------
+# READERS
+# -----------------------
+def _clean(row):
+    # CSV has no nulls: an empty cell means "not given"
+    return {key: value for key, value in row.items() if key and value not in ("", None)}
+
+
+def _workouts_from_csv(rows):
+    """Group CSV rows into workout records.
+
+    Each row is one exercise entry; consecutive rows sharing a ``workout``
+    key belong to the same workout.  Without that column every row is its
+    own workout.  A row with no ``exercise`` adds a workout with no entries.
+    """
+    counter = itertools.count()
+    for _, group in itertools.groupby(rows, key=lambda row: row.get("workout") or next(counter)):
+        group = list(group)
+        record = {key: group[0][key] for key in WORKOUT_COLUMNS if key in group[0]}
+        record["exercises"] = [
+            {key: row[key] for key in ("exercise", *ENTRY_COLUMNS) if key in row}
+            for row in group if "exercise" in row
+        ]
+        yield record
+
+
+def read_records(stream, kind, fmt):
+    """Yield import records from a CSV or NDJSON text stream, one at a time."""
+    if fmt == "ndjson":
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as ex:
+                raise ImportFailed(f"line {number}: invalid JSON ({ex})") from None
+        return
+    rows = (_clean(row) for row in csv.DictReader(stream))
+    yield from _workouts_from_csv(rows) if kind == "workouts" else rows
+
+
+def detect_format(path):
+    fmt = FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise ImportFailed(f"Cannot tell the format of {path}; pass --format")
+    return fmt
+
+
+# -----------------------
+# BATCH VALIDATION AND INSERT
+# -----------------------
+def _fields(record, columns):
+    if not isinstance(record, dict):
+        return {}
+    return {key: record[key] for key in columns if key in record}
+
+
+def _insert(session, model, rows, returning=False):
+    """One Core executemany; returns the new ids in parameter order when asked."""
+    table = model.__table__
+    if not returning:
+        session.execute(insert(table), rows)
+        return None
+    # New rowids are assigned in parameter order (see server/batch.py)
+    return sorted(session.execute(insert(table).returning(table.c.id), rows).scalars())
+
+
+def import_exercises(session, records, names):
+    """Validate and insert one batch of exercise records.
+
+    Returns ``(inserted rows, errors by batch index)`` and adds the new
+    exercises to the ``names`` map.
+    """
+    items = [_fields(record, EXERCISE_COLUMNS) for record in records]
+    valid, errors = load_batch(ExerciseSchema(), Exercise, items)
+
+    rows = []
+    for index, data in valid:
+        if data["name"] in names:
+            errors[index] = {"name": [f"Exercise {data['name']!r} already exists"]}
+            continue
+        names[data["name"]] = None
+        rows.append(data)
+    if rows:
+        for data, new_id in zip(rows, _insert(session, Exercise, rows, returning=True)):
+            names[data["name"]] = new_id
+    return len(rows), errors
+
+
+def import_workouts(session, records, names):
+    """Validate and insert one batch of workout records with their entries.
+
+    A workout is rejected as a whole when any of its entries is invalid or
+    names an exercise that does not exist.  Returns ``(inserted rows,
+    errors by batch index)``.
+    """
+    valid, errors = load_batch(WorkoutSchema(), Workout, [_fields(record, WORKOUT_COLUMNS) for record in records])
+
+    entries, owners = [], []
+    for index, _ in valid:
+        listed = records[index].get("exercises") or []
+        if not isinstance(listed, list):
+            errors[index] = {"exercises": ["Must be a list"]}
+            continue
+        seen = set()
+        for position, entry in enumerate(listed):
+            entry = _fields(entry, ("exercise", *ENTRY_COLUMNS))
+            name = entry.get("exercise")
+            if name not in names:
+                errors[index] = {"exercises": {position: [f"Unknown exercise {name!r}"]}}
+                break
+            if name in seen:
+                errors[index] = {"exercises": {position: [f"Exercise {name!r} is listed twice"]}}
+                break
+            seen.add(name)
+            entries.append({"workout_id": 0, "exercise_id": names[name],
+                            **{key: entry[key] for key in ENTRY_COLUMNS if key in entry}})
+            owners.append((index, position))
+
+    checked, entry_errors = load_batch(WorkoutExerciseSchema(), WorkoutExercise, entries)
+    for flat, messages in entry_errors.items():
+        index, position = owners[flat]
+        errors.setdefault(index, {"exercises": {position: messages}})
+
+    workouts = [(index, {key: data.get(key) for key in WORKOUT_COLUMNS})
+                for index, data in valid if index not in errors]
+    if not workouts:
+        return 0, errors
+    ids = dict(zip((index for index, _ in workouts),
+                   _insert(session, Workout, [data for _, data in workouts], returning=True)))
+
+    rows = [
+        {**{key: data.get(key) for key in ENTRY_COLUMNS},
+         "workout_id": ids[owners[flat][0]], "exercise_id": data["exercise_id"]}
+        for flat, data in checked if owners[flat][0] in ids
+    ]
+    if rows:
+        _insert(session, WorkoutExercise, rows)
+    return len(workouts) + len(rows), errors
+
+
+IMPORTERS = {"exercises": import_exercises, "workouts": import_workouts}
+
+
+# -----------------------
+# CHECKPOINTS AND INDEXES
+# -----------------------
+def _checkpoint(session, job):
+    checkpoint = session.get(ImportCheckpoint, job)
+    if checkpoint is None:
+        checkpoint = ImportCheckpoint(job=job, records=0, completed=False,
+                                      updated_at=datetime.now(timezone.utc))
+        session.add(checkpoint)
+    return checkpoint
+
+
+@contextmanager
+def deferred_indexes(session, models):
+    """Drop the secondary (non-unique) indexes of ``models`` for the block.
+
+    They are rebuilt in one pass afterwards, which beats updating every
+    B-tree row by row.  Unique constraints stay, since they guard the data.
+    """
+    indexes = [index for model in models for index in model.__table__.indexes if not index.unique]
+    for index in indexes:
+        index.drop(session.connection(), checkfirst=True)
+    session.commit()
+    try:
+        yield
+    finally:
+        session.rollback()
+        for index in indexes:
+            index.create(session.connection(), checkfirst=True)
+        session.commit()
+
+
+# -----------------------
+# DRIVER
+# -----------------------
+def _batches(records, size):
+    iterator = iter(records)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def run_import(session, kind, records, job=None, batch_size=BATCH_SIZE, defer_indexes=False,
+               strict=False, progress=None):
+    """Import ``records`` of ``kind`` ("exercises" or "workouts").
+
+    Each batch is validated together and committed in its own transaction.
+    With a ``job`` name the number of records consumed is committed in the
+    same transaction, so rerunning the job after a failure skips exactly
+    the records already imported.  Invalid records are skipped and
+    reported; with ``strict`` the first batch containing one aborts the
+    import instead.  ``progress(stats)`` is called after every commit.
+    """
+    importer = IMPORTERS[kind]
+    checkpoint = _checkpoint(session, job) if job else None
+    if checkpoint is not None and checkpoint.completed:
+        raise ImportFailed(f"Import job {job!r} already completed; pass --restart to import it again")
+
+    start = checkpoint.records if checkpoint is not None else 0
+    stats = {"resumed_at": start, "records": start, "rows": 0, "rejected": 0, "errors": [],
+             "elapsed": 0.0, "rows_per_second": 0.0}
+    names = dict(session.execute(select(Exercise.name, Exercise.id)).all())
+    started = time.perf_counter()
+
+    models = (Exercise,) if kind == "exercises" else (Workout, WorkoutExercise)
+    with deferred_indexes(session, models) if defer_indexes else nullcontext():
+        for batch in _batches(itertools.islice(records, start, None), batch_size):
+            try:
+                rows, errors = importer(session, batch, names)
+            except Exception:
+                session.rollback()
+                raise
+            if errors and strict:
+                session.rollback()
+                index = min(errors)
+                raise ImportFailed(f"record {stats['records'] + index + 1}: {errors[index]}")
+
+            for index in sorted(errors):
+                if len(stats["errors"]) < MAX_REPORTED_ERRORS:
+                    stats["errors"].append((stats["records"] + index + 1, errors[index]))
+            stats["records"] += len(batch)
+            stats["rows"] += rows
+            stats["rejected"] += len(errors)
+            if checkpoint is not None:
+                checkpoint.records = stats["records"]
+                checkpoint.updated_at = datetime.now(timezone.utc)
+            session.commit()
+
+            stats["elapsed"] = time.perf_counter() - started
+            stats["rows_per_second"] = stats["rows"] / stats["elapsed"] if stats["elapsed"] else 0.0
+            if progress is not None:
+                progress(stats)
+
+    if checkpoint is not None:
+        checkpoint.completed = True
+        checkpoint.updated_at = datetime.now(timezone.utc)
+        session.commit()
+    stats["elapsed"] = time.perf_counter() - started
+    stats["rows_per_second"] = stats["rows"] / stats["elapsed"] if stats["elapsed"] else 0.0
+    return stats
+
+
+# -----------------------
+# CLI
+# -----------------------
+@click.command("import")
+@click.argument("kind", type=click.Choice(KINDS))
+@click.argument("source", type=click.File("r", encoding="utf-8"))
+@click.option("--format", "fmt", type=click.Choice(sorted(set(FORMATS.values()))),
+              help="Input format; guessed from the file extension by default.")
+@click.option("--batch-size", type=click.IntRange(min=1), default=BATCH_SIZE, show_default=True,
+              help="Records per transaction.")
+@click.option("--job", help="Checkpoint name; defaults to KIND:SOURCE.")
+@click.option("--restart", is_flag=True, help="Ignore the job's checkpoint and start from the top.")
+@click.option("--no-checkpoint", is_flag=True, help="Do not record progress for resuming.")
+@click.option("--defer-indexes/--keep-indexes", default=True, show_default=True,
+              help="Drop secondary indexes during the import and rebuild them at the end.")
+@click.option("--strict", is_flag=True, help="Abort on the first invalid record.")
+@with_appcontext
+def import_command(kind, source, fmt, batch_size, job, restart, no_checkpoint, defer_indexes, strict):
+    """Bulk import exercises or workouts from a CSV or NDJSON file ("-" for stdin).
+
+    Exercises need name, category and equipment_needed.  Workouts need
+    date, duration_minutes and notes plus their entries: an "exercises"
+    list of {exercise, reps, sets, duration_seconds} in NDJSON, or one CSV
+    row per entry grouped by a "workout" column.  Entries name their
+    exercise, which must already exist.
+
+    A failed import resumes where it stopped when rerun with the same job.
+    """
+    stdin = source.name == "<stdin>"
+    if fmt is None:
+        fmt = "ndjson" if stdin else detect_format(source.name)
+    if job is None:
+        job = f"{kind}:{'stdin' if stdin else os.path.abspath(source.name)}"
+    if no_checkpoint:
+        job = None
+    elif restart:
+        checkpoint = db.session.get(ImportCheckpoint, job)
+        if checkpoint is not None:
+            db.session.delete(checkpoint)
+            db.session.commit()
+
+    def report(stats):
+        click.echo(f"{stats['records']} records, {stats['rows']} rows "
+                   f"({stats['rows_per_second']:.0f} rows/s)", err=True)
+
+    try:
+        stats = run_import(db.session, kind, read_records(source, kind, fmt), job=job,
+                           batch_size=batch_size, defer_indexes=defer_indexes, strict=strict,
+                           progress=report)
+    except ImportFailed as ex:
+        raise click.ClickException(str(ex))
+
+    if stats["resumed_at"]:
+        click.echo(f"Resumed after record {stats['resumed_at']}.")
+    click.echo(f"Imported {stats['rows']} rows from {stats['records'] - stats['resumed_at']} records "
+               f"in {stats['elapsed']:.1f}s ({stats['rows_per_second']:.0f} rows/s); "
+               f"{stats['rejected']} rejected.")
+    for number, messages in stats["errors"]:
+        click.echo(f"  record {number}: {messages}")
+    if stats["rejected"] > len(stats["errors"]):
+        click.echo(f"  ... and {stats['rejected'] - len(stats['errors'])} more")
+
+
+def init_app(app):
+    app.cli.add_command(import_command)
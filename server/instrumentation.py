@@ -0,0 +1,252 @@
+# server/instrumentation.py
+import os
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from flask import Response, g, has_request_context, request
+from flask.json.provider import JSONProvider
+from sqlalchemy import event
+
+from server.db import db
+
+# Request duration histogram buckets, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Server-Timing / metric names for the timed phases of a request
+PHASES = ("db", "schema", "json")
+
+
+# -----------------------
+# PER-REQUEST TIMERS
+# -----------------------
+def _recording():
+    return has_request_context() and "timings" in g
+
+
+@contextmanager
+def timing(phase):
+    """Add the time spent in the block to ``phase`` for the current request."""
+    if not _recording():
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        g.timings[phase] += time.perf_counter() - started
+
+
+class TimedSchema:
+    """Times ``dump``/``load`` of a (possibly compiled) marshmallow schema."""
+
+    def __init__(self, schema):
+        self.schema = schema
+
+    def dump(self, obj, **kwargs):
+        with timing("schema"):
+            return self.schema.dump(obj, **kwargs)
+
+    def load(self, data, **kwargs):
+        with timing("schema"):
+            return self.schema.load(data, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.schema, name)
+
+
+class TimedJSONProvider(JSONProvider):
+    """Wraps the app's JSON provider to time encoding."""
+
+    def __init__(self, app, provider):
+        super().__init__(app)
+        self.provider = provider
+
+    def dumps(self, obj, **kwargs):
+        with timing("json"):
+            return self.provider.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        return self.provider.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        with timing("json"):
+            return self.provider.response(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.provider, name)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _recording():
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_started")
+    if started and _recording():
+        g.timings["db"] += time.perf_counter() - started.pop()
+        g.queries += 1
+
+
+# -----------------------
+# METRICS
+# -----------------------
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+
+class Metrics:
+    """Per-process request metrics, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.durations = defaultdict(Histogram)     # (route, method) -> Histogram
+        self.requests = defaultdict(int)            # (route, method, status) -> count
+        self.statements = defaultdict(int)          # (route, method) -> count
+        self.phases = defaultdict(float)            # (route, method, phase) -> seconds
+
+    def record(self, route, method, status, elapsed, queries, timings):
+        with self._lock:
+            self.durations[route, method].observe(elapsed)
+            self.requests[route, method, status] += 1
+            self.statements[route, method] += queries
+            for phase in PHASES:
+                self.phases[route, method, phase] += timings[phase]
+
+    def render(self):
+        lines = []
+        with self._lock:
+            lines += ["# HELP http_request_duration_seconds Request wall time.",
+                      "# TYPE http_request_duration_seconds histogram"]
+            for (route, method), hist in sorted(self.durations.items()):
+                for bound, count in zip(hist.buckets, hist.counts):
+                    lines.append("http_request_duration_seconds_bucket"
+                                 f"{_labels(route=route, method=method, le=bound)} {count}")
+                lines.append("http_request_duration_seconds_bucket"
+                             f"{_labels(route=route, method=method, le='+Inf')} {hist.count}")
+                lines.append(f"http_request_duration_seconds_sum{_labels(route=route, method=method)} {hist.sum}")
+                lines.append(f"http_request_duration_seconds_count{_labels(route=route, method=method)} {hist.count}")
+
+            lines += ["# HELP http_requests_total Requests by status.", "# TYPE http_requests_total counter"]
+            for (route, method, status), count in sorted(self.requests.items()):
+                lines.append(f"http_requests_total{_labels(route=route, method=method, status=status)} {count}")
+
+            lines += ["# HELP db_statements_total SQL statements executed.", "# TYPE db_statements_total counter"]
+            for (route, method), count in sorted(self.statements.items()):
+                lines.append(f"db_statements_total{_labels(route=route, method=method)} {count}")
+
+            lines += ["# HELP request_phase_seconds_total Time spent in db, schema and json.",
+                      "# TYPE request_phase_seconds_total counter"]
+            for (route, method, phase), seconds in sorted(self.phases.items()):
+                lines.append(f"request_phase_seconds_total{_labels(route=route, method=method, phase=phase)} {seconds}")
+        return "\n".join(lines) + "\n"
+
+
+# -----------------------
+# FLASK INTEGRATION
+# -----------------------
+class Instrumentation:
+    """Opt-in request instrumentation (``INSTRUMENTATION_ENABLED``).
+
+    Every request gets a ``Server-Timing`` header splitting its wall time
+    into SQL, schema load/dump and JSON encoding, and feeds the per-route
+    histograms served at ``/metrics``.  With ``PROFILE_SAMPLE_RATE`` set, a
+    sample of requests runs under cProfile and the ones slower than
+    ``PROFILE_SLOW_MS`` are dumped to ``PROFILE_DIR`` for snakeviz/pstats.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.metrics = Metrics()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("INSTRUMENTATION_ENABLED", os.environ.get("INSTRUMENTATION") == "1")
+        app.config.setdefault("PROFILE_SAMPLE_RATE", 0.0)
+        app.config.setdefault("PROFILE_SLOW_MS", 500)
+        app.config.setdefault("PROFILE_DIR", os.path.join(app.instance_path, "profiles"))
+
+        self.enabled = app.config["INSTRUMENTATION_ENABLED"]
+        if not self.enabled:
+            return
+        self.sample_rate = app.config["PROFILE_SAMPLE_RATE"]
+        self.slow_ms = app.config["PROFILE_SLOW_MS"]
+        self.profile_dir = app.config["PROFILE_DIR"]
+
+        app.extensions["instrumentation"] = self
+        app.json = TimedJSONProvider(app, app.json)
+        with app.app_context():
+            event.listen(db.engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(db.engine, "after_cursor_execute", _after_cursor_execute)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.add_url_rule("/metrics", "metrics", self._metrics_view, methods=["GET"])
+
+    def wrap(self, factory):
+        """Wrap a schema factory so the schemas it builds are timed."""
+        if not self.enabled:
+            return factory
+        return lambda schema: TimedSchema(factory(schema))
+
+    def _start(self):
+        g.timings = defaultdict(float)
+        g.queries = 0
+        g.profiler = None
+        if self.sample_rate and random.random() < self.sample_rate:
+            import cProfile
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+                g.profiler = profiler
+            except ValueError:      # another profiler is already active
+                pass
+        g.request_started = time.perf_counter()
+
+    def _finish(self, resp):
+        if "request_started" not in g:
+            return resp
+        elapsed = time.perf_counter() - g.request_started
+        if g.profiler is not None:
+            g.profiler.disable()
+            if elapsed * 1000 >= self.slow_ms:
+                self._dump_profile(g.profiler, elapsed)
+
+        timings = g.timings
+        # Streamed bodies run their queries after this point
+        parts = [f'db;dur={timings["db"] * 1000:.2f};desc="{g.queries} queries"']
+        parts += [f"{phase};dur={timings[phase] * 1000:.2f}" for phase in PHASES[1:]]
+        parts.append(f"total;dur={elapsed * 1000:.2f}")
+        resp.headers["Server-Timing"] = ", ".join(parts)
+
+        route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        self.metrics.record(route, request.method, resp.status_code, elapsed, g.queries, timings)
+        return resp
+
+    def _dump_profile(self, profiler, elapsed):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        endpoint = re.sub(r"[^\w.-]", "_", request.endpoint or "unmatched")
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{endpoint}-{elapsed * 1000:.0f}ms.prof"
+        profiler.dump_stats(os.path.join(self.profile_dir, name))
+
+    def _metrics_view(self):
+        return Response(self.metrics.render(), mimetype="text/plain; version=0.0.4")
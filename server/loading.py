@@ -0,0 +1,54 @@
+# server/loading.py
+from marshmallow import fields
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, selectinload
+
+# Guard against self-referencing schemas; ours nest at most three deep
+MAX_DEPTH = 4
+
+
+def _nested_schema(field):
+    if isinstance(field, fields.List):
+        field = field.inner
+    if isinstance(field, fields.Nested):
+        return field.schema
+    return None
+
+
+def _dump_plan(schema):
+    """Map attribute name -> nested schema for every field ``schema`` dumps."""
+    return {
+        field.attribute or name: _nested_schema(field)
+        for name, field in schema.dump_fields.items()
+    }
+
+
+def _loader_options(mapper, plan, depth):
+    options = []
+    for key, nested in plan.items():
+        rel = mapper.relationships.get(key)
+        if rel is None:
+            continue
+        attr = getattr(mapper.class_, key)
+        # Collections load in one extra IN (...) query; many-to-one rides
+        # along on the parent's query as a JOIN
+        loader = selectinload(attr) if rel.uselist else joinedload(attr)
+        if nested is not None and depth < MAX_DEPTH:
+            children = _loader_options(rel.mapper, _dump_plan(nested), depth + 1)
+            if children:
+                loader = loader.options(*children)
+        options.append(loader)
+    return options
+
+
+def eager_options(model, schema, **extra):
+    """Build loader options that cover everything ``schema`` will dump.
+
+    Relationship fields on the schema (and on its nested schemas) become
+    ``selectinload``/``joinedload`` options so serialization never
+    lazy-loads.  ``extra`` maps relationship names to schemas the caller
+    dumps separately, e.g. ``workout_exercises=wes_schema``.
+    """
+    plan = _dump_plan(schema)
+    plan.update(extra)
+    return _loader_options(inspect(model), plan, 0)
@@ -0,0 +1,41 @@
+# server/migrate.py
+import click
+
+
+class LazyMigrateGroup(click.Group):
+    """``flask db`` that imports Flask-Migrate/Alembic only when it runs.
+
+    Alembic is the largest import in the app and only the migration
+    commands need it, so workers and other CLI commands skip it.  The first
+    invocation sets up Flask-Migrate exactly as ``Migrate(app, db)`` in
+    ``create_app`` used to, then hands over to its real group.
+    """
+
+    def __init__(self, app, db, directory="migrations"):
+        super().__init__("db", help="Perform database migrations.")
+        self.app = app
+        self.db = db
+        self.directory = directory
+        self._group = None
+
+    def _load(self):
+        if self._group is None:
+            from flask_migrate import Migrate
+            from flask_migrate.cli import db as group
+            Migrate(self.app, self.db, self.directory)
+            self._group = group
+        return self._group
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        # Parse and run with the real group, so its -d/-x options apply
+        return self._load().make_context(info_name, args, parent=parent, **extra)
+
+    def list_commands(self, ctx):
+        return self._load().list_commands(ctx)
+
+    def get_command(self, ctx, name):
+        return self._load().get_command(ctx, name)
+
+
+def init_app(app, db):
+    app.cli.add_command(LazyMigrateGroup(app, db))
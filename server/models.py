@@ -1,5 +1,5 @@
 from sqlalchemy.orm import validates, relationship
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Date, Text, CheckConstraint, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Date, DateTime, Text, CheckConstraint, UniqueConstraint, Index
 from server.db import db
 
 class Exercise(db.Model):
@@ -9,17 +9,32 @@ class Exercise(db.Model):
     category = Column(String, nullable=False)
     equipment_needed = Column(Boolean, nullable=False, default=False)
 
-    # Add overlaps to prevent SAWarnings
+    # Keyset pagination: filtered catalog pages are index range scans
+    __table_args__ = (
+        Index("ix_exercises_category_id", "category", "id"),
+        Index("ix_exercises_equipment_needed_id", "equipment_needed", "id"),
+    )
+
+    # Add overlaps to prevent SAWarnings.  Entries go with their exercise
+    # through ON DELETE CASCADE; passive_deletes keeps the ORM from loading them
     workout_exercises = relationship(
         "WorkoutExercise",
         back_populates="exercise",
-        overlaps="workouts,exercise"
+        overlaps="workouts,exercise",
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
     workouts = relationship(
         "Workout",
         secondary="workout_exercises",
         back_populates="exercises",
-        overlaps="workout_exercises,exercise"
+        overlaps="workout_exercises,exercise",
+        passive_deletes=True
+    )
+    archived_workouts = relationship(
+        "ArchivedWorkout",
+        secondary="workout_exercises_archive",
+        viewonly=True
     )
 
     @validates("name")
@@ -44,18 +59,27 @@ class Workout(db.Model):
 
     __table_args__ = (
         CheckConstraint("duration_minutes > 0", name="check_duration_positive"),
+        # Keyset pagination / date range filters on GET /workouts?order=date
+        Index("ix_workouts_date_id", "date", "id"),
+        # Ids are never reused, so they stay unique across the archive and
+        # export's since_id bound only moves forward
+        {"sqlite_autoincrement": True},
     )
 
+    # Entries go with their workout through ON DELETE CASCADE
     workout_exercises = relationship(
         "WorkoutExercise",
         back_populates="workout",
-        overlaps="exercises,workout"
+        overlaps="exercises,workout",
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
     exercises = relationship(
         "Exercise",
         secondary="workout_exercises",
         back_populates="workouts",
-        overlaps="workout_exercises,workout"
+        overlaps="workout_exercises,workout",
+        passive_deletes=True
     )
 
     @validates("duration_minutes")
@@ -68,17 +92,20 @@ class WorkoutExercise(db.Model):
     __tablename__ = "workout_exercises"
 
     id = Column(Integer, primary_key=True)
-    workout_id = Column(Integer, ForeignKey("workouts.id"), nullable=False)
-    exercise_id = Column(Integer, ForeignKey("exercises.id"), nullable=False)
+    workout_id = Column(Integer, ForeignKey("workouts.id", ondelete="CASCADE"), nullable=False)
+    exercise_id = Column(Integer, ForeignKey("exercises.id", ondelete="CASCADE"), nullable=False)
     reps = Column(Integer)
     sets = Column(Integer)
     duration_seconds = Column(Integer)
 
     __table_args__ = (
         UniqueConstraint("workout_id", "exercise_id", name="unique_workout_exercise"),
+        # /stats groups by exercise; the unique constraint only leads with workout_id
+        Index("ix_workout_exercises_exercise_id_workout_id", "exercise_id", "workout_id"),
         CheckConstraint("(reps >= 0) OR reps IS NULL", name="check_reps_non_negative"),
         CheckConstraint("(sets >= 0) OR sets IS NULL", name="check_sets_non_negative"),
         CheckConstraint("(duration_seconds >= 0) OR duration_seconds IS NULL", name="check_duration_non_negative"),
+        {"sqlite_autoincrement": True},
     )
 
     workout = relationship(
@@ -97,3 +124,98 @@ class WorkoutExercise(db.Model):
         if value is not None and value < 0:
             raise ValueError(f"{key} must be zero or positive.")
         return value
+
+# Workouts moved out of the hot tables by `flask archive` (server/archive.py).
+# Same columns and ids as workouts / workout_exercises; read-only otherwise
+class ArchivedWorkout(db.Model):
+    __tablename__ = "workouts_archive"
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    date = Column(Date, nullable=False)
+    duration_minutes = Column(Integer, nullable=False)
+    notes = Column(Text)
+
+    __table_args__ = (
+        Index("ix_workouts_archive_date_id", "date", "id"),
+    )
+
+    workout_exercises = relationship("ArchivedWorkoutExercise", back_populates="workout", viewonly=True)
+    exercises = relationship("Exercise", secondary="workout_exercises_archive", viewonly=True)
+
+class ArchivedWorkoutExercise(db.Model):
+    __tablename__ = "workout_exercises_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    workout_id = Column(Integer, ForeignKey("workouts_archive.id", ondelete="CASCADE"), nullable=False)
+    exercise_id = Column(Integer, ForeignKey("exercises.id", ondelete="CASCADE"), nullable=False)
+    reps = Column(Integer)
+    sets = Column(Integer)
+    duration_seconds = Column(Integer)
+
+    __table_args__ = (
+        Index("ix_workout_exercises_archive_workout_id", "workout_id"),
+        Index("ix_workout_exercises_archive_exercise_id_workout_id", "exercise_id", "workout_id"),
+    )
+
+    workout = relationship("ArchivedWorkout", back_populates="workout_exercises", viewonly=True)
+    exercise = relationship("Exercise", viewonly=True)
+
+# Version counter per table ("workouts"), row ("workouts:3"), set-based
+# statement ("workouts*") or own-rows-only ("workouts.rows") tag, bumped in
+# the committing transaction
+class ChangeVersion(db.Model):
+    __tablename__ = "change_versions"
+
+    tag = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False)
+
+# Tags changed by each commit, in commit order, for other processes to
+# replay (server/changes.py); ``origin`` identifies the committing process
+class ChangeLogEntry(db.Model):
+    __tablename__ = "change_log"
+
+    seq = Column(Integer, primary_key=True)
+    tags = Column(Text, nullable=False)
+    origin = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False, index=True)
+
+# Rollups of workouts / workout_exercises, kept current by server/rollups.py.
+# "workouts" counts distinct workouts, "volume" is sum(sets x reps)
+class DailyVolume(db.Model):
+    __tablename__ = "rollup_daily_volume"
+
+    day = Column(Date, primary_key=True)
+    workouts = Column(Integer, nullable=False, default=0)
+    duration_minutes = Column(Integer, nullable=False, default=0)
+    entries = Column(Integer, nullable=False, default=0)
+    sets = Column(Integer, nullable=False, default=0)
+    volume = Column(Integer, nullable=False, default=0)
+
+class WeeklyVolume(db.Model):
+    __tablename__ = "rollup_weekly_volume"
+
+    week_start = Column(Date, primary_key=True)     # Monday of the ISO week
+    workouts = Column(Integer, nullable=False, default=0)
+    duration_minutes = Column(Integer, nullable=False, default=0)
+    entries = Column(Integer, nullable=False, default=0)
+    sets = Column(Integer, nullable=False, default=0)
+    volume = Column(Integer, nullable=False, default=0)
+
+class CategoryDailyVolume(db.Model):
+    __tablename__ = "rollup_category_daily_volume"
+
+    day = Column(Date, primary_key=True)
+    category = Column(String, primary_key=True)
+    workouts = Column(Integer, nullable=False, default=0)
+    entries = Column(Integer, nullable=False, default=0)
+    duration_seconds = Column(Integer, nullable=False, default=0)
+    volume = Column(Integer, nullable=False, default=0)
+
+# Progress of a resumable `flask import` job, committed with each batch
+class ImportCheckpoint(db.Model):
+    __tablename__ = "import_checkpoints"
+
+    job = Column(String, primary_key=True)
+    records = Column(Integer, nullable=False, default=0)     # input records consumed
+    completed = Column(Boolean, nullable=False, default=False)
+    updated_at = Column(DateTime, nullable=False)
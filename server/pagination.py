@@ -0,0 +1,182 @@
+# server/pagination.py
+import base64
+import binascii
+import json
+from datetime import date
+
+from sqlalchemy import tuple_
+
+from server.models import Exercise, Workout
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+class PaginationError(ValueError):
+    """Raised for malformed paging/filter query parameters."""
+
+
+# -----------------------
+# QUERY PARAMETER PARSING
+# -----------------------
+def parse_limit(args, default=DEFAULT_LIMIT, maximum=MAX_LIMIT):
+    raw = args.get("limit")
+    if raw is None:
+        return default
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise PaginationError("limit must be an integer")
+    if limit < 1:
+        raise PaginationError("limit must be at least 1")
+    return min(limit, maximum)
+
+
+def parse_date(args, name):
+    raw = args.get(name)
+    if raw is None:
+        return None
+    try:
+        return date.fromisoformat(raw)
+    except ValueError:
+        raise PaginationError(f"{name} must be an ISO date (YYYY-MM-DD)")
+
+
+def parse_bool(args, name):
+    raw = args.get(name)
+    if raw is None:
+        return None
+    lowered = raw.lower()
+    if lowered in ("1", "true", "yes"):
+        return True
+    if lowered in ("0", "false", "no"):
+        return False
+    raise PaginationError(f"{name} must be true or false")
+
+
+# -----------------------
+# CURSORS
+# -----------------------
+def encode_cursor(values):
+    raw = json.dumps([v.isoformat() if isinstance(v, date) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, columns):
+    """Turn an opaque cursor back into python values for ``columns``."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise PaginationError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise PaginationError("Invalid cursor")
+
+    decoded = []
+    for column, value in zip(columns, values):
+        try:
+            if column.type.python_type is date:
+                value = date.fromisoformat(value)
+            elif not isinstance(value, column.type.python_type):
+                raise TypeError
+        except (TypeError, ValueError):
+            raise PaginationError("Invalid cursor")
+        decoded.append(value)
+    return decoded
+
+
+# -----------------------
+# LIST FILTERS
+# -----------------------
+def exercise_filters(args):
+    """SQL criteria and keyset columns for the GET /exercises query parameters."""
+    criteria = []
+    category = args.get("category")
+    if category is not None:
+        criteria.append(Exercise.category == category)
+    equipment_needed = parse_bool(args, "equipment_needed")
+    if equipment_needed is not None:
+        criteria.append(Exercise.equipment_needed == equipment_needed)
+    return criteria, [Exercise.id]
+
+
+def date_range(args, column=Workout.date):
+    """Criteria for the inclusive ``date_from``/``date_to`` filters on ``column``."""
+    criteria = []
+    date_from = parse_date(args, "date_from")
+    if date_from is not None:
+        criteria.append(column >= date_from)
+    date_to = parse_date(args, "date_to")
+    if date_to is not None:
+        criteria.append(column <= date_to)
+    return criteria
+
+
+def workout_filters(args, model=Workout):
+    """SQL criteria and keyset columns for the GET /workouts query parameters.
+
+    ``model`` is Workout or ArchivedWorkout (see server/archive.py).
+    """
+    criteria = date_range(args, model.date)
+
+    order = args.get("order", "id")
+    if order == "id":
+        columns = [model.id]
+    elif order == "date":
+        columns = [model.date, model.id]
+    else:
+        raise PaginationError("order must be 'id' or 'date'")
+    return criteria, columns
+
+
+# -----------------------
+# KEYSET PAGE
+# -----------------------
+def keyset_query(query, columns, cursor, limit):
+    """Restrict a Query or select() to the page after ``cursor``.
+
+    ``columns`` must end with a unique column (the primary key) so the
+    ordering is total.  Rows after ``cursor`` are selected with a row-value
+    comparison, which SQLite answers with an index range scan instead of
+    OFFSET.  One extra row is requested so split_page can tell whether
+    another page exists.
+    """
+    if cursor is not None:
+        values = decode_cursor(cursor, columns)
+        if len(columns) == 1:
+            query = query.filter(columns[0] > values[0])
+        else:
+            query = query.filter(tuple_(*columns) > tuple_(*values))
+    return query.order_by(*columns).limit(limit + 1)
+
+
+def split_page(rows, columns, limit):
+    """Return ``(rows, next_cursor)``; ``next_cursor`` is None on the last page."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, c.key) for c in columns])
+
+
+def keyset_page(query, columns, cursor, limit):
+    """Fetch one page of ``query`` ordered by ``columns``."""
+    rows = keyset_query(query, columns, cursor, limit).all()
+    return split_page(rows, columns, limit)
+
+
+def merged_keyset_page(sources, cursor, limit):
+    """keyset_page over several ``(query, columns)`` sources, as one ordering.
+
+    The sources must share column keys and types (e.g. the hot and archived
+    workouts tables).  Each yields at most ``limit + 1`` rows past the
+    cursor, which is enough to fill the merged page and tell whether
+    another follows.
+    """
+    if len(sources) == 1:
+        return keyset_page(*sources[0], cursor, limit)
+    rows = []
+    for query, columns in sources:
+        rows += keyset_query(query, columns, cursor, limit).all()
+    rows.sort(key=lambda row: tuple(getattr(row, c.key) for c in columns))
+    return split_page(rows, columns, limit)
@@ -0,0 +1,76 @@
+# server/projection.py
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+
+
+class ProjectionError(ValueError):
+    """Raised for a ?fields= / ?expand= value naming unknown fields."""
+
+
+def _names(args, key):
+    raw = args.get(key)
+    if raw is None:
+        return None
+    return [name.strip() for name in raw.split(",") if name.strip()]
+
+
+class FieldSelector:
+    """``?fields=`` / ``?expand=`` for one resource's schema.
+
+    ``fields`` picks the fields to return and ``expand`` the nested
+    relationships (``relationships``) to embed.  Without either a route
+    keeps its full shape; with ``fields`` alone nothing is embedded, and
+    with ``expand`` alone every plain field is returned plus the listed
+    relationships.
+
+    Each combination maps onto a marshmallow ``only=`` schema, built with
+    ``factory`` (e.g. the compiler) on first use and cached; there are at
+    most 2**fields of them since unknown names are rejected.  The same
+    names give the ``load_only`` column list, and ``eager_options`` on the
+    narrowed schema leaves out every relationship it no longer dumps.
+    """
+
+    def __init__(self, schema_class, relationships, factory=lambda schema: schema):
+        self.schema_class = schema_class
+        self.relationships = tuple(relationships)
+        self.factory = factory
+        self.names = tuple(schema_class().dump_fields)
+        self._schemas = {}
+
+    def parse(self, args):
+        """The field names to dump, or None for the full shape."""
+        fields = _names(args, "fields")
+        expand = _names(args, "expand")
+        if fields is None and expand is None:
+            return None
+        if fields is None:
+            fields = [name for name in self.names if name not in self.relationships]
+        unknown = [name for name in fields if name not in self.names]
+        if unknown:
+            raise ProjectionError(f"Unknown fields: {', '.join(unknown)}; choose from {', '.join(self.names)}")
+        unknown = [name for name in expand or () if name not in self.relationships]
+        if unknown:
+            raise ProjectionError(f"Cannot expand: {', '.join(unknown)}; choose from {', '.join(self.relationships)}")
+        return frozenset(fields) | frozenset(expand or ())
+
+    def schema(self, only, many=False):
+        """The cached schema dumping just ``only``."""
+        key = (only, many)
+        schema = self._schemas.get(key)
+        if schema is None:
+            fields = tuple(name for name in self.names if name in only)
+            schema = self._schemas[key] = self.factory(self.schema_class(only=fields, many=many))
+        return schema
+
+    def column_options(self, model, only, always=()):
+        """``load_only`` for the columns of ``model`` among ``only``.
+
+        ``always`` adds columns the query needs regardless, such as keyset
+        ordering columns.  The primary key is always loaded.
+        """
+        if only is None:
+            return []
+        mapper = inspect(model)
+        columns = [getattr(model, name) for name in only if name in mapper.column_attrs]
+        columns += [column for column in always if column.key not in only]
+        return [load_only(*(columns or [getattr(model, mapper.primary_key[0].key)]))]
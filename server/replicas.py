@@ -0,0 +1,141 @@
+# server/replicas.py
+import itertools
+import os
+import time
+
+from flask import current_app, request
+from sqlalchemy import create_engine
+from werkzeug.http import dump_cookie
+
+from server.db import db, READ_ENGINE_KEY
+from server.engine import is_sqlite, sqlite_pragmas, apply_sqlite_pragmas
+from server.versions import versions_statement
+
+READ_METHODS = ("GET", "HEAD")
+
+# "X-Read-Consistency: primary" sends one read to the primary
+CONSISTENCY_HEADER = "X-Read-Consistency"
+
+# Set by writes; reads stay on the primary until the time it holds
+STICKY_COOKIE = "read_primary_until"
+
+# request.environ flag for reads kept on the primary by the staleness policy
+PINNED_KEY = "server.read_pinned"
+
+
+def replica_urls(value):
+    """A list of URLs from a list or a comma-separated string."""
+    if isinstance(value, str):
+        return [url.strip() for url in value.split(",") if url.strip()]
+    return list(value or ())
+
+
+def replica_pragmas(config):
+    # journal_mode is the primary's to set; query_only rejects stray writes
+    pragmas = {k: v for k, v in sqlite_pragmas(config).items() if k != "journal_mode"}
+    return {**pragmas, "query_only": "ON"}
+
+
+def reads_from_replica(method, consistency=None, sticky_until=None, now=None):
+    """Whether a request may be served by a replica.
+
+    Writes use the primary, and so do reads asking for
+    ``X-Read-Consistency: primary`` or sent before the client's sticky
+    cookie expires (read-your-writes).
+    """
+    if method not in READ_METHODS or (consistency or "").strip().lower() == "primary":
+        return False
+    try:
+        until = float(sticky_until or 0)
+    except ValueError:
+        until = 0
+    return until <= (now if now is not None else time.time())
+
+
+def read_from_replica():
+    """Whether this request's reads go to a replica."""
+    return READ_ENGINE_KEY in request.environ
+
+
+def pinned_to_primary():
+    """Whether this read was kept on the primary to see the client's writes."""
+    return request.environ.get(PINNED_KEY, False)
+
+
+def replica_current(tags):
+    """Whether this request's replica has every commit the primary has on ``tags``.
+
+    Compares the ``change_versions`` rows on both sides (a primary-key
+    lookup each); without version tracking there is nothing to compare.
+    """
+    if not current_app.config["TRACK_VERSIONS"]:
+        return False
+    stmt = versions_statement(tags)
+    replica = {tag: version for tag, version, _ in db.session.execute(stmt)}
+    primary = {tag: version for tag, version, _ in db.session.execute(stmt, bind_arguments={"bind": db.engine})}
+    return replica == primary
+
+
+def sticky_cookie(seconds, now=None):
+    """``Set-Cookie`` value keeping the client's reads on the primary for ``seconds``."""
+    until = (now if now is not None else time.time()) + seconds
+    return dump_cookie(STICKY_COOKIE, f"{until:.3f}", max_age=seconds, httponly=True)
+
+
+class ReadReplicas:
+    """Serves GET requests from read-only engines.
+
+    ``SQLALCHEMY_REPLICA_URIS`` (or ``DATABASE_REPLICA_URLS``, comma
+    separated) lists them: a replica's URL, or a read-only connection to
+    the primary's own WAL file (``sqlite:///file:/path/app.db?mode=ro&uri=true``),
+    which moves reads off the primary's pool.  Requests are spread round
+    robin; ``db.session`` picks the engine up per request (server/db.py).
+
+    Staleness policy: a successful write sets a cookie that keeps that
+    client's reads on the primary for ``REPLICA_STICKY_SECONDS``, and
+    ``X-Read-Consistency: primary`` does the same for one request.  Other
+    reads accept whatever lag the replica has.  The response cache only
+    stores replica reads that are caught up (see server/cache.py), and
+    pinned reads skip it.
+    """
+
+    def __init__(self, app=None):
+        self.engines = []
+        self._next = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("SQLALCHEMY_REPLICA_URIS", os.environ.get("DATABASE_REPLICA_URLS", ""))
+        app.config.setdefault("REPLICA_STICKY_SECONDS", 5)
+
+        self.urls = replica_urls(app.config["SQLALCHEMY_REPLICA_URIS"])
+        self.sticky_seconds = app.config["REPLICA_STICKY_SECONDS"]
+        options = app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {})
+        self.engines = []
+        for url in self.urls:
+            engine = create_engine(url, **options)
+            if is_sqlite(engine.url):
+                apply_sqlite_pragmas(engine, replica_pragmas(app.config))
+            self.engines.append(engine)
+        app.extensions["read_replicas"] = self
+        if self.engines:
+            self._next = itertools.cycle(self.engines).__next__
+            app.before_request(self._route)
+            app.after_request(self._stick)
+
+    def _route(self):
+        if reads_from_replica(request.method, request.headers.get(CONSISTENCY_HEADER),
+                              request.cookies.get(STICKY_COOKIE)):
+            request.environ[READ_ENGINE_KEY] = self._next()
+        elif request.method in READ_METHODS:
+            request.environ[PINNED_KEY] = True
+
+    def _stick(self, resp):
+        if request.method not in READ_METHODS and resp.status_code < 400 and self.sticky_seconds:
+            resp.headers.add("Set-Cookie", sticky_cookie(self.sticky_seconds))
+        return resp
+
+    def dispose(self):
+        for engine in self.engines:
+            engine.dispose()
@@ -0,0 +1,340 @@
+# server/rollups.py
+from datetime import timedelta
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import delete, event, func, insert, inspect, select
+from sqlalchemy.orm import Session
+
+from server.archive import HOT, ARCHIVE, partitions
+from server.db import db
+from server.models import (
+    Exercise, Workout, WorkoutExercise, ArchivedWorkout, DailyVolume, WeeklyVolume, CategoryDailyVolume,
+)
+from server.stats import volume, week_start
+from server.versions import session_setting
+
+# Raw tables the rollups are derived from
+SOURCE_TABLES = {Exercise.__tablename__} | {
+    model.__tablename__ for part in (HOT, ARCHIVE) for model in (part.workouts, part.entries)
+}
+
+# Keeps IN (...) lists well under SQLite's bound-parameter limit
+CHUNK_SIZE = 500
+
+DAILY_FIELDS = ("workouts", "duration_minutes", "entries", "sets", "volume")
+CATEGORY_FIELDS = ("workouts", "entries", "duration_seconds", "volume")
+
+
+def monday(day):
+    return day - timedelta(days=day.weekday())
+
+
+def _chunks(values):
+    values = sorted(values)
+    for i in range(0, len(values), CHUNK_SIZE):
+        yield values[i:i + CHUNK_SIZE]
+
+
+# -----------------------
+# AGGREGATION FROM RAW ROWS
+# -----------------------
+def daily_rows(session, days):
+    """Fresh rollup_daily_volume rows for ``days``, computed from the raw tables.
+
+    Hot and archived workouts both count; each partition is grouped on its
+    own and the days added up.
+    """
+    rows = {}
+    for part in partitions(session, min(days)):
+        workouts, entries = part.workouts, part.entries
+        for day, count, minutes in session.execute(
+            select(workouts.date, func.count(workouts.id), func.sum(workouts.duration_minutes))
+            .where(workouts.date.in_(days)).group_by(workouts.date)
+        ):
+            row = rows.setdefault(day, {"day": day, **dict.fromkeys(DAILY_FIELDS, 0)})
+            row["workouts"] += count
+            row["duration_minutes"] += minutes
+        for day, count, sets, total in session.execute(
+            select(workouts.date, func.count(entries.id),
+                   func.sum(func.coalesce(entries.sets, 0)), func.sum(volume(entries)))
+            .join(entries.workout).where(workouts.date.in_(days)).group_by(workouts.date)
+        ):
+            row = rows[day]
+            row["entries"] += count
+            row["sets"] += sets
+            row["volume"] += total
+    return list(rows.values())
+
+
+def category_rows(session, days):
+    """Fresh rollup_category_daily_volume rows for ``days``."""
+    rows = {}
+    for part in partitions(session, min(days)):
+        workouts, entries = part.workouts, part.entries
+        stmt = (
+            select(
+                workouts.date,
+                Exercise.category,
+                func.count(func.distinct(entries.workout_id)),
+                func.count(entries.id),
+                func.sum(func.coalesce(entries.duration_seconds, 0)),
+                func.sum(volume(entries)),
+            )
+            .join(entries.exercise)
+            .join(entries.workout)
+            .where(workouts.date.in_(days))
+            .group_by(workouts.date, Exercise.category)
+        )
+        for day, category, *values in session.execute(stmt):
+            row = rows.setdefault((day, category), {"day": day, "category": category,
+                                                    **dict.fromkeys(CATEGORY_FIELDS, 0)})
+            for field, value in zip(CATEGORY_FIELDS, values):
+                row[field] += value
+    return list(rows.values())
+
+
+def workout_days(session):
+    """Every date with a workout, hot or archived."""
+    days = set()
+    for part in partitions(session):
+        days.update(session.scalars(select(part.workouts.date).distinct()))
+    return days
+
+
+def weekly_rows(daily):
+    """Sum daily rows into rollup_weekly_volume rows."""
+    weeks = {}
+    for row in daily:
+        start = monday(row["day"])
+        week = weeks.setdefault(start, {"week_start": start, **dict.fromkeys(DAILY_FIELDS, 0)})
+        for field in DAILY_FIELDS:
+            week[field] += row[field]
+    return list(weeks.values())
+
+
+# -----------------------
+# REFRESH / REBUILD
+# -----------------------
+def refresh_days(session, days):
+    """Recompute the rollup rows for ``days`` and the weeks containing them."""
+    for chunk in _chunks(days):
+        session.execute(delete(DailyVolume).where(DailyVolume.day.in_(chunk)))
+        session.execute(delete(CategoryDailyVolume).where(CategoryDailyVolume.day.in_(chunk)))
+        rows = daily_rows(session, chunk)
+        if rows:
+            session.execute(insert(DailyVolume), rows)
+        rows = category_rows(session, chunk)
+        if rows:
+            session.execute(insert(CategoryDailyVolume), rows)
+
+    # Weeks are re-summed from the (already refreshed) daily rows
+    week = week_start(DailyVolume.day, session.get_bind().dialect.name)
+    for chunk in _chunks({monday(day) for day in days}):
+        session.execute(delete(WeeklyVolume).where(WeeklyVolume.week_start.in_(chunk)))
+        spans = [start + timedelta(days=i) for start in chunk for i in range(7)]
+        rows = [
+            {"week_start": start, **dict(zip(DAILY_FIELDS, totals))}
+            for start, *totals in session.execute(
+                select(week, *(func.sum(getattr(DailyVolume, f)) for f in DAILY_FIELDS))
+                .where(DailyVolume.day.in_(spans)).group_by(week)
+            )
+        ]
+        if rows:
+            session.execute(insert(WeeklyVolume), rows)
+
+
+def rebuild_rollups(session):
+    """Drop every rollup row and recompute them all from the raw tables."""
+    for model in (DailyVolume, WeeklyVolume, CategoryDailyVolume):
+        session.execute(delete(model))
+    refresh_days(session, workout_days(session))
+
+
+def check_rollups(session):
+    """Compare the stored rollups with the raw tables.
+
+    Returns ``(table, key, expected, actual)`` for every row that differs;
+    an empty list means the rollups are consistent.
+    """
+    days = workout_days(session)
+    daily = []
+    categories = []
+    for chunk in _chunks(days):
+        daily += daily_rows(session, chunk)
+        categories += category_rows(session, chunk)
+
+    checks = [
+        (DailyVolume, ("day",), DAILY_FIELDS, daily),
+        (WeeklyVolume, ("week_start",), DAILY_FIELDS, weekly_rows(daily)),
+        (CategoryDailyVolume, ("day", "category"), CATEGORY_FIELDS, categories),
+    ]
+    problems = []
+    for model, key_fields, fields, rows in checks:
+        expected = {tuple(row[k] for k in key_fields): tuple(row[f] for f in fields) for row in rows}
+        actual = {
+            tuple(getattr(obj, k) for k in key_fields): tuple(getattr(obj, f) for f in fields)
+            for obj in session.scalars(select(model))
+        }
+        for key in sorted(expected.keys() | actual.keys()):
+            if expected.get(key) != actual.get(key):
+                problems.append((model.__tablename__, key, expected.get(key), actual.get(key)))
+    return problems
+
+
+# -----------------------
+# SESSION HOOKS
+# -----------------------
+def _pending(session):
+    return session.info.setdefault("rollup_days", set())
+
+
+def _history(obj, attr):
+    """Current and pre-flush values of ``attr``, loading it if expired."""
+    history = inspect(obj).attrs[attr].load_history()
+    return [v for v in (*history.added, *history.unchanged, *history.deleted) if v is not None]
+
+
+def _before_flush(session, flush_context, instances):
+    days = _pending(session)
+    workout_ids = set()
+    exercise_ids = set()
+    for obj in [*session.new, *session.dirty, *session.deleted]:
+        if isinstance(obj, (Workout, ArchivedWorkout)):
+            days.update(_history(obj, "date"))
+        elif isinstance(obj, WorkoutExercise):
+            ids = _history(obj, "workout_id")
+            if not ids and obj.workout is not None:
+                # Linked through the relationship; the FK is set during the flush
+                days.update(_history(obj.workout, "date"))
+            workout_ids.update(ids)
+        elif isinstance(obj, Exercise) and obj not in session.new:
+            if obj in session.deleted or inspect(obj).attrs.category.history.has_changes():
+                exercise_ids.add(obj.id)
+
+    # Autoflush is off inside a flush, so these see the pre-flush rows
+    if workout_ids:
+        days.update(session.scalars(select(Workout.date).where(Workout.id.in_(workout_ids))))
+    if exercise_ids:
+        for part in partitions(session):
+            days.update(session.scalars(
+                select(part.workouts.date).join(part.entries.workout)
+                .where(part.entries.exercise_id.in_(exercise_ids))
+            ))
+
+
+def _deleted_days(session, stmt):
+    """Workout dates a DELETE will touch, read before it runs.
+
+    Returns None for an unfiltered DELETE, which is cheaper to follow with
+    a rebuild.
+    """
+    where = stmt.whereclause
+    if where is None:
+        return None
+    table = stmt.table.name
+    for part in (HOT, ARCHIVE):
+        workouts, entries = part.workouts, part.entries
+        if table == workouts.__tablename__:
+            return set(session.scalars(select(workouts.date).where(where).distinct()))
+        if table == entries.__tablename__:
+            return set(session.scalars(select(workouts.date).join(entries.workout).where(where).distinct()))
+    # Exercises: their entries go too (ON DELETE CASCADE), in every partition
+    days = set()
+    for part in partitions(session):
+        days.update(session.scalars(
+            select(part.workouts.date).join(part.entries.workout)
+            .where(part.entries.exercise_id.in_(select(Exercise.id).where(where))).distinct()
+        ))
+    return days
+
+
+def _do_orm_execute(orm_execute_state):
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    table = orm_execute_state.statement.table.name
+    if table not in SOURCE_TABLES:
+        return
+    session = orm_execute_state.session
+    if not session_setting(session, "rollups_enabled", False):
+        return
+    params = orm_execute_state.parameters
+    rows = params if isinstance(params, list) else [params or {}]
+
+    # Batch inserts list their rows and filtered deletes can be previewed;
+    # anything else touches unknown rows
+    if orm_execute_state.is_insert and table == Workout.__tablename__:
+        _pending(session).update(row["date"] for row in rows)
+    elif orm_execute_state.is_insert and table == WorkoutExercise.__tablename__:
+        ids = {row["workout_id"] for row in rows}
+        _pending(session).update(session.scalars(select(Workout.date).where(Workout.id.in_(ids))))
+    elif orm_execute_state.is_delete:
+        days = _deleted_days(session, orm_execute_state.statement)
+        if days is None:
+            session.info["rollup_rebuild"] = True
+        else:
+            _pending(session).update(days)
+    elif not (orm_execute_state.is_insert and table == Exercise.__tablename__):
+        session.info["rollup_rebuild"] = True
+
+
+def _before_commit(session):
+    session.flush()
+    days = session.info.pop("rollup_days", None)
+    rebuild = session.info.pop("rollup_rebuild", False)
+    if not session_setting(session, "rollups_enabled", False):
+        return
+    if rebuild:
+        rebuild_rollups(session)
+    elif days:
+        refresh_days(session, days)
+
+
+def _after_rollback(session):
+    session.info.pop("rollup_days", None)
+    session.info.pop("rollup_rebuild", None)
+
+
+_hooks_installed = False
+
+
+def install_session_hooks():
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    event.listen(Session, "before_flush", _before_flush)
+    event.listen(Session, "do_orm_execute", _do_orm_execute)
+    event.listen(Session, "before_commit", _before_commit)
+    event.listen(Session, "after_rollback", _after_rollback)
+    _hooks_installed = True
+
+
+# -----------------------
+# CLI
+# -----------------------
+rollups_cli = AppGroup("rollups", help="Maintain the stats rollup tables.")
+
+
+@rollups_cli.command("rebuild")
+def rebuild_command():
+    """Recompute every rollup row from the raw tables."""
+    rebuild_rollups(db.session)
+    db.session.commit()
+    click.echo("Rollups rebuilt.")
+
+
+@rollups_cli.command("check")
+def check_command():
+    """Report rollup rows that disagree with the raw tables."""
+    problems = check_rollups(db.session)
+    for table, key, expected, actual in problems:
+        click.echo(f"{table} {key}: expected {expected}, found {actual}")
+    if problems:
+        raise SystemExit(1)
+    click.echo("Rollups are consistent.")
+
+
+def init_app(app):
+    app.config.setdefault("ROLLUPS_ENABLED", True)
+    app.cli.add_command(rollups_cli)
+    install_session_hooks()
@@ -58,3 +58,13 @@ class WorkoutExerciseSchema(Schema):
                 "Must provide at least one of reps, sets, or duration_seconds"
             )
         return data
+
+# -----------------------
+# SEARCH RESULT SCHEMA
+# -----------------------
+class SearchResultSchema(Schema):
+    type = fields.Str(attribute="kind")
+    id = fields.Int()
+    text = fields.Str(allow_none=True)
+    # BM25 score; lower is a better match
+    rank = fields.Float()
@@ -0,0 +1,148 @@
+# server/search.py
+from sqlalchemy import DDL, Float, Integer, String, event, func, literal, literal_column, select, union_all
+from sqlalchemy import column as sql_column, table as sql_table
+
+from server.archive import ARCHIVE, partitions
+from server.db import db
+from server.models import Exercise, Workout, ArchivedWorkout
+from server.pagination import PaginationError, keyset_query, parse_limit, split_page
+
+# Trigram tokens match any substring of three or more characters
+MIN_TERM_LENGTH = 3
+
+# Result type -> (FTS5 table, model, indexed column).  The FTS tables are
+# external-content indexes over exercises.name and workouts.notes, kept in
+# sync by triggers so ORM, batch and raw SQL writes are all indexed.
+# Requires SQLite 3.34+ (trigram tokenizer).
+SOURCES = {
+    "exercise": ("exercises_fts", Exercise, "name"),
+    "workout": ("workouts_fts", Workout, "notes"),
+}
+
+# Archived workouts have their own index; archiving deletes the hot rows,
+# whose trigger drops them from workouts_fts (see server/archive.py)
+ARCHIVE_SOURCES = {
+    "workout": ("workouts_archive_fts", ArchivedWorkout, "notes"),
+}
+
+
+def fts_ddl(fts, source, col):
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({col}, content='{source}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {source} BEGIN "
+        f"INSERT INTO {fts}(rowid, {col}) VALUES (new.id, new.{col}); END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {source} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {col}) VALUES ('delete', old.id, old.{col}); END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {col} ON {source} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {col}) VALUES ('delete', old.id, old.{col}); "
+        f"INSERT INTO {fts}(rowid, {col}) VALUES (new.id, new.{col}); END",
+    ]
+
+
+# -----------------------
+# QUERY PARSING
+# -----------------------
+def parse_query(args):
+    """Return the search terms of ``?q=``; each must be at least 3 characters."""
+    terms = (args.get("q") or "").split()
+    if not terms:
+        raise PaginationError("q is required")
+    if any(len(term) < MIN_TERM_LENGTH for term in terms):
+        raise PaginationError(f"search terms must be at least {MIN_TERM_LENGTH} characters")
+    return terms
+
+
+def parse_kinds(args):
+    kind = args.get("type")
+    if kind is None:
+        return tuple(SOURCES)
+    if kind not in SOURCES:
+        raise PaginationError("type must be 'exercise' or 'workout'")
+    return (kind,)
+
+
+def match_expression(terms):
+    # Every term quoted as a phrase: substring match, implicit AND, and no
+    # FTS5 query syntax leaking in from user input
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+# -----------------------
+# SEARCH
+# -----------------------
+def _fts_branch(kind, fts, col, match):
+    index = sql_table(fts, sql_column("rowid", Integer), sql_column(col, String))
+    return (
+        select(
+            func.bm25(literal_column(fts), type_=Float).label("rank"),
+            literal(kind, String).label("kind"),
+            index.c.rowid.label("id"),
+            index.c[col].label("text"),
+        )
+        .where(literal_column(fts).op("MATCH")(match))
+    )
+
+
+def _like_branch(kind, model, col, terms):
+    attr = getattr(model, col)
+    return (
+        select(
+            literal(0.0, Float).label("rank"),
+            literal(kind, String).label("kind"),
+            model.id.label("id"),
+            attr.label("text"),
+        )
+        .where(*(attr.ilike(f"%{term}%") for term in terms))
+    )
+
+
+def search(args):
+    """One page of ``(rank, kind, id, text)`` rows and the next cursor.
+
+    On SQLite the FTS5 tables answer the query and rows are ordered by
+    BM25 (lower is better).  Other databases fall back to an unranked
+    ILIKE scan.  Ties, and the cursor, are broken on (kind, id).
+    """
+    terms = parse_query(args)
+    kinds = parse_kinds(args)
+    limit = parse_limit(args)
+
+    # Ids are unique across partitions, so (kind, id) still breaks ties
+    sources = [(kind, SOURCES[kind]) for kind in kinds]
+    if "workout" in kinds and ARCHIVE in partitions(db.session):
+        sources.append(("workout", ARCHIVE_SOURCES["workout"]))
+
+    if db.session.get_bind().dialect.name == "sqlite":
+        match = match_expression(terms)
+        branches = [_fts_branch(kind, fts, col, match) for kind, (fts, _, col) in sources]
+    else:
+        branches = [_like_branch(kind, model, col, terms) for kind, (_, model, col) in sources]
+    results = union_all(*branches).subquery() if len(branches) > 1 else branches[0].subquery()
+    columns = [results.c.rank, results.c.kind, results.c.id]
+
+    stmt = keyset_query(select(results), columns, args.get("cursor"), limit)
+    return split_page(db.session.execute(stmt).all(), columns, limit)
+
+
+# -----------------------
+# SCHEMA
+# -----------------------
+_ddl_installed = False
+
+
+def install_ddl():
+    """Create (and drop) the FTS tables alongside their source tables."""
+    global _ddl_installed
+    if _ddl_installed:
+        return
+    for fts, model, col in [*SOURCES.values(), *ARCHIVE_SOURCES.values()]:
+        for statement in fts_ddl(fts, model.__tablename__, col):
+            event.listen(model.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+        event.listen(
+            model.__table__, "before_drop", DDL(f"DROP TABLE IF EXISTS {fts}").execute_if(dialect="sqlite")
+        )
+    _ddl_installed = True
+
+
+def init_app(app):
+    install_ddl()
@@ -0,0 +1,168 @@
+# server/serializers.py
+import re
+from collections.abc import Mapping
+
+from flask.json.provider import DefaultJSONProvider
+from marshmallow import fields
+from marshmallow.utils import missing as missing_
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is used instead
+    orjson = None
+
+_DUMP_HOOKS = ("pre_dump", "post_dump")
+
+# Exponent notation differs between encoders; matching text inside strings
+# merely falls back to the stdlib
+_EXPONENT = re.compile(rb"\d[eE][+-]?\d")
+
+
+class UnsupportedSchema(Exception):
+    """The schema uses a feature the compiler does not reproduce exactly."""
+
+
+# -----------------------
+# SCHEMA COMPILER
+# -----------------------
+def _bool(value, truthy=fields.Boolean.truthy, falsy=fields.Boolean.falsy):
+    # Mirrors fields.Boolean._serialize
+    try:
+        if value in truthy:
+            return True
+        if value in falsy:
+            return False
+    except TypeError:
+        pass
+    return bool(value)
+
+
+def _converter(field, env, slot, depth):
+    """Return an expression that formats a non-None ``v`` like ``field`` does."""
+    if isinstance(field, fields.List):
+        if not isinstance(field.inner, fields.Nested):
+            raise UnsupportedSchema(f"List of {type(field.inner).__name__}")
+        env[f"nested_{slot}"] = _compile(field.inner.schema, depth + 1)
+        return f"[nested_{slot}(x) for x in v]"
+    if isinstance(field, fields.Nested):
+        env[f"nested_{slot}"] = _compile(field.schema, depth + 1)
+        if field.many:
+            return f"[nested_{slot}(x) for x in v]"
+        return f"nested_{slot}(v)"
+    if isinstance(field, fields.Date):
+        if (field.format or "iso") != "iso":
+            raise UnsupportedSchema(f"Date format {field.format!r}")
+        return "v.isoformat()"
+    if isinstance(field, fields.Boolean):
+        return "_bool(v)"
+    if type(field) is fields.Integer and not field.as_string:
+        return "int(v)"
+    if type(field) is fields.String:
+        return "v if type(v) is str else str(v)"
+    raise UnsupportedSchema(f"field type {type(field).__name__}")
+
+
+def _compile(schema, depth=0):
+    if depth > 8:
+        raise UnsupportedSchema("nesting too deep")
+    if any(schema._has_processors(tag) for tag in _DUMP_HOOKS):
+        raise UnsupportedSchema("pre_dump/post_dump hooks")
+
+    env = {"missing": missing_, "_bool": _bool}
+    lines = ["def dump(obj):", "    out = {}"]
+    for slot, (name, field) in enumerate(schema.dump_fields.items()):
+        attr = field.attribute or name
+        if "." in attr or field.dump_default is not missing_:
+            raise UnsupportedSchema(f"field {name!r}")
+        key = field.data_key or name
+        lines += [
+            f"    v = getattr(obj, {attr!r}, missing)",
+            "    if v is not missing:",
+            f"        out[{key!r}] = None if v is None else {_converter(field, env, slot, depth)}",
+        ]
+    lines.append("    return out")
+    exec("\n".join(lines), env)
+    return env["dump"]
+
+
+class CompiledSchema:
+    """Drop-in for a marshmallow schema with a generated ``dump``.
+
+    The dump shape (fields, ``only``/``exclude``, nested schemas) is turned
+    into one straight-line function per schema, so dumping skips
+    marshmallow's per-field dispatch.  Mappings and everything else
+    (``load``, ``dump_fields`` ...) go to the wrapped schema.
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        self._dump_one = _compile(schema)
+
+    def dump(self, obj, *, many=None):
+        many = self.schema.many if many is None else many
+        if many:
+            dump_one = self._dump_one
+            return [self.schema.dump(o, many=False) if isinstance(o, Mapping) else dump_one(o)
+                    for o in obj]
+        if isinstance(obj, Mapping):
+            return self.schema.dump(obj, many=False)
+        return self._dump_one(obj)
+
+    def __getattr__(self, name):
+        return getattr(self.schema, name)
+
+
+def compiled(schema):
+    """Wrap ``schema`` in a CompiledSchema, or return it as-is if unsupported."""
+    try:
+        return CompiledSchema(schema)
+    except UnsupportedSchema:
+        return schema
+
+
+class LazySchema:
+    """Builds its schema with ``build()`` on first use.
+
+    For schemas only a few routes need, so app startup does not pay for
+    constructing and compiling them.  Two threads racing on first use may
+    both build; either result is equivalent.
+    """
+
+    def __init__(self, build):
+        self._build = build
+        self._schema = None
+
+    def __getattr__(self, name):
+        schema = self._schema
+        if schema is None:
+            schema = self._schema = self._build()
+        return getattr(schema, name)
+
+
+# -----------------------
+# JSON PROVIDER
+# -----------------------
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes compact output with orjson.
+
+    orjson's result is only used where it matches the stdlib encoder byte
+    for byte: compact separators, pure-ASCII output (the stdlib escapes
+    everything else) and no exponent-form floats (``1e16`` vs ``1e+16``).
+    Dates and other non-native types still go through Flask's default hook.
+    Non-finite floats are the one divergence (``null`` instead of ``NaN``);
+    none of our schemas dump floats.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and kwargs.get("indent") is None \
+                and kwargs.get("separators") == (",", ":"):
+            option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+            if kwargs.get("sort_keys", self.sort_keys):
+                option |= orjson.OPT_SORT_KEYS
+            try:
+                raw = orjson.dumps(obj, default=kwargs.get("default", self.default), option=option)
+            except (orjson.JSONEncodeError, TypeError):
+                raw = None
+            if raw is not None and raw.isascii() and not _EXPONENT.search(raw):
+                return raw.decode()
+        return super().dumps(obj, **kwargs)
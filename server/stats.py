@@ -0,0 +1,227 @@
+# server/stats.py
+from flask import current_app
+from sqlalchemy import Date, cast, func, select
+
+from server.archive import partitions
+from server.db import db
+from server.models import Exercise, WorkoutExercise, WeeklyVolume, DailyVolume, CategoryDailyVolume
+from server.pagination import date_range, parse_date, parse_limit
+
+DEFAULT_TOP = 10
+MAX_TOP = 100
+
+
+def volume(entries=WorkoutExercise):
+    """sets x reps; rows that only log a duration count as zero volume."""
+    return func.coalesce(entries.sets, 0) * func.coalesce(entries.reps, 0)
+
+
+# -----------------------
+# HELPERS
+# -----------------------
+def week_start(column, dialect):
+    """SQL expression for the Monday of ``column``'s ISO week."""
+    if dialect == "sqlite":
+        # Forward to Sunday (or stay), then back six days
+        return func.date(column, "weekday 0", "-6 days", type_=Date)
+    if dialect == "postgresql":
+        return cast(func.date_trunc("week", column), Date)
+    if dialect in ("mysql", "mariadb"):
+        return func.subdate(column, func.weekday(column), type_=Date)
+    raise NotImplementedError(f"week buckets are not supported on {dialect}")
+
+
+def iso_week(day):
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def routed(args):
+    """Partitions (server/archive.py) holding workouts in the args' date range."""
+    return partitions(db.session, parse_date(args, "date_from"))
+
+
+def _max(*values):
+    values = [v for v in values if v is not None]
+    return max(values) if values else None
+
+
+# -----------------------
+# AGGREGATES
+# -----------------------
+def use_rollups():
+    return current_app.config.get("ROLLUPS_ENABLED", False)
+
+
+def week_row(start, workouts, minutes, sets, volume):
+    return {
+        "week": iso_week(start),
+        "week_start": start.isoformat(),
+        "workouts": workouts,
+        "duration_minutes": minutes,
+        "sets": sets,
+        "volume": volume,
+    }
+
+
+def weekly_volume(args):
+    """Workouts, minutes and sets x reps per ISO week, oldest first.
+
+    Read from the rollup tables (server/rollups.py) when they are enabled:
+    whole history comes straight from rollup_weekly_volume, a date range
+    re-buckets the matching rollup_daily_volume rows.
+    """
+    if not use_rollups():
+        return raw_weekly_volume(args)
+    criteria = date_range(args, DailyVolume.day)
+    if not criteria:
+        stmt = select(
+            WeeklyVolume.week_start, WeeklyVolume.workouts, WeeklyVolume.duration_minutes,
+            WeeklyVolume.sets, WeeklyVolume.volume,
+        ).order_by(WeeklyVolume.week_start)
+    else:
+        week = week_start(DailyVolume.day, db.session.get_bind().dialect.name).label("week_start")
+        stmt = (
+            select(week, func.sum(DailyVolume.workouts), func.sum(DailyVolume.duration_minutes),
+                   func.sum(DailyVolume.sets), func.sum(DailyVolume.volume))
+            .where(*criteria).group_by(week).order_by(week)
+        )
+    return [week_row(*row) for row in db.session.execute(stmt)]
+
+
+def raw_weekly_volume(args):
+    """weekly_volume computed from workouts / workout_exercises.
+
+    Workout totals and exercise volume are grouped separately so a workout
+    with several exercises is not counted (or its minutes summed) twice.
+    Each partition is grouped on its own and the weeks added up.
+    """
+    dialect = db.session.get_bind().dialect.name
+    weeks = {}
+    for part in routed(args):
+        workouts, entries = part.workouts, part.entries
+        criteria = date_range(args, workouts.date)
+        week = week_start(workouts.date, dialect).label("week_start")
+        for start, count, minutes in db.session.execute(
+            select(week, func.count(workouts.id), func.sum(workouts.duration_minutes))
+            .where(*criteria).group_by(week)
+        ):
+            row = weeks.setdefault(start, week_row(start, 0, 0, 0, 0))
+            row.update(workouts=row["workouts"] + count, duration_minutes=row["duration_minutes"] + minutes)
+        for start, sets, total in db.session.execute(
+            select(week, func.sum(func.coalesce(entries.sets, 0)), func.sum(volume(entries)))
+            .join(entries.workout).where(*criteria).group_by(week)
+        ):
+            row = weeks[start]
+            row.update(sets=row["sets"] + sets, volume=row["volume"] + total)
+    return [weeks[start] for start in sorted(weeks)]
+
+
+def category_totals(args):
+    """Logged duration, volume and sessions per ``Exercise.category``."""
+    if use_rollups():
+        rows = db.session.execute(
+            select(
+                CategoryDailyVolume.category,
+                func.sum(CategoryDailyVolume.workouts),
+                func.sum(CategoryDailyVolume.entries),
+                func.sum(CategoryDailyVolume.duration_seconds),
+                func.sum(CategoryDailyVolume.volume),
+            )
+            .where(*date_range(args, CategoryDailyVolume.day))
+            .group_by(CategoryDailyVolume.category)
+            .order_by(CategoryDailyVolume.category)
+        )
+    else:
+        rows = raw_category_totals(args)
+    return [
+        {
+            "category": category,
+            "workouts": workouts,
+            "entries": entries,
+            "duration_seconds": seconds,
+            "volume": volume,
+        }
+        for category, workouts, entries, seconds, volume in rows
+    ]
+
+
+def raw_category_totals(args):
+    # A workout has one date (and one partition), so distinct workouts per
+    # (day, category) add up across days and partitions; that is what lets
+    # the rollup sum them
+    totals = {}
+    for part in routed(args):
+        workouts, entries = part.workouts, part.entries
+        for category, *values in db.session.execute(
+            select(
+                Exercise.category,
+                func.count(func.distinct(entries.workout_id)),
+                func.count(entries.id),
+                func.sum(func.coalesce(entries.duration_seconds, 0)),
+                func.sum(volume(entries)),
+            )
+            .join(entries.exercise)
+            .join(entries.workout)
+            .where(*date_range(args, workouts.date))
+            .group_by(Exercise.category)
+        ):
+            totals[category] = [a + b for a, b in zip(totals.get(category, (0, 0, 0, 0)), values)]
+    return [(category, *totals[category]) for category in sorted(totals)]
+
+
+def top_exercises(args):
+    """Most frequently logged exercises, ties broken by volume then id."""
+    limit = parse_limit(args, DEFAULT_TOP, MAX_TOP)
+    totals = {}
+    for part in routed(args):
+        entries = part.entries
+        for id, name, category, count, total in db.session.execute(
+            select(Exercise.id, Exercise.name, Exercise.category, func.count(entries.id), func.sum(volume(entries)))
+            .join(entries.exercise)
+            .join(entries.workout)
+            .where(*date_range(args, part.workouts.date))
+            .group_by(Exercise.id, Exercise.name, Exercise.category)
+        ):
+            row = totals.setdefault(id, {"exercise_id": id, "name": name, "category": category,
+                                         "times": 0, "volume": 0})
+            row["times"] += count
+            row["volume"] += total
+    ranked = sorted(totals.values(), key=lambda row: (-row["times"], -row["volume"], row["exercise_id"]))
+    return ranked[:limit]
+
+
+def personal_records(args):
+    """Best single entry per exercise: reps, sets, volume and duration."""
+    records = {}
+    for part in routed(args):
+        workouts, entries = part.workouts, part.entries
+        for id, name, *values in db.session.execute(
+            select(
+                Exercise.id,
+                Exercise.name,
+                func.max(entries.reps),
+                func.max(entries.sets),
+                func.max(volume(entries)),
+                func.max(entries.duration_seconds),
+                func.max(workouts.date),
+            )
+            .join(entries.exercise)
+            .join(entries.workout)
+            .where(*date_range(args, workouts.date))
+            .group_by(Exercise.id, Exercise.name)
+        ):
+            best = records.get(id)
+            records[id] = (name, *values) if best is None else (name, *map(_max, best[1:], values))
+    return [
+        {
+            "exercise_id": id,
+            "name": name,
+            "max_reps": reps,
+            "max_sets": sets,
+            "max_volume": volume,
+            "max_duration_seconds": seconds,
+            "last_logged": last.isoformat(),
+        }
+        for id, (name, reps, sets, volume, seconds, last) in sorted(records.items())
+    ]
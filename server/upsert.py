@@ -0,0 +1,65 @@
+# server/upsert.py
+from sqlalchemy import insert, literal_column, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+# ?on_conflict= values accepted by the single-row POST routes
+CONFLICT_MODES = ("update", "ignore")
+
+
+class UpsertError(ValueError):
+    """Raised for an unusable ``on_conflict`` argument."""
+
+
+def conflict_mode(args):
+    """Return "update", "ignore" or None (plain insert) for ``?on_conflict=``."""
+    mode = args.get("on_conflict")
+    if mode is not None and mode not in CONFLICT_MODES:
+        raise UpsertError(f"on_conflict must be one of: {', '.join(CONFLICT_MODES)}")
+    return mode
+
+
+def upsert(session, model, values, keys, mode):
+    """Insert ``values`` into ``model``'s table, resolving a clash on ``keys``.
+
+    Returns ``(row, inserted)``.  On SQLite and PostgreSQL this is a single
+    ``INSERT ... ON CONFLICT DO UPDATE | DO NOTHING ... RETURNING``, so a
+    retried request neither raises IntegrityError nor rolls back.  With
+    "update" the non-key columns are overwritten; RETURNING looks the same
+    either way on SQLite, so the key is looked up first, and PostgreSQL
+    reports ``xmax = 0`` for a fresh row.  With "ignore" the stored row
+    comes back untouched.  Values go in as parameters rather than
+    ``.values()`` so the session hooks see the row.
+    """
+    table = model.__table__
+    lookup = select(table).where(*[table.c[key] == values[key] for key in keys])
+    dialect = session.get_bind().dialect.name
+
+    if dialect in ("sqlite", "postgresql"):
+        stmt = (sqlite.insert if dialect == "sqlite" else postgresql.insert)(table)
+        if mode == "update":
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c[key] for key in keys],
+                set_={column: stmt.excluded[column] for column in values if column not in keys},
+            )
+            if dialect == "postgresql":
+                # The extra column is ignored by the row schemas
+                row = session.execute(stmt.returning(*table.c, literal_column("xmax = 0").label("inserted")),
+                                      values).one()
+                return row, row.inserted
+            existed = session.execute(lookup.with_only_columns(table.c.id)).first() is not None
+            return session.execute(stmt.returning(*table.c), values).one(), not existed
+        stmt = stmt.on_conflict_do_nothing(index_elements=[table.c[key] for key in keys])
+        row = session.execute(stmt.returning(*table.c), values).one_or_none()
+        if row is not None:
+            return row, True
+        return session.execute(lookup).one(), False
+
+    # Elsewhere: look the row up first (a concurrent insert can still clash)
+    row = session.execute(lookup).one_or_none()
+    if row is None:
+        session.execute(insert(table), values)
+        return session.execute(lookup).one(), True
+    if mode == "update":
+        session.execute(update(table).where(table.c.id == row.id), values)
+        row = session.execute(lookup).one()
+    return row, False
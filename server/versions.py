@@ -0,0 +1,285 @@
+# server/versions.py
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import Response, current_app, has_app_context, request
+from sqlalchemy import event, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from server.db import db
+from server.models import (
+    ChangeVersion, ChangeLogEntry, DailyVolume, WeeklyVolume, CategoryDailyVolume, ImportCheckpoint,
+    ArchivedWorkout, ArchivedWorkoutExercise,
+)
+from server.streaming import stream_format
+
+# Changing a workout_exercises row also changes what the owning workout and
+# exercise serialize to
+DEPENDENT_ROWS = {
+    "workout_exercises": (("workouts", "workout_id"), ("exercises", "exercise_id")),
+}
+
+# Deleting a row also deletes these tables' rows through ON DELETE CASCADE,
+# out of sight of the session
+CASCADE_DELETES = {
+    "workouts": ("workout_exercises",),
+    "exercises": ("workout_exercises",),
+}
+
+# Archived rows are served by the same routes as the hot ones (see
+# server/archive.py), so they share their tags
+TAG_TABLES = {
+    ArchivedWorkout.__tablename__: "workouts",
+    ArchivedWorkoutExercise.__tablename__: "workout_exercises",
+}
+
+# Rollups are derived from tracked tables, whose tags already cover them;
+# import checkpoints are never served
+UNTRACKED_TABLES = {
+    ChangeVersion.__tablename__,
+    ChangeLogEntry.__tablename__,
+    DailyVolume.__tablename__,
+    WeeklyVolume.__tablename__,
+    CategoryDailyVolume.__tablename__,
+    ImportCheckpoint.__tablename__,
+}
+
+# Tags each GET route's output depends on, keyed by view name ("stats"
+# covers every /stats view)
+ROUTE_TAGS = {
+    "get_exercises": lambda: ["exercises", "workouts", "workout_exercises"],
+    "get_exercise": lambda id: [f"exercises:{id}", "exercises*", "workouts", "workout_exercises"],
+    "get_workouts": lambda: ["workouts", "workout_exercises"],
+    "get_workout": lambda id: [f"workouts:{id}", "workouts*", "exercises"],
+    "stats": lambda: ["exercises", "workouts", "workout_exercises"],
+    "get_search": lambda: ["exercises", "workouts"],
+}
+
+
+# -----------------------
+# TAGS
+# -----------------------
+def own_rows_tag(table):
+    """Tag bumped only when ``table``'s own rows change, not its dependents'."""
+    return table + ".rows"
+
+
+def row_tags(obj):
+    table = TAG_TABLES.get(obj.__table__.name, obj.__table__.name)
+    tags = {table, f"{table}:{obj.id}", own_rows_tag(table)}
+    for parent, column in DEPENDENT_ROWS.get(table, ()):
+        tags.update((parent, f"{parent}:{getattr(obj, column)}"))
+    return tags
+
+
+def statement_tags(table):
+    """Tags for a set-based statement, whose individual rows are unknown."""
+    table = TAG_TABLES.get(table, table)
+    tags = {table, table + "*", own_rows_tag(table)}
+    for parent, _ in DEPENDENT_ROWS.get(table, ()):
+        tags.update((parent, parent + "*"))
+    return tags
+
+
+# -----------------------
+# VERSION COUNTERS
+# -----------------------
+def bump_versions(session, tags):
+    """Increment the counter of every tag inside the current transaction."""
+    now = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+    rows = [{"tag": tag, "version": 1, "updated_at": now} for tag in sorted(tags)]
+    table = ChangeVersion.__table__
+    dialect = session.get_bind().dialect.name
+
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.tag],
+            set_={"version": table.c.version + 1, "updated_at": stmt.excluded.updated_at},
+        )
+        session.execute(stmt, rows)
+        return
+
+    for row in rows:
+        result = session.execute(
+            update(table).where(table.c.tag == row["tag"])
+            .values(version=table.c.version + 1, updated_at=now)
+        )
+        if result.rowcount == 0:
+            session.execute(table.insert(), row)
+
+
+def log_changes(session, tags, origin):
+    """Append the commit's tags to the change log inside the current transaction."""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    session.execute(ChangeLogEntry.__table__.insert(),
+                    {"tags": ",".join(sorted(tags)), "origin": origin, "created_at": now})
+
+
+def versions_statement(tags):
+    return (
+        select(ChangeVersion.tag, ChangeVersion.version, ChangeVersion.updated_at)
+        .where(ChangeVersion.tag.in_(tags))
+    )
+
+
+def summarize_versions(tags, rows):
+    """Return ``({tag: version}, last_modified)`` from versions_statement rows."""
+    versions = {tag: 0 for tag in tags}
+    last_modified = None
+    for tag, version, updated_at in rows:
+        versions[tag] = version
+        if last_modified is None or updated_at > last_modified:
+            last_modified = updated_at
+    if last_modified is not None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return versions, last_modified
+
+
+def current_versions(tags):
+    return summarize_versions(tags, db.session.execute(versions_statement(tags)).all())
+
+
+def make_etag(full_path, versions):
+    fingerprint = full_path + "|" + ",".join(
+        f"{tag}={versions[tag]}" for tag in sorted(versions)
+    )
+    return hashlib.sha1(fingerprint.encode()).hexdigest()
+
+
+def is_not_modified(if_none_match, if_modified_since, etag, last_modified):
+    """Evaluate parsed conditional headers; If-None-Match takes precedence."""
+    if if_none_match:
+        return if_none_match.contains(etag)
+    return bool(if_modified_since and last_modified and last_modified <= if_modified_since)
+
+
+def conditional(tags):
+    """Decorate a GET view with a strong ETag and Last-Modified.
+
+    The ETag is a digest of the URL and the persisted version of every tag
+    the view depends on, so ``If-None-Match`` / ``If-Modified-Since`` are
+    answered with a 304 from one primary-key lookup, before any rows are
+    loaded or serialized.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(**kwargs):
+            if not current_app.config["CONDITIONAL_GET"] or stream_format(request):
+                return view(**kwargs)
+
+            versions, last_modified = current_versions(tags(**kwargs))
+            etag = make_etag(request.full_path, versions)
+            if is_not_modified(request.if_none_match, request.if_modified_since, etag, last_modified):
+                resp = Response(status=304)
+            else:
+                resp = current_app.make_response(view(**kwargs))
+                if resp.status_code != 200:
+                    return resp
+
+            resp.set_etag(etag)
+            if last_modified is not None:
+                resp.last_modified = last_modified
+            return resp
+        return wrapper
+    return decorator
+
+
+# -----------------------
+# SESSION HOOKS
+# -----------------------
+def on_commit(app, listener, remote=True):
+    """Call ``listener(tags)`` after every commit that changed tracked rows.
+
+    With ``remote`` the listener also hears about other processes' commits
+    once the change feed is on (see server/changes.py); state already
+    shared between processes passes False.
+    """
+    app.extensions.setdefault("commit_listeners", []).append(listener)
+    if remote:
+        app.extensions.setdefault("remote_commit_listeners", []).append(listener)
+    install_session_hooks()
+
+
+def _pending(session):
+    return session.info.setdefault("changed_tags", set())
+
+
+def _after_flush(session, flush_context):
+    pending = _pending(session)
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if hasattr(obj, "__table__") and obj.__table__.name not in UNTRACKED_TABLES:
+            pending.update(row_tags(obj))
+    for obj in session.deleted:
+        table = obj.__table__.name
+        for child in CASCADE_DELETES.get(TAG_TABLES.get(table, table), ()):
+            pending.update(statement_tags(child))
+
+
+def _do_orm_execute(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = orm_execute_state.statement.table.name
+        if table not in UNTRACKED_TABLES:
+            pending = _pending(orm_execute_state.session)
+            pending.update(statement_tags(table))
+            if orm_execute_state.is_delete:
+                for child in CASCADE_DELETES.get(TAG_TABLES.get(table, table), ()):
+                    pending.update(statement_tags(child))
+
+
+def session_setting(session, key, default):
+    # A setting in session.info overrides the app's, for this session only
+    # (server/archive.py), and is the only source outside an app context
+    if key in session.info:
+        return session.info[key]
+    if has_app_context():
+        if key in ("commit_listeners", "change_feed"):
+            return current_app.extensions.get(key, default)
+        return current_app.config.get(key.upper(), default)
+    return default
+
+
+def _before_commit(session):
+    # Flush first so the final batch of ORM changes is tagged too
+    session.flush()
+    tags = session.info.get("changed_tags")
+    if tags and session_setting(session, "track_versions", False):
+        bump_versions(session, tags)
+    feed = session_setting(session, "change_feed", None)
+    if tags and feed is not None and feed.enabled:
+        log_changes(session, tags, feed.origin)
+
+
+def _after_commit(session):
+    tags = session.info.pop("changed_tags", None)
+    if tags:
+        for listener in session_setting(session, "commit_listeners", ()):
+            listener(sorted(tags))
+
+
+def _after_rollback(session):
+    session.info.pop("changed_tags", None)
+
+
+_hooks_installed = False
+
+
+def install_session_hooks():
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    event.listen(Session, "after_flush", _after_flush)
+    event.listen(Session, "do_orm_execute", _do_orm_execute)
+    event.listen(Session, "before_commit", _before_commit)
+    event.listen(Session, "after_commit", _after_commit)
+    event.listen(Session, "after_rollback", _after_rollback)
+    _hooks_installed = True
+
+
+def init_app(app):
+    app.config.setdefault("TRACK_VERSIONS", True)
+    app.config.setdefault("CONDITIONAL_GET", True)
+    install_session_hooks()
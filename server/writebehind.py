@@ -0,0 +1,370 @@
+# server/writebehind.py
+import atexit
+import glob
+import json
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from server.db import db
+from server.models import Workout, WorkoutExercise
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; each spool path is then used as-is
+    fcntl = None
+
+
+class WriteBehindFull(Exception):
+    """The write-behind queue is full; the client should retry later."""
+
+
+# -----------------------
+# SPOOL
+# -----------------------
+def _try_lock(handle):
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def _unfinished(handle):
+    handle.seek(0)
+    rows, done = {}, set()
+    for line in handle:
+        try:
+            entry = json.loads(line)
+        except ValueError:      # torn last line from a crash
+            continue
+        if "done" in entry:
+            done.update(entry["done"])
+        else:
+            rows[entry["id"]] = entry["values"]
+    return [(id, values) for id, values in rows.items() if id not in done]
+
+
+class Spool:
+    """Append-only NDJSON log of queued rows, so a crash loses none of them.
+
+    A ``{"id", "values"}`` line is written before a row is queued and a
+    ``{"done": [ids]}`` line once its batch is committed; rows without a
+    done line are queued again on the next start.  Each process locks its
+    own file (``path``, ``path.1`` ...) so workers never share one, and
+    takes over the rows of any file no live process holds.  The file is
+    emptied whenever the queue drains.
+    """
+
+    def __init__(self, path, fsync=False):
+        self.base = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        slot = 0
+        while True:
+            name = path if slot == 0 else f"{path}.{slot}"
+            handle = open(name, "a+", encoding="utf-8")
+            if _try_lock(handle):
+                break
+            handle.close()
+            slot += 1
+        self.path = name
+        self._file = handle
+
+    def pending(self):
+        """``(tracking_id, values)`` for every row not yet committed."""
+        with self._lock:
+            return _unfinished(self._file)
+
+    def adopt(self):
+        """Move the unfinished rows of unlocked sibling files into this one.
+
+        Those are slots of workers that exited or crashed.  Without flock
+        a live worker's file cannot be told apart, so nothing is adopted.
+        """
+        if fcntl is None:
+            return []
+        sibling = re.compile(re.escape(self.base) + r"(\.\d+)?")
+        adopted = []
+        for name in [self.base, *sorted(glob.glob(glob.escape(self.base) + ".*"))]:
+            if name == self.path or not sibling.fullmatch(name) or not os.path.exists(name):
+                continue
+            with open(name, "a+", encoding="utf-8") as handle:
+                if not _try_lock(handle):
+                    continue
+                rows = _unfinished(handle)
+                # Copied before the truncate, so a crash here only replays twice
+                for id, values in rows:
+                    self.append(id, values)
+                handle.truncate(0)
+            adopted += rows
+        return adopted
+
+    def _write(self, entry):
+        with self._lock:
+            self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def append(self, id, values):
+        self._write({"id": id, "values": values})
+
+    def done(self, ids):
+        self._write({"done": ids})
+
+    def truncate(self):
+        with self._lock:
+            self._file.truncate(0)
+
+    def close(self):
+        self._file.close()
+
+
+# -----------------------
+# WRITER
+# -----------------------
+class WriteBehind:
+    """Group-commits ``workout_exercises`` inserts from a background thread.
+
+    With ``WRITE_BEHIND`` on, the add-exercise POST validates its row and
+    hands it to ``submit``, which queues it and returns a tracking id for
+    a 202; one writer thread commits whatever has queued up every
+    ``WRITE_BEHIND_INTERVAL_MS`` or ``WRITE_BEHIND_BATCH_ROWS`` rows, so a
+    burst takes the SQLite write lock once per batch instead of once per
+    request.  A full queue (``WRITE_BEHIND_QUEUE_SIZE``) raises
+    WriteBehindFull, answered with a 503 and Retry-After.  Queued rows are
+    kept in memory, or also in a ``WRITE_BEHIND_SPOOL`` file so they
+    survive a crash; the queue is flushed at interpreter exit.
+
+    With a spool the writer starts with the app, so rows left by a crash
+    are committed without waiting for another write.
+
+    Outcomes are kept in memory for the last ``WRITE_BEHIND_RESULTS``
+    tracking ids, by the process that accepted the row: with several
+    workers, ``GET /writes/<id>`` only finds a row when it reaches that
+    same worker, so polling it needs sticky routing or a single worker.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self._queue = None
+        self._thread = None
+        self._spool = None
+        self._closing = False
+        self._replaying = False
+        self._lock = threading.RLock()
+        self._results = OrderedDict()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("WRITE_BEHIND", False)
+        app.config.setdefault("WRITE_BEHIND_QUEUE_SIZE", 10000)
+        app.config.setdefault("WRITE_BEHIND_BATCH_ROWS", 500)
+        app.config.setdefault("WRITE_BEHIND_INTERVAL_MS", 50)
+        app.config.setdefault("WRITE_BEHIND_SPOOL", None)
+        app.config.setdefault("WRITE_BEHIND_SPOOL_FSYNC", False)
+        app.config.setdefault("WRITE_BEHIND_RESULTS", 10000)
+
+        self.app = app
+        self.enabled = app.config["WRITE_BEHIND"]
+        self.batch_rows = app.config["WRITE_BEHIND_BATCH_ROWS"]
+        self.interval = app.config["WRITE_BEHIND_INTERVAL_MS"] / 1000
+        self.max_results = app.config["WRITE_BEHIND_RESULTS"]
+        self._queue = queue.Queue(app.config["WRITE_BEHIND_QUEUE_SIZE"])
+        app.extensions["write_behind"] = self
+        if not self.enabled:
+            return
+        atexit.register(self.close)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+        if app.config["WRITE_BEHIND_SPOOL"]:
+            self._start()
+
+    def _after_fork(self):
+        # The writer thread and queued rows stay with the parent; the child
+        # starts its own, with its own spool slot, on first use
+        self._lock = threading.RLock()
+        self._thread = None
+        self._spool = None
+        self._replaying = False
+        self._queue = queue.Queue(self._queue.maxsize)
+        self._results = OrderedDict()
+
+    # -----------------------
+    # PRODUCERS
+    # -----------------------
+    def _start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            replay = []
+            if self.app.config["WRITE_BEHIND_SPOOL"]:
+                self._spool = Spool(self.app.config["WRITE_BEHIND_SPOOL"],
+                                    self.app.config["WRITE_BEHIND_SPOOL_FSYNC"])
+                replay = self._spool.pending() + self._spool.adopt()
+            # Until the last replayed row is queued, an empty queue does not
+            # mean the spool is done with (see _drained)
+            self._replaying = bool(replay)
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+        # Outside the lock: a replay larger than the queue waits for the writer
+        for tracking_id, values in replay:
+            self._record(tracking_id, "queued")
+            self._queue.put((tracking_id, values))
+        with self._lock:
+            self._replaying = False
+
+    def submit(self, values):
+        """Queue one validated row; returns its tracking id."""
+        if self._closing:
+            raise WriteBehindFull("Shutting down")
+        self._start()
+        tracking_id = uuid.uuid4().hex
+        # Under the lock, so the writer never empties the spool between
+        # the append and the put
+        with self._lock:
+            if self._queue.full():
+                raise WriteBehindFull(f"Write queue is full ({self._queue.maxsize} rows)")
+            if self._spool is not None:
+                self._spool.append(tracking_id, values)
+            self._record(tracking_id, "queued")
+            self._queue.put_nowait((tracking_id, values))
+        return tracking_id
+
+    def status(self, tracking_id):
+        """``{"tracking_id", "status", ...}``, or None for an unknown id."""
+        with self._lock:
+            result = self._results.get(tracking_id)
+        return None if result is None else {"tracking_id": tracking_id, **result}
+
+    def _record(self, tracking_id, status, **fields):
+        with self._lock:
+            self._results[tracking_id] = {"status": status, **fields}
+            self._results.move_to_end(tracking_id)
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+
+    def flush(self, timeout=None):
+        """Wait until every queued row is written; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if self._thread is None or not self._thread.is_alive():
+                return False
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def close(self, timeout=10.0):
+        """Stop accepting rows, write out the queue and stop the thread."""
+        self._closing = True
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._spool is not None:
+            self._spool.close()
+
+    # -----------------------
+    # WRITER THREAD
+    # -----------------------
+    def _run(self):
+        with self.app.app_context():
+            while True:
+                batch = self._next_batch()
+                if batch is None:
+                    break
+                try:
+                    self._write(batch)
+                except Exception as ex:     # keep the thread alive; report per row
+                    db.session.rollback()
+                    for tracking_id, _ in batch:
+                        self._record(tracking_id, "failed", error=str(ex))
+                finally:
+                    self._drained(batch)
+                    for _ in batch:
+                        self._queue.task_done()
+            db.session.remove()
+
+    def _next_batch(self):
+        """Block for the first row, then collect until the interval or batch size is up."""
+        while True:
+            try:
+                batch = [self._queue.get(timeout=0.1)]
+                break
+            except queue.Empty:
+                if self._closing:
+                    return None
+        deadline = time.monotonic() + self.interval
+        while len(batch) < self.batch_rows:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        """Insert ``batch`` with one statement and one commit.
+
+        Rows whose workout is gone or whose exercise is already logged are
+        found with two queries first.  A conflict that still slips through
+        (a concurrent writer) falls back to committing row by row.
+        """
+        session = db.session
+        workout_ids = {values["workout_id"] for _, values in batch}
+        known = set(session.scalars(select(Workout.id).where(Workout.id.in_(workout_ids))))
+        taken = set(session.execute(
+            select(WorkoutExercise.workout_id, WorkoutExercise.exercise_id)
+            .where(WorkoutExercise.workout_id.in_(workout_ids))
+        ).tuples())
+
+        rows = []
+        for tracking_id, values in batch:
+            pair = (values["workout_id"], values["exercise_id"])
+            if values["workout_id"] not in known:
+                self._record(tracking_id, "failed", error="Workout not found.")
+            elif pair in taken:
+                self._record(tracking_id, "failed", error="Exercise already in this workout.")
+            else:
+                taken.add(pair)
+                rows.append((tracking_id, values))
+        if not rows:
+            return
+
+        stmt = insert(WorkoutExercise).returning(WorkoutExercise.id)
+        try:
+            # New rowids follow VALUES order (see server/batch.py)
+            ids = sorted(session.execute(stmt, [values for _, values in rows]).scalars())
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            ids = []
+            for tracking_id, values in rows:
+                try:
+                    ids.append(session.execute(stmt, values).scalar_one())
+                    session.commit()
+                except IntegrityError as ex:
+                    session.rollback()
+                    ids.append(None)
+                    self._record(tracking_id, "failed", error=str(ex.orig))
+        for (tracking_id, _), id in zip(rows, ids):
+            if id is not None:
+                self._record(tracking_id, "committed", id=id)
+
+    def _drained(self, batch):
+        if self._spool is None:
+            return
+        self._spool.done([tracking_id for tracking_id, _ in batch])
+        with self._lock:
+            if self._queue.empty() and not self._replaying:
+                self._spool.truncate()
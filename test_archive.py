@@ -0,0 +1,122 @@
+from datetime import date
+
+import pytest
+
+from server.archive import archive_workouts
+from server.export import read_packed
+from server.models import db, ArchivedWorkout, Workout
+from server.rollups import check_rollups
+
+
+@pytest.fixture
+def history(app, client):
+    app.config["ARCHIVE_ENABLED"] = True
+    for day, exercise in (("2024-01-10", 1), ("2024-02-01", 4), ("2025-12-01", 2)):
+        w = client.post("/workouts", json={"date": day, "duration_minutes": 20}).get_json()
+        client.post(f"/workouts/{w['id']}/exercises/{exercise}/workout_exercises",
+                    json={"reps": 10, "sets": 2, "duration_seconds": 60})
+    return client
+
+
+def _archive(before="2025-01-01"):
+    moved = archive_workouts(db.session, date.fromisoformat(before))
+    db.session.expunge_all()
+    return moved
+
+
+def test_archived_workouts_still_resolve(history):
+    before = history.get("/workouts/3").get_json()
+    assert _archive() == (2, 2)
+    assert db.session.get(Workout, 3) is None and db.session.get(ArchivedWorkout, 3) is not None
+
+    assert history.get("/workouts/3").get_json() == before
+    assert history.get("/workouts/99").status_code == 404
+    assert [w["id"] for w in history.get("/exercises/4").get_json()["workouts"]] == [4, 2]
+
+
+def test_lists_merge_partitions(history):
+    _archive()
+    pages, cursor = [], None
+    while True:
+        resp = history.get("/workouts?limit=2&order=date" + (f"&cursor={cursor}" if cursor else ""))
+        pages.append([w["date"] for w in resp.get_json()])
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert pages == [["2024-01-10", "2024-02-01"], ["2025-11-22", "2025-11-23"], ["2025-12-01"]]
+
+    lines = history.get("/workouts?stream=1").data.decode().splitlines()
+    assert len(lines) == 5 and '"id":3' in lines[2]
+
+
+def test_recent_ranges_skip_the_archive(history, count_queries):
+    _archive()
+    with count_queries() as statements:
+        resp = history.get("/workouts?date_from=2025-11-01")
+    assert [w["id"] for w in resp.get_json()] == [1, 2, 5]
+    # Only the seek for the archive's newest date
+    archive_reads = [s for s in statements if "workouts_archive" in s]
+    assert len(archive_reads) == 1 and "max(workouts_archive.date)" in archive_reads[0]
+
+
+def test_search_covers_both_partitions(history):
+    for id in (3, 4, 5):
+        db.session.get(Workout, id).notes = f"zebra crossing {id}"
+    db.session.commit()
+
+    def ids():
+        found, cursor = [], None
+        while True:
+            resp = history.get("/search?q=zebra&type=workout&limit=2" + (f"&cursor={cursor}" if cursor else ""))
+            found += [r["id"] for r in resp.get_json()]
+            cursor = resp.headers.get("X-Next-Cursor")
+            if not cursor:
+                return found
+
+    assert sorted(ids()) == [3, 4, 5]
+    _archive()
+    assert db.session.get(Workout, 3) is None
+    assert sorted(ids()) == [3, 4, 5]
+
+
+def test_stats_and_export_cover_both_partitions(app, history):
+    paths = ["/stats/volume", "/stats/categories", "/stats/top-exercises", "/stats/records",
+             "/stats/volume?date_from=2024-01-01&date_to=2024-12-31"]
+    before = [history.get(path).get_json() for path in paths]
+    export = read_packed(history.get("/export/workouts").data)
+    _archive()
+
+    assert [history.get(path).get_json() for path in paths] == before
+    app.config["ROLLUPS_ENABLED"] = False
+    assert [history.get(path).get_json() for path in paths] == before
+    assert check_rollups(db.session) == []
+    assert read_packed(history.get("/export/workouts").data) == export
+
+
+def test_ids_are_never_reused(history):
+    history.post("/workouts/3/exercises/2/workout_exercises", json={"reps": 1, "sets": 1, "duration_seconds": 0})
+    assert _archive("2026-01-01") == (5, 7)
+    assert Workout.query.count() == 0
+
+    # The newest ids are all archived; new rows must not take them
+    w = history.post("/workouts", json={"date": "2026-02-01", "duration_minutes": 5}).get_json()
+    assert w["id"] == 6
+    e = history.post("/workouts/6/exercises/1/workout_exercises",
+                     json={"reps": 1, "sets": 1, "duration_seconds": 0}).get_json()
+    assert e["id"] == 8
+    assert history.delete("/workouts/6").status_code == 200
+    assert history.post("/workouts", json={"date": "2026-02-02", "duration_minutes": 5}).get_json()["id"] == 7
+    assert history.get("/workouts/5").get_json()["date"] == "2025-12-01"
+
+
+def test_archive_cli(app, history):
+    runner = app.test_cli_runner()
+    app.config["ARCHIVE_ENABLED"] = False
+    assert runner.invoke(args=["archive", "run"]).exit_code != 0
+
+    app.config["ARCHIVE_ENABLED"] = True
+    older_than = (date.today() - date(2024, 1, 20)).days
+    result = runner.invoke(args=["archive", "run", "--older-than", str(older_than)])
+    assert result.exit_code == 0, result.output
+    assert "Archived 1 workouts" in result.output
+    assert "archive: 1 workouts (2024-01-10 to 2024-01-10)" in runner.invoke(args=["archive", "status"]).output
@@ -0,0 +1,103 @@
+import asyncio
+import json
+
+import pytest
+
+from server.asgi import asgi_app as wrap
+
+
+def call(asgi_app, method, path, body=None, headers=None):
+    """Drive one request through the ASGI app; returns (status, headers, body)."""
+    status, headers, chunks = call_chunks(asgi_app, method, path, body, headers)
+    return status, headers, b"".join(chunks)
+
+
+def call_chunks(asgi_app, method, path, body=None, headers=None):
+    """Like call(), with the body as the list of chunks sent."""
+    path, _, query = path.partition("?")
+    raw_headers = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    payload = b""
+    if body is not None:
+        payload = json.dumps(body).encode()
+        raw_headers += [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())]
+    scope = {"type": "http", "http_version": "1.1", "method": method, "path": path, "root_path": "",
+             "query_string": query.encode(), "headers": raw_headers}
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi_app(scope, receive, send))
+    start, *bodies = sent
+    assert [m.get("more_body", False) for m in bodies] == [True] * (len(bodies) - 1) + [False]
+    return (start["status"], {k.decode(): v.decode() for k, v in start["headers"]},
+            [m["body"] for m in bodies])
+
+
+@pytest.fixture
+def asgi_app(app):
+    return wrap(app)
+
+
+@pytest.mark.parametrize("path", [
+    "/exercises", "/exercises/1", "/workouts", "/workouts/1",
+    "/workouts?order=date&limit=1", "/exercises?category=strength",
+])
+def test_get_matches_flask(asgi_app, client, path):
+    resp = client.get(path)
+    status, headers, body = call(asgi_app, "GET", path)
+    assert status == resp.status_code
+    assert body == resp.data
+    assert headers["etag"] == resp.headers["ETag"]
+    assert headers.get("link") == resp.headers.get("Link")
+
+
+def test_if_none_match(asgi_app, client):
+    etag = client.get("/workouts/1").headers["ETag"]
+    status, headers, body = call(asgi_app, "GET", "/workouts/1", headers={"If-None-Match": etag})
+    assert status == 304 and body == b""
+    assert headers["etag"] == etag
+
+
+def test_not_found_and_bad_params(asgi_app):
+    assert call(asgi_app, "GET", "/workouts/999")[0] == 404
+    status, _, body = call(asgi_app, "GET", "/workouts?order=bogus")
+    assert status == 400
+    assert json.loads(body) == {"error": "order must be 'id' or 'date'"}
+
+
+def test_writes_bump_versions(asgi_app, client):
+    etag = client.get("/workouts/2").headers["ETag"]
+    status, _, body = call(asgi_app, "POST", "/workouts/2/exercises/1/workout_exercises",
+                           body={"reps": 8, "sets": 2, "duration_seconds": 0})
+    assert status == 201
+    assert json.loads(body)["exercise"]["id"] == 1
+    assert client.get("/workouts/2", headers={"If-None-Match": etag}).status_code == 200
+
+    status, _, body = call(asgi_app, "POST", "/exercises",
+                           body={"name": "Lunge", "category": "Strength", "equipment_needed": False})
+    assert status == 201
+    new_id = json.loads(body)["id"]
+    assert call(asgi_app, "DELETE", f"/exercises/{new_id}")[0] == 200
+    assert client.get(f"/exercises/{new_id}").status_code == 404
+
+
+def test_shares_the_flask_apps_response_cache(app, asgi_app, client):
+    cache = app.extensions["response_cache"].backend
+    first = call(asgi_app, "GET", "/exercises")
+    assert len(cache) == 1
+    assert call(asgi_app, "GET", "/exercises") == first
+    assert client.get("/exercises").data == first[2]
+    assert len(cache) == 1
+
+
+def test_streams_chunk_by_chunk(asgi_app, client):
+    status, headers, chunks = call_chunks(asgi_app, "GET", "/workouts?stream=json")
+    assert status == 200
+    assert headers["content-type"].startswith("application/json")
+    assert len([c for c in chunks if c]) > 1
+    assert b"".join(chunks) == client.get("/workouts?stream=json").data
+    assert call(asgi_app, "GET", "/")[2] == client.get("/").data
@@ -0,0 +1,53 @@
+from server.models import Exercise, Workout, WorkoutExercise
+
+
+def test_exercises_batch_reports_per_item_errors(client):
+    resp = client.post("/exercises:batch", json=[
+        {"name": "Lunges", "category": "Strength"},
+        {"name": "Push Up", "category": "Strength"},      # already stored
+        {"name": "Lunges", "category": "Strength"},       # duplicate in batch
+        {"name": "Rowing", "category": "Swimming"},       # bad category
+        {"name": "  Burpee  ", "category": "Cardio", "equipment_needed": True},
+    ])
+    assert resp.status_code == 207
+    body = resp.get_json()
+    assert [item["index"] for item in body["created"]] == [0, 4]
+    assert body["created"][1]["name"] == "Burpee"
+    assert [e["index"] for e in body["errors"]] == [1, 2, 3]
+    assert Exercise.query.filter_by(name="Burpee").one().equipment_needed is True
+
+
+def test_workouts_batch_single_statement(client, count_queries):
+    items = [{"date": "2025-12-%02d" % day, "duration_minutes": 30} for day in range(1, 29)]
+    with count_queries() as statements:
+        resp = client.post("/workouts:batch", json=items)
+    assert resp.status_code == 201
+    assert len(resp.get_json()["created"]) == 28
+    assert sum(s.startswith("INSERT INTO workouts") for s in statements) == 1
+    assert Workout.query.count() == 30
+
+
+def test_workout_exercises_batch_resolves_foreign_keys(client):
+    resp = client.post("/workouts/2/workout_exercises:batch", json=[
+        {"exercise_id": 1, "reps": 10, "sets": 3},
+        {"exercise_id": 4, "duration_seconds": 60},   # already on workout 2
+        {"exercise_id": 999, "reps": 5},              # unknown exercise
+        {"exercise_id": 2},                           # no reps/sets/duration
+    ])
+    assert resp.status_code == 207
+    body = resp.get_json()
+    assert body["created"][0]["workout_id"] == 2
+    assert [e["index"] for e in body["errors"]] == [1, 2, 3]
+    assert WorkoutExercise.query.filter_by(workout_id=2).count() == 2
+
+
+def test_batch_rejects_non_array(client):
+    assert client.post("/workouts:batch", json={"date": "2025-12-01"}).status_code == 400
+    assert client.post("/workouts:batch", json=[]).status_code == 400
+    assert client.post("/workouts/99/workout_exercises:batch", json=[{}]).status_code == 404
+
+
+def test_all_invalid_batch_is_400(client):
+    resp = client.post("/workouts:batch", json=[{"date": "nope", "duration_minutes": 0}])
+    assert resp.status_code == 400
+    assert resp.get_json()["created"] == []
@@ -0,0 +1,35 @@
+from benchmarks.dataset import bench_app, generate
+from benchmarks.load import regressions, run, uncovered_endpoints
+from server.models import db, Workout, WorkoutExercise
+from server.rollups import check_rollups
+
+
+def test_every_route_has_a_load_scenario(app):
+    assert uncovered_endpoints(app) == []
+
+
+def test_dataset_and_load_run(tmp_path):
+    app = bench_app(tmp_path / "bench.db")
+    counts = generate(app, workouts=40, exercises=12, per_workout=3)
+    assert counts == {"workouts": 40, "exercises": 12, "workout_exercises": 120}
+    with app.app_context():
+        assert db.session.query(WorkoutExercise).count() == 120
+        assert check_rollups(db.session) == []
+
+    report = run(app, 40, 12, requests=3, concurrency=2, runs=2)
+    assert all(r["errors"] == 0 and r["requests"] == 6 for r in report.values())
+    assert report["workouts page"]["queries"] >= 1
+    with app.app_context():
+        assert db.session.query(Workout).count() > 40
+        db.engine.dispose()
+
+
+def test_regressions():
+    base = {"p50_ms": 5.0, "p95_ms": 10.0, "queries": 2.0, "errors": 0}
+    assert regressions({"search": dict(base, p95_ms=12.0)}, {"search": base}, 0.25) == []
+    problems = regressions({"search": dict(base, p95_ms=13.0, queries=3.0), "new": base}, {"search": base}, 0.25)
+    assert sorted(p.split(":")[0] for p in problems) == ["new", "search", "search"]
+
+    # Write routes are held to their median, not their tail
+    assert regressions({"add exercise": dict(base, p95_ms=100.0)}, {"add exercise": base}, 0.25) == []
+    assert regressions({"add exercise": dict(base, p50_ms=7.0)}, {"add exercise": base}, 0.25) != []
@@ -0,0 +1,84 @@
+from datetime import date
+
+from server.cache import LocalBackend
+from server.models import db, Exercise, Workout
+
+
+def test_repeat_get_is_served_from_cache(client, count_queries):
+    first = client.get("/exercises")
+    with count_queries() as statements:
+        second = client.get("/exercises")
+    assert second.data == first.data
+    # Only the ETag version lookup reaches the database
+    assert len(statements) == 1 and "change_versions" in statements[0]
+
+
+def test_post_invalidates_list(client):
+    before = client.get("/exercises").get_json()
+    client.post("/exercises", json={"name": "Lunges", "category": "Strength"})
+    after = client.get("/exercises").get_json()
+    assert len(after) == len(before) + 1
+
+
+def test_workout_exercise_invalidates_workout_detail(client):
+    assert len(client.get("/workouts/2").get_json()["exercises"]) == 1
+    client.post("/workouts/2/exercises/1/workout_exercises", json={"reps": 5, "sets": 2, "duration_seconds": 0})
+    assert len(client.get("/workouts/2").get_json()["exercises"]) == 2
+
+
+def test_batch_insert_invalidates_list(client):
+    assert len(client.get("/workouts").get_json()) == 2
+    client.post("/workouts:batch", json=[{"date": "2025-12-01", "duration_minutes": 20}])
+    assert len(client.get("/workouts").get_json()) == 3
+
+
+def test_direct_session_commit_invalidates(client):
+    assert client.get("/exercises/5").get_json()["name"] == "Dumbbell Curl"
+    db.session.get(Exercise, 5).name = "Hammer Curl"
+    db.session.commit()
+    assert client.get("/exercises/5").get_json()["name"] == "Hammer Curl"
+
+
+def test_row_change_keeps_other_rows_cached(app, client, count_queries):
+    client.get("/workouts/1")
+    db.session.add(Workout(date=date(2025, 12, 2), duration_minutes=15))
+    db.session.commit()
+    with count_queries() as statements:
+        client.get("/workouts/1")
+    assert len(statements) == 1 and "change_versions" in statements[0]
+
+
+def test_cache_can_be_disabled(app, client, count_queries):
+    app.extensions["response_cache"].enabled = False
+    client.get("/exercises")
+    with count_queries() as statements:
+        client.get("/exercises")
+    assert statements
+
+
+# --------------------------
+# LocalBackend
+# --------------------------
+def test_lru_evicts_oldest_entry():
+    backend = LocalBackend(max_entries=2)
+    backend.set("a", 1, 1)
+    backend.set("b", 2, 1)
+    backend.get("a")
+    backend.set("c", 3, 1)
+    assert backend.get("b") is None
+    assert backend.get("a") == 1 and backend.get("c") == 3
+
+
+def test_lru_is_bounded_by_bytes():
+    backend = LocalBackend(max_bytes=10)
+    backend.set("a", b"x" * 6, 6)
+    backend.set("b", b"x" * 6, 6)
+    assert backend.get("a") is None
+    assert len(backend) == 1
+
+
+def test_entries_expire(monkeypatch):
+    backend = LocalBackend(ttl=5)
+    backend.set("a", 1, 1)
+    monkeypatch.setattr("server.cache.time.monotonic", lambda: 10 ** 9)
+    assert backend.get("a") is None
@@ -0,0 +1,59 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import func, select
+
+from server.archive import archive_workouts
+from server.models import db, ArchivedWorkoutExercise, WorkoutExercise
+
+
+def _entries(model=WorkoutExercise):
+    return db.session.scalar(select(func.count(model.id)))
+
+
+def test_deletes_cascade_without_loading_entries(client, count_queries):
+    with count_queries() as statements:
+        assert client.delete("/exercises/1").status_code == 200
+    # One DELETE; the entries are neither loaded nor deleted row by row
+    deletes = [s for s in statements if s.startswith("DELETE") and "rollup_" not in s]
+    assert deletes == ["DELETE FROM exercises WHERE exercises.id = ?"]
+    assert not any(s.startswith("SELECT workout_exercises") for s in statements)
+    assert _entries() == 2
+
+    assert client.delete("/workouts/1").status_code == 200
+    assert _entries() == 1
+    assert [w["id"] for w in client.get("/workouts").get_json()] == [2]
+    assert client.get("/exercises/2").get_json()["workouts"] == []
+
+
+def test_bulk_delete_by_ids_and_dates(client):
+    for day in ("2025-12-01", "2025-12-02", "2025-12-03"):
+        w = client.post("/workouts", json={"date": day, "duration_minutes": 10}).get_json()
+        client.post(f"/workouts/{w['id']}/exercises/2/workout_exercises", json={"reps": 5, "sets": 5, "duration_seconds": 0})
+    before = client.get("/stats/volume").get_json()
+
+    resp = client.delete("/workouts?ids=1,3,99")
+    assert resp.get_json() == {"deleted": 2}
+    assert client.get("/workouts/1").status_code == 404
+    assert client.delete("/workouts?date_from=2025-12-02&date_to=2025-12-31").get_json() == {"deleted": 2}
+    assert [w["id"] for w in client.get("/workouts").get_json()] == [2]
+    assert _entries() == 1
+
+    after = client.get("/stats/volume").get_json()
+    assert after != before and sum(week["workouts"] for week in after) == 1
+
+
+def test_bulk_delete_reaches_the_archive(app, client):
+    app.config["ARCHIVE_ENABLED"] = True
+    client.post("/workouts", json={"date": "2025-12-01", "duration_minutes": 10})
+    archive_workouts(db.session, date(2025, 11, 23))
+    assert _entries(ArchivedWorkoutExercise) == 2
+
+    assert client.delete("/workouts?date_to=2025-11-30").get_json() == {"deleted": 2}
+    assert _entries(ArchivedWorkoutExercise) == 0 and _entries() == 0
+    assert client.get("/stats/top-exercises").get_json() == []
+
+
+@pytest.mark.parametrize("query", ["", "?ids=", "?ids=a,b", "?date_from=nope"])
+def test_bulk_delete_needs_a_filter(client, query):
+    assert client.delete(f"/workouts{query}").status_code == 400
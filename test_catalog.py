@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import insert, update
+
+from server.catalog import CATALOG_TAG
+from server.models import db, ChangeVersion, Exercise
+
+
+@pytest.fixture
+def catalog(app):
+    catalog = app.extensions["exercise_catalog"]
+    catalog.check_interval = 3600
+    return catalog
+
+
+def _write_elsewhere(stmt):
+    # Another worker: the write and its version bump, without this process's hooks
+    with db.engine.begin() as conn:
+        conn.execute(stmt)
+        conn.execute(update(ChangeVersion).where(ChangeVersion.tag == CATALOG_TAG)
+                     .values(version=ChangeVersion.version + 1))
+
+
+def test_indexes(catalog):
+    assert catalog.by_name("Squat").id == 2
+    assert [r.name for r in catalog.in_category("Cardio")] == ["Running"]
+    assert catalog.get(5).equipment_needed is True
+    assert catalog.get(99) is None
+    assert not hasattr(catalog.get(1), "__dict__")
+
+
+def test_lookups_skip_the_database(client, catalog, count_queries):
+    catalog.snapshot()
+    with count_queries() as statements:
+        assert catalog.get(1).name == "Push Up"
+        assert catalog.known_ids({1, 2, 3}) == {1, 2, 3}
+    assert statements == []
+
+    with count_queries() as statements:
+        resp = client.post("/workouts/2/exercises/1/workout_exercises",
+                           json={"reps": 5, "sets": 5, "duration_seconds": 0})
+    assert resp.status_code == 201
+    # The exercise is resolved before the insert without querying for it
+    before_insert = statements[:next(i for i, s in enumerate(statements) if s.startswith("INSERT"))]
+    assert not any("FROM exercises" in s for s in before_insert)
+
+
+def test_local_writes_refresh_the_catalog(client, catalog):
+    version = catalog.snapshot().version
+    client.post("/workouts/2/exercises/1/workout_exercises", json={"reps": 5, "sets": 5, "duration_seconds": 0})
+    # Changing an exercise's links leaves the catalog alone
+    assert catalog.snapshot().version == version
+
+    new = client.post("/exercises", json={"name": "Lunge", "category": "Strength"}).get_json()
+    assert catalog.snapshot().version > version
+    assert catalog.by_name("Lunge").id == new["id"]
+    client.delete(f"/exercises/{new['id']}")
+    assert catalog.get(new["id"]) is None
+
+
+def test_other_workers_writes_are_picked_up(client, catalog):
+    catalog.snapshot()
+    _write_elsewhere(update(Exercise).where(Exercise.id == 1).values(category="Mobility"))
+    assert catalog.get(1).category == "Strength"        # until the next check
+    catalog.refresh()
+    assert catalog.get(1).category == "Mobility"
+
+    # A miss re-checks straight away, so new exercises are never a 404
+    _write_elsewhere(insert(Exercise).values(id=50, name="Row Machine", category="Cardio", equipment_needed=True))
+    resp = client.post("/workouts/1/exercises/50/workout_exercises", json={"reps": 0, "sets": 0, "duration_seconds": 600})
+    assert resp.status_code == 201
+    assert client.post("/workouts/1/exercises/51/workout_exercises", json={"reps": 0, "sets": 0, "duration_seconds": 1}).status_code == 404
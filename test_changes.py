@@ -0,0 +1,97 @@
+import time
+
+import pytest
+from flask import Flask
+
+from conftest import seed
+from server.app import create_app
+from server.changes import EVERYTHING, ChangeFeed
+from server.models import db, ChangeLogEntry
+
+
+@pytest.fixture
+def workers(tmp_path):
+    """Two apps on one database, standing in for two worker processes."""
+    config = {
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'shared.db'}",
+        "CHANGE_FEED": True,
+        "CHANGE_FEED_POLL_INTERVAL": 3600,
+    }
+    first = create_app(config)
+    with first.app_context():
+        db.create_all()
+        seed(db.session)
+    second = create_app(config)
+    yield first, second
+    for app in (first, second):
+        with app.app_context():
+            db.engine.dispose()
+
+
+def _entries(client, workout_id):
+    return [e["exercise_id"] for e in client.get(f"/workouts/{workout_id}").get_json()["exercises"]]
+
+
+def test_other_workers_commits_reach_the_local_cache(workers):
+    first, second = workers
+    reader = second.test_client()
+    assert _entries(reader, 1) == [1, 2]
+
+    resp = first.test_client().post("/workouts/1/exercises/3/workout_exercises",
+                                    json={"reps": 5, "sets": 2, "duration_seconds": 0})
+    assert resp.status_code == 201
+    assert _entries(reader, 1) == [1, 2]    # served from the stale cache
+
+    feed = second.extensions["change_feed"]
+    with second.app_context():
+        assert "workouts:1" in feed.poll()
+        assert feed.poll() == []
+    assert _entries(reader, 1) == [1, 2, 3]
+
+    # The writer skips its own entries
+    with first.app_context():
+        assert first.extensions["change_feed"].poll() == []
+
+
+def test_polled_before_requests(workers):
+    first, second = workers
+    second.extensions["change_feed"].poll_interval = 0
+    catalog = second.extensions["exercise_catalog"]
+    catalog.check_interval = 3600
+    reader = second.test_client()
+    names = lambda: [e["name"] for e in reader.get("/exercises").get_json()]
+    assert "Lunge" not in names()
+
+    first.test_client().post("/exercises", json={"name": "Lunge", "category": "Strength"})
+    assert "Lunge" in names()
+    with second.app_context():
+        assert catalog.snapshot().by_name["Lunge"].category == "Strength"
+
+
+def test_idle_workers_invalidate_everything(workers):
+    first, second = workers
+    feed = second.extensions["change_feed"]
+    feed._polled_at = time.monotonic() - feed.retention - 1
+    with second.app_context():
+        assert feed.poll() == EVERYTHING
+
+
+def test_prune_keeps_the_newest_entry(workers):
+    first, second = workers
+    client = first.test_client()
+    for day in ("2025-12-01", "2025-12-02"):
+        client.post("/workouts", json={"date": day, "duration_minutes": 10})
+    feed = first.extensions["change_feed"]
+    feed.retention = -1
+    with first.app_context():
+        logged = db.session.query(ChangeLogEntry).count()
+        assert feed.prune() == logged - 1
+        assert db.session.query(ChangeLogEntry).count() == 1
+
+
+def test_refused_off_sqlite():
+    app = Flask(__name__)
+    app.config.update(CHANGE_FEED=True, SQLALCHEMY_DATABASE_URI="postgresql://u@h/db")
+    with pytest.raises(ValueError):
+        ChangeFeed(app)
@@ -0,0 +1,56 @@
+from datetime import date
+
+from server.models import db, ChangeVersion, Workout
+
+
+def test_get_sends_etag_and_last_modified(client):
+    resp = client.get("/workouts/1")
+    assert resp.headers["ETag"].startswith('"')
+    assert resp.headers["Last-Modified"]
+
+
+def test_if_none_match_returns_304_without_loading_rows(client, count_queries):
+    etag = client.get("/workouts/1").headers["ETag"]
+    with count_queries() as statements:
+        resp = client.get("/workouts/1", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.data == b""
+    assert resp.headers["ETag"] == etag
+    assert len(statements) == 1 and "change_versions" in statements[0]
+
+
+def test_etag_changes_when_rows_change(client):
+    etag = client.get("/workouts/2").headers["ETag"]
+    client.post("/workouts/2/exercises/1/workout_exercises", json={"reps": 8, "sets": 2, "duration_seconds": 0})
+    resp = client.get("/workouts/2", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+
+
+def test_unrelated_row_keeps_etag(client):
+    etag = client.get("/workouts/1").headers["ETag"]
+    db.session.add(Workout(date=date(2025, 12, 3), duration_minutes=25))
+    db.session.commit()
+    assert client.get("/workouts/1", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/workouts", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_if_modified_since(client):
+    last_modified = client.get("/exercises").headers["Last-Modified"]
+    resp = client.get("/exercises", headers={"If-Modified-Since": last_modified})
+    assert resp.status_code == 304
+
+
+def test_versions_bumped_in_same_transaction(app):
+    before = db.session.get(ChangeVersion, "workouts").version
+    db.session.add(Workout(date=date(2025, 12, 4), duration_minutes=10))
+    db.session.rollback()
+    assert db.session.get(ChangeVersion, "workouts").version == before
+
+    db.session.add(Workout(date=date(2025, 12, 4), duration_minutes=10))
+    db.session.commit()
+    assert db.session.get(ChangeVersion, "workouts").version == before + 1
+
+
+def test_missing_row_is_404(client):
+    assert client.get("/workouts/999").status_code == 404
@@ -0,0 +1,50 @@
+from datetime import date
+
+from server.models import db, Exercise, Workout, WorkoutExercise
+
+
+def big_workout(n):
+    workout = Workout(date=date(2025, 12, 1), duration_minutes=60)
+    start = Exercise.query.count()
+    exercises = [Exercise(name=f"Drill {start + i:04d}", category="Strength") for i in range(n)]
+    db.session.add_all([workout] + exercises)
+    db.session.flush()
+    db.session.add_all([
+        WorkoutExercise(workout_id=workout.id, exercise_id=e.id, reps=10, sets=3)
+        for e in exercises
+    ])
+    db.session.commit()
+    workout_id = workout.id
+    # Start the request from an empty identity map, like a real request
+    db.session.expunge_all()
+    return workout_id
+
+
+def test_workout_detail_query_count_is_constant(client, count_queries):
+    small_id = big_workout(2)
+    large_id = big_workout(40)
+
+    with count_queries() as small:
+        assert client.get(f"/workouts/{small_id}").status_code == 200
+    with count_queries() as large:
+        resp = client.get(f"/workouts/{large_id}")
+    assert len(resp.get_json()["exercises"]) == 40
+    assert len(large) == len(small) <= 4
+
+
+def test_exercise_detail_query_count_is_constant(client, count_queries):
+    with count_queries() as statements:
+        resp = client.get("/exercises/1")
+    assert [w["id"] for w in resp.get_json()["workouts"]] == [1]
+    assert len(statements) <= 4
+
+
+def test_list_endpoints_do_not_lazy_load(client, count_queries):
+    for i in range(3):
+        big_workout(5)
+    with count_queries() as workouts:
+        client.get("/workouts")
+    with count_queries() as exercises:
+        client.get("/exercises")
+    assert len(workouts) <= 3
+    assert len(exercises) <= 3
@@ -0,0 +1,56 @@
+import pytest
+from flask import Flask
+from server.app import create_app
+from server.models import db
+from server.engine import engine_options
+
+
+def pragma(name):
+    return db.session.execute(db.text(f"PRAGMA {name}")).scalar()
+
+
+def test_production_profile_applies_pragmas(tmp_path):
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'prod.db'}",
+        "DB_PROFILE": "production",
+    })
+    with app.app_context():
+        assert pragma("journal_mode") == "wal"
+        assert pragma("synchronous") == 1        # NORMAL
+        assert pragma("foreign_keys") == 1
+        assert pragma("busy_timeout") == 5000
+        assert pragma("temp_store") == 2         # MEMORY
+        assert db.engine.pool.size() == 8
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_development_profile_keeps_defaults(tmp_path):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'dev.db'}"})
+    with app.app_context():
+        assert pragma("journal_mode") == "delete"
+        db.engine.dispose()
+
+
+def test_database_url_from_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'env.db'}")
+    monkeypatch.setenv("DB_PROFILE", "production")
+    app = create_app()
+    assert app.config["SQLALCHEMY_DATABASE_URI"].endswith("env.db")
+    assert app.config["SQLALCHEMY_ENGINE_OPTIONS"]["pool_size"] == 8
+
+
+def test_server_url_gets_server_pool_options():
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI="postgresql://db.internal/workouts",
+        DB_PROFILE="production",
+    )
+    options = engine_options(app)
+    assert options["pool_pre_ping"] is True
+    assert options["pool_size"] == 10
+
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(ValueError):
+        create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://", "DB_PROFILE": "turbo"})
@@ -0,0 +1,80 @@
+from datetime import date
+
+import pytest
+
+from server.export import COLUMNS, read_packed
+
+
+def _rows(batches):
+    return [dict(zip(batch, values)) for batch in batches for values in zip(*batch.values())]
+
+
+def test_packed_export_round_trips(client):
+    client.post("/workouts", json={"date": "2025-12-01", "duration_minutes": 5})
+    resp = client.get("/export/workouts?batch_size=1")
+    assert resp.status_code == 200
+    assert resp.headers["X-Export-Until-Id"] == "3"
+
+    batches = read_packed(resp.data)
+    assert len(batches) == 3
+    assert list(batches[0]) == [name for name, _ in COLUMNS]
+    rows = _rows(batches)
+    assert [(r["workout_id"], r["exercise_name"], r["category"]) for r in rows] == [
+        (1, "Push Up", "Strength"), (1, "Squat", "Strength"), (2, "Running", "Cardio"), (3, None, None),
+    ]
+    assert rows[0]["date"] == date(2025, 11, 22) and rows[0]["notes"] == "Morning strength training"
+    assert rows[2]["reps"] is None and rows[2]["duration_seconds"] == 1200
+    # A workout without entries still gets a row
+    assert rows[3]["entry_id"] is None and rows[3]["equipment_needed"] is None
+
+
+def test_dictionary_values_are_sent_once(client):
+    for i in range(3):
+        w = client.post("/workouts", json={"date": "2025-12-0%d" % (i + 1), "duration_minutes": 5}).get_json()
+        client.post(f"/workouts/{w['id']}/exercises/2/workout_exercises", json={"reps": 5, "sets": 5, "duration_seconds": 0})
+    data = client.get("/export/workouts?batch_size=1").data
+    assert data.count(b"Strength") == 1 and data.count(b"Squat") == 1
+    assert _rows(read_packed(data))[-1]["exercise_name"] == "Squat"
+
+
+def test_incremental_export(client):
+    until = client.get("/export/workouts").headers["X-Export-Until-Id"]
+    client.post("/workouts", json={"date": "2025-12-01", "duration_minutes": 5})
+    client.post("/workouts", json={"date": "2026-01-01", "duration_minutes": 5})
+
+    rows = _rows(read_packed(client.get(f"/export/workouts?since_id={until}").data))
+    assert [r["workout_id"] for r in rows] == [3, 4]
+    rows = _rows(read_packed(client.get("/export/workouts?date_from=2025-11-23&date_to=2025-12-31").data))
+    assert [r["workout_id"] for r in rows] == [2, 3]
+
+
+def test_incremental_export_after_deleting_the_newest(client):
+    client.post("/workouts", json={"date": "2025-12-01", "duration_minutes": 5})
+    until = client.get("/export/workouts").headers["X-Export-Until-Id"]
+    assert until == "3"
+    client.delete("/workouts/3")
+    client.post("/workouts", json={"date": "2025-12-02", "duration_minutes": 5})
+
+    rows = _rows(read_packed(client.get(f"/export/workouts?since_id={until}").data))
+    assert [(r["workout_id"], r["date"]) for r in rows] == [(4, date(2025, 12, 2))]
+
+
+def test_export_rejects_bad_arguments(client):
+    assert client.get("/export/workouts?format=xml").status_code == 400
+    assert client.get("/export/workouts?since_id=-1").status_code == 400
+
+
+def test_export_cli(app, tmp_path):
+    out = tmp_path / "history.bin"
+    result = app.test_cli_runner().invoke(args=["export", str(out), "--since-id", "1"])
+    assert result.exit_code == 0, result.output
+    assert "next incremental export: --since-id 2" in result.output
+    assert [r["workout_id"] for r in _rows(read_packed(out.read_bytes()))] == [2]
+
+
+def test_arrow_export(client):
+    pa = pytest.importorskip("pyarrow")
+    resp = client.get("/export/workouts?format=arrow&batch_size=1")
+    table = pa.ipc.open_stream(resp.data).read_all()
+    assert table.column("exercise_name").to_pylist() == ["Push Up", "Squat", "Running"]
+    assert pa.types.is_dictionary(table.schema.field("category").type)
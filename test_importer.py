@@ -0,0 +1,70 @@
+import json
+
+import pytest
+from sqlalchemy import func, inspect, select
+
+from server.importer import ImportFailed, run_import
+from server.models import db, Exercise, Workout, WorkoutExercise, ImportCheckpoint
+from server.rollups import check_rollups
+
+
+def _count(model):
+    return db.session.scalar(select(func.count()).select_from(model))
+
+
+def test_import_exercises_csv(app, tmp_path):
+    path = tmp_path / "exercises.csv"
+    path.write_text("name,category,equipment_needed\n"
+                    "Row Machine,Cardio,true\n"
+                    "Squat,Strength,\n"           # already seeded
+                    "Ab,Strength,\n"              # name too short
+                    "Lunge,Strength,\n")
+    result = app.test_cli_runner().invoke(args=["import", "exercises", str(path)])
+
+    assert result.exit_code == 0, result.output
+    assert "Imported 2 rows from 4 records" in result.output
+    assert "record 2:" in result.output and "record 3:" in result.output
+    assert db.session.scalar(select(Exercise.equipment_needed).where(Exercise.name == "Row Machine")) is True
+    assert _count(Exercise) == 7
+
+
+def test_import_workouts_resolves_exercise_names(app, client, tmp_path):
+    path = tmp_path / "workouts.ndjson"
+    path.write_text("\n".join(json.dumps(record) for record in [
+        {"date": "2025-12-01", "duration_minutes": 40, "notes": "legs",
+         "exercises": [{"exercise": "Squat", "reps": 5, "sets": 5}, {"exercise": "Running", "duration_seconds": 600}]},
+        {"date": "2025-12-02", "duration_minutes": 20, "exercises": [{"exercise": "Nope", "reps": 1}]},
+        {"date": "2025-12-03", "duration_minutes": 15},
+    ]) + "\n")
+    result = app.test_cli_runner().invoke(args=["import", "workouts", str(path), "--batch-size", "2"])
+
+    assert result.exit_code == 0, result.output
+    assert "record 2: {'exercises': {0: [\"Unknown exercise 'Nope'\"]}}" in result.output
+    assert _count(Workout) == 4 and _count(WorkoutExercise) == 5
+    workout = client.get("/workouts?order=date&date_from=2025-12-01").get_json()[0]
+    assert [e["id"] for e in workout["exercises"]] == [2, 4]
+    assert check_rollups(db.session) == []
+
+
+def test_failed_import_resumes_from_checkpoint(app):
+    records = [{"date": "2025-12-01", "duration_minutes": 10 + i} for i in range(5)]
+    records[3]["duration_minutes"] = 0
+    with pytest.raises(ImportFailed, match="record 4"):
+        run_import(db.session, "workouts", iter(records), job="nightly", batch_size=2, strict=True)
+    # The first batch stays committed together with its checkpoint
+    assert _count(Workout) == 4
+    assert db.session.get(ImportCheckpoint, "nightly").records == 2
+
+    records[3]["duration_minutes"] = 5
+    stats = run_import(db.session, "workouts", iter(records), job="nightly", batch_size=2)
+    assert stats["resumed_at"] == 2 and stats["rows"] == 3
+    assert _count(Workout) == 7
+    assert db.session.get(ImportCheckpoint, "nightly").completed
+    with pytest.raises(ImportFailed, match="already completed"):
+        run_import(db.session, "workouts", iter(records), job="nightly")
+
+
+def test_deferred_indexes_are_rebuilt(app):
+    before = {ix["name"] for ix in inspect(db.engine).get_indexes("workouts")}
+    run_import(db.session, "workouts", [{"date": "2025-12-01", "duration_minutes": 10}], defer_indexes=True)
+    assert {ix["name"] for ix in inspect(db.engine).get_indexes("workouts")} == before
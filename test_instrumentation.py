@@ -0,0 +1,79 @@
+import os
+import re
+
+import pytest
+
+from conftest import seed
+from server.app import create_app
+from server.models import db
+
+
+@pytest.fixture
+def instrumented(tmp_path):
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'instrumented.db'}",
+        "INSTRUMENTATION_ENABLED": True,
+        "CACHE_ENABLED": False,
+        "PROFILE_DIR": str(tmp_path / "profiles"),
+    })
+    with app.app_context():
+        db.create_all()
+        seed(db.session)
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+def server_timing(resp):
+    return {
+        m.group(1): (float(m.group(2)), m.group(3))
+        for m in re.finditer(r'(\w+);dur=([\d.]+)(?:;desc="([^"]*)")?', resp.headers["Server-Timing"])
+    }
+
+
+def test_disabled_by_default(client):
+    assert "Server-Timing" not in client.get("/workouts").headers
+    assert client.get("/metrics").status_code == 404
+
+
+def test_server_timing_header(instrumented):
+    client = instrumented.test_client()
+    resp = client.get("/workouts/1")
+    timings = server_timing(resp)
+    assert set(timings) == {"db", "schema", "json", "total"}
+    # version lookup + workout with its workout_exercises/exercises
+    assert timings["db"][1] == "3 queries"
+    assert timings["schema"][0] > 0 and timings["json"][0] > 0
+    assert timings["total"][0] >= timings["db"][0] + timings["schema"][0]
+
+
+def test_output_unchanged(instrumented, client):
+    for path in ("/exercises", "/workouts/1", "/stats/volume"):
+        assert instrumented.test_client().get(path).data == client.get(path).data
+
+
+def test_metrics_endpoint(instrumented):
+    client = instrumented.test_client()
+    client.get("/workouts/1")
+    client.get("/workouts/2")
+    client.get("/workouts/999")
+    client.post("/workouts", json={"date": "2025-12-01", "duration_minutes": 10})
+    text = client.get("/metrics").get_data(as_text=True)
+
+    route = 'route="/workouts/<int:id>",method="GET"'
+    assert f"http_request_duration_seconds_count{{{route}}} 3" in text
+    assert f'http_request_duration_seconds_bucket{{{route},le="+Inf"}} 3' in text
+    assert f'http_requests_total{{{route},status="200"}} 2' in text
+    assert f'http_requests_total{{{route},status="404"}} 1' in text
+    assert 'http_requests_total{route="/workouts",method="POST",status="201"} 1' in text
+    assert re.search(rf'request_phase_seconds_total{{{route},phase="schema"}} [\d.e-]+', text)
+
+
+def test_slow_requests_are_profiled(instrumented):
+    instrumented.extensions["instrumentation"].sample_rate = 1.0
+    instrumented.extensions["instrumentation"].slow_ms = 0
+    instrumented.test_client().get("/exercises")
+    profiles = os.listdir(instrumented.config["PROFILE_DIR"])
+    assert len(profiles) == 1 and "get_exercises" in profiles[0]
@@ -0,0 +1,81 @@
+from datetime import date, timedelta
+
+from server.models import db, Workout
+
+
+def add_workouts(n, start=date(2024, 1, 1)):
+    db.session.add_all([
+        Workout(date=start + timedelta(days=i % 10), duration_minutes=30)
+        for i in range(n)
+    ])
+    db.session.commit()
+
+
+# --------------------------
+# Workouts
+# --------------------------
+def test_workouts_follow_cursor_to_end(client):
+    add_workouts(23)
+    seen, cursor = [], None
+    while True:
+        url = "/workouts?limit=10" + (f"&cursor={cursor}" if cursor else "")
+        resp = client.get(url)
+        assert resp.status_code == 200
+        seen.extend(w["id"] for w in resp.get_json())
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        assert 'rel="next"' in resp.headers["Link"]
+    assert seen == sorted(seen)
+    assert len(seen) == len(set(seen)) == 25
+
+
+def test_workouts_ordered_by_date(client):
+    add_workouts(15)
+    seen, cursor = [], None
+    while True:
+        url = "/workouts?order=date&limit=4" + (f"&cursor={cursor}" if cursor else "")
+        resp = client.get(url)
+        seen.extend((w["date"], w["id"]) for w in resp.get_json())
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == sorted(seen)
+    assert len(seen) == 17
+
+
+def test_workouts_date_range(client):
+    resp = client.get("/workouts?date_from=2025-11-23&date_to=2025-11-30")
+    assert [w["date"] for w in resp.get_json()] == ["2025-11-23"]
+
+
+def test_workouts_bad_params(client):
+    assert client.get("/workouts?limit=0").status_code == 400
+    assert client.get("/workouts?date_from=yesterday").status_code == 400
+    assert client.get("/workouts?cursor=garbage").status_code == 400
+    assert client.get("/workouts?order=notes").status_code == 400
+
+
+# --------------------------
+# Exercises
+# --------------------------
+def test_exercises_filters(client):
+    resp = client.get("/exercises?category=Cardio")
+    assert [e["name"] for e in resp.get_json()] == ["Running"]
+
+    resp = client.get("/exercises?equipment_needed=true")
+    assert [e["name"] for e in resp.get_json()] == ["Dumbbell Curl"]
+
+
+def test_exercises_page_has_no_cursor_on_last_page(client):
+    resp = client.get("/exercises?limit=5")
+    assert len(resp.get_json()) == 5
+    assert "X-Next-Cursor" not in resp.headers
+
+
+def test_workout_pages_use_index(app):
+    plan = db.session.execute(db.text(
+        "EXPLAIN QUERY PLAN SELECT * FROM workouts "
+        "WHERE (date, id) > ('2025-01-01', 1) ORDER BY date, id LIMIT 10"
+    )).all()
+    assert any("ix_workouts_date_id" in row[-1] for row in plan)
@@ -0,0 +1,55 @@
+import pytest
+
+from server.projection import FieldSelector
+from server.schemas import WorkoutSchema
+
+
+def test_fields_select_only_those_columns(client, count_queries):
+    with count_queries() as statements:
+        resp = client.get("/workouts?fields=id,date")
+    assert resp.get_json() == [{"id": 1, "date": "2025-11-22"}, {"id": 2, "date": "2025-11-23"}]
+    select = next(s for s in statements if "FROM workouts" in s)
+    assert "notes" not in select and "duration_minutes" not in select
+    # No relationship loaders at all
+    assert not any("workout_exercises" in s for s in statements if s.startswith("SELECT"))
+
+    detail = client.get("/workouts/1?fields=id,notes").get_json()
+    assert detail == {"id": 1, "notes": "Morning strength training"}
+
+
+def test_expand_embeds_relationships(client, count_queries):
+    rows = client.get("/exercises?expand=").get_json()
+    assert rows[0] == {"id": 1, "name": "Push Up", "category": "Strength", "equipment_needed": False}
+
+    with count_queries() as statements:
+        detail = client.get("/exercises/1?fields=name&expand=workouts").get_json()
+    assert set(detail) == {"name", "workouts"} and [w["id"] for w in detail["workouts"]] == [1]
+    assert detail["workouts"] == client.get("/exercises/1").get_json()["workouts"]
+    assert len(statements) <= 4
+
+    workout = client.get("/workouts/1?expand=exercises").get_json()
+    assert workout == client.get("/workouts/1").get_json()
+    assert [e["exercise_id"] for e in workout["exercises"]] == [1, 2]
+
+
+def test_paging_and_streaming_keep_the_selection(client):
+    resp = client.get("/workouts?fields=duration_minutes&order=date&limit=1")
+    assert resp.get_json() == [{"duration_minutes": 45}]
+    resp = client.get("/workouts?fields=duration_minutes&order=date&limit=1&cursor=" + resp.headers["X-Next-Cursor"])
+    assert resp.get_json() == [{"duration_minutes": 30}]
+    assert client.get("/exercises?fields=name&stream=1").data.decode().splitlines()[0] == '{"name":"Push Up"}'
+
+
+def test_schema_variants_are_cached():
+    selector = FieldSelector(WorkoutSchema, ("exercises",))
+    only = selector.parse({"fields": "id,date"})
+    assert selector.parse({"fields": "date, id"}) == only
+    assert selector.schema(only) is selector.schema(selector.parse({"fields": "date,id"}))
+    assert selector.schema(only, many=True) is not selector.schema(only)
+    assert selector.schema(only).dump({"id": 1, "date": None, "notes": "x"}) == {"id": 1, "date": None}
+
+
+@pytest.mark.parametrize("query", ["fields=id,bogus", "expand=notes", "expand=workouts"])
+def test_unknown_fields_are_rejected(client, query):
+    resp = client.get(f"/workouts?{query}")
+    assert resp.status_code == 400 and "error" in resp.get_json()
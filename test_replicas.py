@@ -0,0 +1,151 @@
+import shutil
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from conftest import seed
+from server.app import create_app
+from server.models import db
+from server.replicas import STICKY_COOKIE, reads_from_replica, replica_urls
+
+
+@pytest.fixture
+def replicated(tmp_path):
+    """App whose reads go to a read-only connection to its own file."""
+    path = tmp_path / "primary.db"
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+        "SQLALCHEMY_REPLICA_URIS": f"sqlite:///file:{path}?mode=ro&uri=true",
+    })
+    with app.app_context():
+        db.create_all()
+        seed(db.session)
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+        app.extensions["read_replicas"].dispose()
+
+
+@pytest.fixture
+def stale_replica(tmp_path):
+    """App whose replica is a copy of the database, taken before any writes."""
+    primary, copy = tmp_path / "primary.db", tmp_path / "replica.db"
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{primary}",
+        "SQLALCHEMY_REPLICA_URIS": f"sqlite:///file:{copy}?mode=ro&uri=true",
+    })
+    with app.app_context():
+        db.create_all()
+        seed(db.session)
+        db.session.remove()
+        db.engine.dispose()
+        shutil.copy(primary, copy)
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+        app.extensions["read_replicas"].dispose()
+
+
+@contextmanager
+def engine_use(app):
+    """Count the statements run on the primary and on the replica.
+
+    The response cache's look at the primary's ``change_versions`` (to
+    tell whether the replica is caught up) is not counted.
+    """
+    used = {"primary": 0, "replica": 0}
+    engines = {"primary": db.engine, "replica": app.extensions["read_replicas"].engines[0]}
+
+    def counter(name):
+        def record(conn, cursor, statement, *args):
+            if not (name == "primary" and "FROM change_versions" in statement):
+                used[name] += 1
+        return record
+
+    listeners = [(engine, counter(name)) for name, engine in engines.items()]
+    for engine, listener in listeners:
+        event.listen(engine, "before_cursor_execute", listener)
+    try:
+        yield used
+    finally:
+        for engine, listener in listeners:
+            event.remove(engine, "before_cursor_execute", listener)
+
+
+def test_policy():
+    assert replica_urls("sqlite:///a.db, sqlite:///b.db,") == ["sqlite:///a.db", "sqlite:///b.db"]
+    assert reads_from_replica("GET")
+    assert not reads_from_replica("POST")
+    assert not reads_from_replica("GET", consistency="Primary")
+    assert not reads_from_replica("GET", sticky_until="105", now=100)
+    assert reads_from_replica("GET", sticky_until="95", now=100)
+    assert reads_from_replica("GET", sticky_until="garbage")
+
+
+@pytest.mark.parametrize("path", [
+    "/exercises", "/exercises/1", "/workouts?order=date", "/workouts/1", "/workouts?stream=1",
+    "/search?q=push", "/export/workouts", "/stats/volume", "/stats/categories",
+    "/stats/top-exercises", "/stats/records",
+])
+def test_reads_use_the_replica(replicated, path):
+    client = replicated.test_client()
+    with engine_use(replicated) as used:
+        resp = client.get(path)
+        resp.get_data()
+    assert resp.status_code == 200
+    assert used["primary"] == 0 and used["replica"] > 0
+
+
+def test_writes_stick_to_the_primary(replicated):
+    client = replicated.test_client()
+    with engine_use(replicated) as used:
+        resp = client.post("/workouts", json={"date": "2025-12-01", "duration_minutes": 15})
+    assert resp.status_code == 201
+    assert used["replica"] == 0
+    assert resp.headers["Set-Cookie"].startswith(STICKY_COOKIE + "=")
+
+    # Read-your-writes: the cookie keeps this client on the primary
+    with engine_use(replicated) as used:
+        assert client.get(f"/workouts/{resp.get_json()['id']}").status_code == 200
+    assert used["replica"] == 0 and used["primary"] > 0
+
+    other = replicated.test_client()
+    with engine_use(replicated) as used:
+        other.get("/workouts/1", headers={"X-Read-Consistency": "primary"})
+    assert used["replica"] == 0
+
+
+def test_asgi_routes_reads_too(replicated):
+    from server.asgi import asgi_app as wrap
+    from test_asgi import call
+
+    asgi_app = wrap(replicated)
+    with engine_use(replicated) as used:
+        status, _, body = call(asgi_app, "GET", "/workouts/1")
+    assert status == 200 and used["primary"] == 0 and used["replica"] > 0
+    assert body == replicated.test_client().get("/workouts/1").data
+
+    with engine_use(replicated) as used:
+        status, headers, _ = call(asgi_app, "POST", "/workouts", {"date": "2025-12-02", "duration_minutes": 5})
+    assert status == 201 and used["replica"] == 0
+    assert headers["set-cookie"].startswith(STICKY_COOKIE + "=")
+
+
+def test_cache_never_keeps_lagging_replica_reads(stale_replica):
+    cache = stale_replica.extensions["response_cache"].backend
+    names = lambda client, **kw: [e["name"] for e in client.get("/exercises?category=Strength", **kw).get_json()]
+    other = stale_replica.test_client()
+    # Caught up: replica reads are cached as usual
+    assert "Lunge" not in names(other)
+    assert len(cache) == 1
+
+    writer = stale_replica.test_client()
+    writer.post("/exercises", json={"name": "Lunge", "category": "Strength"})
+    assert "Lunge" not in names(other)      # the replica lags; that read is not kept
+    assert len(cache) == 1
+    assert "Lunge" in names(writer)
+    assert "Lunge" in names(other, headers={"X-Read-Consistency": "primary"})
+    assert "Lunge" in names(stale_replica.test_client(), headers={"X-Read-Consistency": "primary"})
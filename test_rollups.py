@@ -0,0 +1,136 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import update
+
+from server.app import create_app
+from server.models import db, Exercise, Workout, WorkoutExercise, DailyVolume, WeeklyVolume
+from server.rollups import check_rollups, rebuild_rollups
+from server.stats import raw_category_totals, raw_weekly_volume, weekly_volume
+
+
+@pytest.fixture
+def consistent(app):
+    def check():
+        with app.app_context():
+            assert check_rollups(db.session) == []
+    return check
+
+
+def test_seed_is_rolled_up(app, consistent):
+    consistent()
+    with app.app_context():
+        week = db.session.get(WeeklyVolume, date(2025, 11, 17))
+        assert (week.workouts, week.duration_minutes, week.entries, week.volume) == (2, 75, 3, 105)
+
+
+def test_writes_keep_rollups_consistent(app, client, consistent):
+    w = client.post("/workouts", json={"date": "2025-12-01", "duration_minutes": 20}).get_json()
+    consistent()
+    client.post(f"/workouts/{w['id']}/exercises/1/workout_exercises",
+                json={"reps": 10, "sets": 3, "duration_seconds": 0})
+    consistent()
+    client.post("/workouts:batch", json=[{"date": "2025-12-02", "duration_minutes": 10},
+                                          {"date": "2025-11-22", "duration_minutes": 5}])
+    consistent()
+    client.post(f"/workouts/{w['id']}/workout_exercises:batch",
+                json=[{"exercise_id": 2, "reps": 5, "sets": 5, "duration_seconds": 0}])
+    consistent()
+
+    with app.app_context():
+        assert db.session.get(DailyVolume, date(2025, 12, 1)).volume == 55
+        # Moving a workout refreshes both its old and its new day
+        db.session.get(Workout, w["id"]).date = date(2025, 12, 8)
+        db.session.commit()
+        assert db.session.get(DailyVolume, date(2025, 12, 1)) is None
+        # Recategorising an exercise moves its history between categories
+        db.session.get(Exercise, 1).category = "Mobility"
+        db.session.commit()
+    consistent()
+
+    empty = client.post("/workouts", json={"date": "2025-12-03", "duration_minutes": 5}).get_json()
+    assert client.delete(f"/workouts/{empty['id']}").status_code == 200
+    e = client.post("/exercises", json={"name": "Lunge", "category": "Strength"}).get_json()
+    assert client.delete(f"/exercises/{e['id']}").status_code == 200
+    consistent()
+
+
+def test_rollups_match_raw_aggregates(app, client):
+    client.post("/workouts:batch", json=[{"date": "2025-12-02", "duration_minutes": 10}])
+    with app.app_context():
+        for args in ({}, {"date_from": "2025-11-23"}, {"date_to": "2025-11-22"}):
+            assert weekly_volume(args) == raw_weekly_volume(args)
+            raw = raw_category_totals(args)
+            rolled = client.get("/stats/categories", query_string=args).get_json()
+            assert [list(row) for row in raw] == [
+                [row[k] for k in ("category", "workouts", "entries", "duration_seconds", "volume")]
+                for row in rolled
+            ]
+
+
+def test_set_based_update_rebuilds(app, consistent):
+    with app.app_context():
+        db.session.execute(update(WorkoutExercise).values(sets=10))
+        db.session.commit()
+        assert db.session.get(DailyVolume, date(2025, 11, 22)).sets == 20
+    consistent()
+
+
+def test_check_and_rebuild(app):
+    with app.app_context():
+        db.session.get(DailyVolume, date(2025, 11, 22)).volume = 1
+        db.session.delete(db.session.get(WeeklyVolume, date(2025, 11, 17)))
+        db.session.commit()
+        problems = check_rollups(db.session)
+        assert {(table, key) for table, key, _, _ in problems} == {
+            ("rollup_daily_volume", (date(2025, 11, 22),)),
+            ("rollup_weekly_volume", (date(2025, 11, 17),)),
+        }
+        rebuild_rollups(db.session)
+        db.session.commit()
+        assert check_rollups(db.session) == []
+
+
+def test_cli(app):
+    runner = app.test_cli_runner()
+    with app.app_context():
+        db.session.get(DailyVolume, date(2025, 11, 22)).volume = 1
+        db.session.commit()
+    result = runner.invoke(args=["rollups", "check"])
+    assert result.exit_code == 1 and "rollup_daily_volume" in result.output
+    assert runner.invoke(args=["rollups", "rebuild"]).exit_code == 0
+    result = runner.invoke(args=["rollups", "check"])
+    assert result.exit_code == 0 and "consistent" in result.output
+
+
+def test_disabled_rollups_fall_back_to_raw_tables(app, client):
+    app.config["ROLLUPS_ENABLED"] = False
+    client.post("/workouts", json={"date": "2025-12-01", "duration_minutes": 20})
+    with app.app_context():
+        assert db.session.get(DailyVolume, date(2025, 12, 1)) is None
+    assert client.get("/stats/volume").get_json()[-1]["week_start"] == "2025-12-01"
+
+
+def test_upgrade_rolls_up_existing_rows(tmp_path):
+    from flask_migrate import Migrate, upgrade
+
+    app = create_app({"TESTING": True, "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'old.db'}"})
+    Migrate(app, db)
+    with app.app_context():
+        upgrade(revision="c71e5a9b3d20")     # the last revision without rollups
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("INSERT INTO exercises (id, name, category, equipment_needed) VALUES "
+                                 "(1, 'Squat', 'Strength', 1), (2, 'Row', 'Cardio', 1)")
+            conn.exec_driver_sql("INSERT INTO workouts (id, date, duration_minutes) VALUES "
+                                 "(1, '2025-11-17', 30), (2, '2025-11-19', 15), (3, '2025-11-24', 10)")
+            conn.exec_driver_sql("INSERT INTO workout_exercises (workout_id, exercise_id, reps, sets, duration_seconds) "
+                                 "VALUES (1, 1, 10, 3, NULL), (1, 2, NULL, NULL, 600), (2, 1, 5, 5, NULL)")
+        upgrade()
+
+        assert check_rollups(db.session) == []
+        assert weekly_volume({}) == raw_weekly_volume({})
+        assert [list(row) for row in raw_category_totals({})] == [
+            [row[k] for k in ("category", "workouts", "entries", "duration_seconds", "volume")]
+            for row in app.test_client().get("/stats/categories").get_json()
+        ]
+        db.engine.dispose()
@@ -0,0 +1,73 @@
+from datetime import date
+
+import pytest
+
+from server.models import db, Exercise, Workout
+
+
+def test_search_ranks_across_exercises_and_workouts(client):
+    results = client.get("/search?q=strength").get_json()
+    assert [(r["type"], r["id"]) for r in results] == [("workout", 1)]
+    assert results[0]["text"] == "Morning strength training"
+
+    results = client.get("/search?q=ush").get_json()       # substring, not just prefix
+    assert [(r["type"], r["text"]) for r in results] == [("exercise", "Push Up")]
+
+
+def test_ranking_and_type_filter(app, client):
+    with app.app_context():
+        db.session.add_all([
+            Workout(date=date(2025, 12, 1), duration_minutes=10, notes="squat squat squat"),
+            Workout(date=date(2025, 12, 2), duration_minutes=10, notes="warmup then one squat set and a long cooldown walk"),
+        ])
+        db.session.commit()
+    results = client.get("/search?q=squat").get_json()
+    ranks = [r["rank"] for r in results]
+    assert ranks == sorted(ranks)
+    assert {r["type"] for r in results} == {"exercise", "workout"}
+
+    workouts = client.get("/search?q=squat&type=workout").get_json()
+    assert [r["text"] for r in workouts][0] == "squat squat squat"
+    assert {r["type"] for r in client.get("/search?q=squat&type=exercise").get_json()} == {"exercise"}
+
+
+def test_all_terms_must_match(client):
+    assert len(client.get("/search?q=quick%20cardio").get_json()) == 1
+    assert client.get("/search?q=quick%20strength").get_json() == []
+
+
+def test_index_follows_writes(app, client):
+    e = client.post("/exercises", json={"name": "Kettlebell Swing", "category": "Strength"}).get_json()
+    assert [r["id"] for r in client.get("/search?q=kettle").get_json()] == [e["id"]]
+    with app.app_context():
+        db.session.get(Exercise, e["id"]).name = "Goblet Squat"
+        db.session.commit()
+    assert client.get("/search?q=kettle").get_json() == []
+    client.delete(f"/exercises/{e['id']}")
+    assert client.get("/search?q=goblet").get_json() == []
+
+
+def test_pagination(app, client):
+    with app.app_context():
+        db.session.add_all([
+            Workout(date=date(2025, 12, 1), duration_minutes=10, notes=f"interval run {i}") for i in range(5)
+        ])
+        db.session.commit()
+    seen, cursor = [], None
+    while True:
+        resp = client.get("/search", query_string={"q": "interval", "limit": 2, **({"cursor": cursor} if cursor else {})})
+        seen += [r["id"] for r in resp.get_json()]
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert len(seen) == len(set(seen)) == 5
+
+
+def test_query_syntax_is_not_interpreted(client):
+    assert client.get('/search?q=Push"%20AND%20"xyz').status_code == 200
+    assert client.get("/search?q=NEAR(push").status_code == 200
+
+
+@pytest.mark.parametrize("query", ["", "?q=", "?q=up", "?q=push&type=bogus"])
+def test_bad_queries(client, query):
+    assert client.get("/search" + query).status_code == 400
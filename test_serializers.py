@@ -0,0 +1,68 @@
+from datetime import date
+
+import pytest
+from flask.json.provider import DefaultJSONProvider
+from server.app import create_app
+from server.models import db, Exercise, Workout, WorkoutExercise
+from server.schemas import ExerciseSchema, WorkoutSchema, WorkoutExerciseSchema
+from server.serializers import CompiledSchema, FastJSONProvider
+from conftest import seed
+
+URLS = [
+    "/", "/exercises", "/exercises/1", "/exercises/4", "/workouts", "/workouts/1",
+    "/workouts/2", "/workouts/3", "/workouts?stream=json", "/workouts?stream=1",
+    "/exercises?limit=2", "/workouts/999",
+]
+
+
+def responses(tmp_path, fast):
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / ('fast.db' if fast else 'slow.db')}",
+        "FAST_SERIALIZERS": fast,
+    })
+    with app.app_context():
+        db.create_all()
+        seed(db.session)
+        w = Workout(date=date(2025, 12, 24), duration_minutes=20, notes="Café \"quotes\"\n\ttabs ☃")
+        db.session.add_all([w, Workout(date=date(2025, 12, 25), duration_minutes=5, notes=None)])
+        db.session.flush()
+        db.session.add(WorkoutExercise(workout_id=w.id, exercise_id=5, reps=0, sets=None, duration_seconds=30))
+        db.session.commit()
+        client = app.test_client()
+        result = [(url, client.get(url).data) for url in URLS]
+        db.session.remove()
+        db.engine.dispose()
+    return result
+
+
+def test_fast_path_is_byte_identical(tmp_path):
+    assert responses(tmp_path, fast=True) == responses(tmp_path, fast=False)
+
+
+@pytest.mark.parametrize("schema", [
+    ExerciseSchema(), WorkoutSchema(), WorkoutExerciseSchema(),
+    WorkoutSchema(only=("id", "date")), WorkoutExerciseSchema(exclude=("workout_id",)),
+])
+def test_compiled_dump_matches_marshmallow(app, schema):
+    for model in (Exercise, Workout, WorkoutExercise):
+        for obj in model.query.all():
+            assert CompiledSchema(schema).dump(obj) == schema.dump(obj)
+
+
+def test_compiled_schema_delegates_load(app):
+    schema = CompiledSchema(WorkoutSchema())
+    assert schema.load({"date": "2025-01-01", "duration_minutes": 5})["duration_minutes"] == 5
+    assert schema.dump({"id": 1, "date": date(2025, 1, 1)}) == {"id": 1, "date": "2025-01-01"}
+
+
+@pytest.mark.parametrize("value", [
+    {"b": 1, "a": [True, None, "x"]},
+    {"note": "snow ☃"},
+    {"big": 2 ** 70},
+    {"f": 1e16, "g": 0.1},
+    {"d": date(2025, 1, 2)},
+])
+def test_json_provider_matches_stdlib(app, value):
+    fast = FastJSONProvider(app).response(value).data
+    stdlib = DefaultJSONProvider(app).response(value).data
+    assert fast == stdlib
@@ -0,0 +1,40 @@
+import subprocess
+import sys
+
+# Cumulative `import server.app` time, in microseconds.  Generous enough for
+# a slow CI box; the module checks below catch the usual regressions.
+IMPORT_BUDGET_US = 1_500_000
+
+# Only `flask db`, profiling and debugging need these
+LAZY_MODULES = ("alembic", "flask_migrate", "cProfile", "ipdb", "IPython")
+
+
+def _importtime(code):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_import_budget():
+    times = _importtime("import server.app")
+    assert [name for name in LAZY_MODULES if name in times] == []
+    assert times["server.app"] < IMPORT_BUDGET_US
+
+
+def test_create_app_stays_lean():
+    times = _importtime("from server.app import create_app; create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://'})")
+    assert [name for name in LAZY_MODULES if name in times] == []
+
+
+def test_db_command_loads_flask_migrate(app):
+    result = app.test_cli_runner().invoke(args=["db", "--help"])
+    assert result.exit_code == 0, result.output
+    assert "upgrade" in result.output
+    assert app.extensions["migrate"].directory == "migrations"
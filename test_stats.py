@@ -0,0 +1,93 @@
+from datetime import date
+
+import pytest
+
+from server.models import db, Workout, WorkoutExercise
+from server.stats import iso_week
+
+
+def add_workout(day, minutes, entries):
+    w = Workout(date=day, duration_minutes=minutes)
+    db.session.add(w)
+    db.session.flush()
+    for exercise_id, sets, reps in entries:
+        db.session.add(WorkoutExercise(workout_id=w.id, exercise_id=exercise_id, sets=sets, reps=reps))
+    db.session.commit()
+
+
+def test_iso_week_label():
+    assert iso_week(date(2025, 11, 24)) == "2025-W48"
+    assert iso_week(date(2024, 12, 30)) == "2025-W01"
+
+
+def test_weekly_volume(app, client):
+    with app.app_context():
+        add_workout(date(2025, 11, 24), 40, [(1, 4, 10), (2, 2, 5)])
+        add_workout(date(2025, 11, 30), 20, [(1, 1, 10)])
+
+    weeks = client.get("/stats/volume").get_json()
+    assert weeks == [
+        # Seed: 2025-11-22/23 (Sat/Sun) -> 15x3 + 20x3, the running entry has no sets
+        {"week": "2025-W47", "week_start": "2025-11-17", "workouts": 2,
+         "duration_minutes": 75, "sets": 6, "volume": 105},
+        {"week": "2025-W48", "week_start": "2025-11-24", "workouts": 2,
+         "duration_minutes": 60, "sets": 7, "volume": 60},
+    ]
+
+    filtered = client.get("/stats/volume?date_from=2025-11-24").get_json()
+    assert [w["week"] for w in filtered] == ["2025-W48"]
+
+
+def test_weekly_volume_counts_workouts_without_exercises(app, client):
+    with app.app_context():
+        add_workout(date(2025, 12, 1), 15, [])
+    week = client.get("/stats/volume?date_from=2025-12-01").get_json()
+    assert week == [{"week": "2025-W49", "week_start": "2025-12-01", "workouts": 1,
+                     "duration_minutes": 15, "sets": 0, "volume": 0}]
+
+
+def test_category_totals(client):
+    assert client.get("/stats/categories").get_json() == [
+        {"category": "Cardio", "workouts": 1, "entries": 1, "duration_seconds": 1200, "volume": 0},
+        {"category": "Strength", "workouts": 1, "entries": 2, "duration_seconds": 0, "volume": 105},
+    ]
+
+
+def test_top_exercises_and_limit(app, client):
+    with app.app_context():
+        add_workout(date(2025, 11, 24), 40, [(2, 1, 1)])
+    top = client.get("/stats/top-exercises").get_json()
+    assert [row["name"] for row in top] == ["Squat", "Push Up", "Running"]
+    assert top[0] == {"exercise_id": 2, "name": "Squat", "category": "Strength", "times": 2, "volume": 61}
+    assert len(client.get("/stats/top-exercises?limit=1").get_json()) == 1
+
+
+def test_personal_records(app, client):
+    with app.app_context():
+        add_workout(date(2025, 11, 24), 40, [(1, 5, 12)])
+    records = {r["name"]: r for r in client.get("/stats/records").get_json()}
+    assert records["Push Up"] == {
+        "exercise_id": 1, "name": "Push Up", "max_reps": 15, "max_sets": 5,
+        "max_volume": 60, "max_duration_seconds": None, "last_logged": "2025-11-24",
+    }
+    assert records["Running"]["max_duration_seconds"] == 1200
+
+
+@pytest.mark.parametrize("path", ["/stats/volume?date_from=nope", "/stats/top-exercises?limit=0"])
+def test_bad_params(client, path):
+    assert client.get(path).status_code == 400
+
+
+def test_stats_read_one_rollup_query(client, count_queries):
+    client.get("/stats/categories")     # warm the change_versions lookup path
+    with count_queries() as statements:
+        client.get("/stats/categories?date_to=2025-12-31")
+    grouped = [s for s in statements if "GROUP BY" in s]
+    assert len(grouped) == 1 and "rollup_category_daily_volume" in grouped[0]
+
+
+def test_stats_refresh_after_writes(client):
+    before = client.get("/stats/top-exercises").get_json()
+    client.post("/workouts/2/exercises/5/workout_exercises", json={"reps": 10, "sets": 3, "duration_seconds": 0})
+    after = client.get("/stats/top-exercises").get_json()
+    assert len(after) == len(before) + 1
@@ -0,0 +1,62 @@
+import json
+from datetime import date
+
+from server.loading import eager_options
+from server.models import db, Workout
+from server.schemas import WorkoutSchema
+from server.streaming import stream_response
+
+
+def test_ndjson_by_query_param(client):
+    resp = client.get("/workouts?stream=1")
+    assert resp.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert [r["id"] for r in rows] == [1, 2]
+
+
+def test_ndjson_by_accept_header(client):
+    resp = client.get("/exercises?category=Strength",
+                      headers={"Accept": "application/x-ndjson"})
+    assert resp.mimetype == "application/x-ndjson"
+    lines = resp.get_data(as_text=True).splitlines()
+    assert len(lines) == 4
+    assert all(json.loads(line)["category"] == "Strength" for line in lines)
+
+
+def test_default_accept_is_not_streamed(client):
+    resp = client.get("/exercises", headers={"Accept": "*/*"})
+    assert resp.mimetype == "application/json"
+    assert isinstance(resp.get_json(), list)
+
+
+def test_json_array_stream_matches_paged_body(client):
+    db.session.add_all([
+        Workout(date=date(2025, 1, 1), duration_minutes=10 + i) for i in range(30)
+    ])
+    db.session.commit()
+    paged = client.get("/workouts?limit=1000").data
+    streamed = client.get("/workouts?stream=json").data
+    assert streamed == paged
+
+
+def test_stream_flushes_one_chunk_per_batch(app):
+    with app.test_request_context("/workouts?stream=1"):
+        resp = stream_response(Workout.query, [Workout.id], WorkoutSchema(), "ndjson", batch_size=1)
+        assert resp.is_streamed
+        chunks = list(resp.response)
+    assert len(chunks) == 2
+    assert [json.loads(c)["id"] for c in chunks] == [1, 2]
+
+
+def test_eager_loaded_stream_across_batches(app, count_queries):
+    # Streaming pages by keyset instead of Query.yield_per, which SQLAlchemy
+    # refuses to combine with selectinload under the cache's do_orm_execute hook
+    schema = WorkoutSchema()
+    query = Workout.query.options(*eager_options(Workout, schema))
+    with app.test_request_context("/workouts?stream=1"):
+        with count_queries() as statements:
+            chunks = list(stream_response(query, [Workout.id], schema, "ndjson", batch_size=1).response)
+    rows = [json.loads(c) for c in chunks]
+    assert [[e["id"] for e in r["exercises"]] for r in rows] == [[1, 2], [4]]
+    # One page query and one selectin per batch, never a lazy load per row
+    assert len(statements) <= 2 * len(chunks) + 1
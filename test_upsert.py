@@ -0,0 +1,75 @@
+from sqlalchemy import select
+
+from server.models import db, Exercise, WorkoutExercise
+
+
+def _inserts(statements, table):
+    return [s for s in statements if s.startswith(f"INSERT INTO {table}")]
+
+
+def test_exercise_upsert_update_and_ignore(client, count_queries):
+    with count_queries() as statements:
+        resp = client.post("/exercises?on_conflict=update", json={"name": " Squat ", "category": "Cardio"})
+    assert resp.status_code == 200
+    assert resp.get_json() == {"id": 2, "name": "Squat", "category": "Cardio", "equipment_needed": False}
+    # The clash is resolved by the one INSERT ... ON CONFLICT, with no rollback
+    assert len(_inserts(statements, "exercises")) == 1
+    assert not any(s.startswith("ROLLBACK") for s in statements)
+
+    resp = client.post("/exercises?on_conflict=ignore", json={"name": "Squat", "category": "Strength"})
+    assert resp.status_code == 200
+    assert resp.get_json()["category"] == "Cardio"
+
+    resp = client.post("/exercises?on_conflict=ignore", json={"name": "Lunge", "category": "Strength"})
+    assert resp.status_code == 201
+    resp = client.post("/exercises?on_conflict=update", json={"name": "Rowing", "category": "Cardio"})
+    assert resp.status_code == 201
+    assert client.get("/exercises/2").get_json()["category"] == "Cardio"
+
+
+def test_plain_insert_still_reports_duplicates(client):
+    assert client.post("/exercises", json={"name": "Squat", "category": "Strength"}).status_code == 400
+    assert client.post("/exercises?on_conflict=merge", json={"name": "Squat", "category": "Strength"}).status_code == 400
+
+
+def test_workout_exercise_upsert(app, client):
+    url = "/workouts/1/exercises/1/workout_exercises?on_conflict=update"
+    resp = client.post(url, json={"reps": 12, "sets": 4, "duration_seconds": 0})
+    assert resp.status_code == 200
+    assert resp.get_json()["id"] == 1 and resp.get_json()["reps"] == 12
+
+    rows = db.session.scalars(select(WorkoutExercise).where(WorkoutExercise.workout_id == 1)).all()
+    assert {(r.exercise_id, r.reps, r.sets) for r in rows} == {(1, 12, 4), (2, 20, 3)}
+    # Cached reads and rollups see the update
+    assert client.get("/stats/volume").get_json()[0]["volume"] == 12 * 4 + 20 * 3
+
+
+def test_idempotency_key_replays_response(client, count_queries):
+    headers = {"Idempotency-Key": "retry-1"}
+    first = client.post("/exercises", json={"name": "Lunge", "category": "Strength"}, headers=headers)
+    assert first.status_code == 201
+
+    with count_queries() as statements:
+        retry = client.post("/exercises", json={"name": "Lunge", "category": "Strength"}, headers=headers)
+    assert statements == []
+    assert retry.status_code == 201 and retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.get_json() == first.get_json()
+    assert len(db.session.scalars(select(Exercise).where(Exercise.name == "Lunge")).all()) == 1
+
+    reused = client.post("/exercises", json={"name": "Lunges", "category": "Strength"}, headers=headers)
+    assert reused.status_code == 422
+    # Keys are scoped to the route
+    other = client.post("/workouts", json={"date": "2025-12-01", "duration_minutes": 10}, headers=headers)
+    assert other.status_code == 201
+    # ... and to the query string
+    body, headers = {"name": "Squat", "category": "Cardio"}, {"Idempotency-Key": "retry-2"}
+    assert client.post("/exercises?on_conflict=ignore", json=body, headers=headers).get_json()["category"] != "Cardio"
+    updated = client.post("/exercises?on_conflict=update", json=body, headers=headers)
+    assert "Idempotent-Replayed" not in updated.headers and updated.get_json()["category"] == "Cardio"
+
+
+def test_idempotency_store_is_bounded(app, client):
+    app.extensions["idempotency"].backend.max_entries = 2
+    for i in range(3):
+        client.post("/workouts", json={"date": "2025-12-01", "duration_minutes": 10}, headers={"Idempotency-Key": str(i)})
+    assert len(app.extensions["idempotency"].backend) == 2
@@ -0,0 +1,150 @@
+import json
+import time
+
+import pytest
+
+from server.app import create_app
+from server.models import db, WorkoutExercise
+from server.writebehind import Spool, WriteBehind
+
+ENTRY = {"reps": 8, "sets": 4, "duration_seconds": 0}
+
+
+@pytest.fixture
+def writes(app):
+    writes = app.extensions["write_behind"]
+    writes.enabled = True
+    yield writes
+    writes.close()
+
+
+def _post(client, workout_id, exercise_id):
+    return client.post(f"/workouts/{workout_id}/exercises/{exercise_id}/workout_exercises", json=ENTRY)
+
+
+def test_queued_rows_are_committed(client, writes):
+    resp = _post(client, 1, 3)
+    assert resp.status_code == 202
+    tracking_id = resp.get_json()["tracking_id"]
+    assert resp.headers["Location"] == f"/writes/{tracking_id}"
+
+    assert writes.flush(timeout=5)
+    status = client.get(f"/writes/{tracking_id}").get_json()
+    assert status["status"] == "committed"
+    entry = db.session.get(WorkoutExercise, status["id"])
+    assert (entry.workout_id, entry.exercise_id, entry.reps) == (1, 3, 8)
+    assert client.get("/writes/unknown").status_code == 404
+
+
+def test_validation_and_conflicts(client, writes):
+    assert client.post("/workouts/1/exercises/3/workout_exercises", json={"reps": -1}).status_code == 400
+    assert _post(client, 99, 3).status_code == 404
+
+    ids = [_post(client, 2, 5).get_json()["tracking_id"] for _ in range(2)]
+    ids.append(_post(client, 1, 1).get_json()["tracking_id"])
+    assert writes.flush(timeout=5)
+    statuses = [client.get(f"/writes/{id}").get_json()["status"] for id in ids]
+    assert statuses == ["committed", "failed", "failed"]
+    assert db.session.query(WorkoutExercise).filter_by(workout_id=2, exercise_id=5).count() == 1
+
+    # Upserts keep writing through
+    resp = client.post("/workouts/2/exercises/5/workout_exercises?on_conflict=update", json=ENTRY)
+    assert resp.status_code in (200, 201)
+
+
+def test_full_queue_sheds_load(client, writes, monkeypatch):
+    monkeypatch.setattr(writes, "_start", lambda: None)
+    monkeypatch.setattr(writes._queue, "maxsize", 1)
+    assert _post(client, 1, 3).status_code == 202
+    resp = _post(client, 1, 4)
+    assert resp.status_code == 503 and resp.headers["Retry-After"] == "1"
+    writes._queue.get_nowait()
+    writes._queue.task_done()
+
+
+def test_spool_replays_unfinished_rows(app, client, writes, tmp_path):
+    path = tmp_path / "writes.spool"
+    path.write_text("\n".join([
+        json.dumps({"id": "a", "values": {"workout_id": 2, "exercise_id": 1, **ENTRY}}),
+        json.dumps({"id": "b", "values": {"workout_id": 2, "exercise_id": 2, **ENTRY}}),
+        json.dumps({"done": ["b"]}),
+        '{"id": "c", "val',
+    ]) + "\n")
+    app.config["WRITE_BEHIND_SPOOL"] = str(path)
+
+    tracking_id = _post(client, 2, 3).get_json()["tracking_id"]
+    assert writes.flush(timeout=5)
+    assert client.get("/writes/a").get_json()["status"] == "committed"
+    assert client.get("/writes/b").status_code == 404
+    assert client.get(f"/writes/{tracking_id}").get_json()["status"] == "committed"
+    exercises = db.session.query(WorkoutExercise.exercise_id).filter_by(workout_id=2).all()
+    assert sorted(e for e, in exercises) == [1, 3, 4]
+    assert path.read_text() == ""
+
+    # A second process on the same path gets its own file
+    other = Spool(str(path))
+    assert other.path == f"{path}.1"
+    other.close()
+
+
+def test_spool_is_replayed_on_startup(app, tmp_path):
+    path = tmp_path / "writes.spool"
+    row = lambda id, exercise: json.dumps({"id": id, "values": {"workout_id": 2, "exercise_id": exercise, **ENTRY}})
+    path.write_text(row("a", 1) + "\n")
+    # A crashed worker's slot is adopted; a live worker's is left alone
+    (tmp_path / "writes.spool.2").write_text(row("b", 2) + "\n")
+    live = Spool(str(tmp_path / "writes.spool.1"))
+    live.append("c", {"workout_id": 2, "exercise_id": 3, **ENTRY})
+
+    worker = create_app({**app.config, "WRITE_BEHIND": True, "WRITE_BEHIND_SPOOL": str(path)})
+    writes = worker.extensions["write_behind"]
+    try:
+        assert writes.flush(timeout=5)
+        assert [writes.status(id)["status"] for id in "ab"] == ["committed", "committed"]
+        assert writes.status("c") is None
+        exercises = db.session.query(WorkoutExercise.exercise_id).filter_by(workout_id=2).all()
+        assert sorted(e for e, in exercises) == [1, 2, 4]
+        assert (tmp_path / "writes.spool.2").read_text() == ""
+        assert '"c"' in (tmp_path / "writes.spool.1").read_text()
+    finally:
+        writes.close()
+        live.close()
+
+
+def test_spool_outlives_a_slow_replay(app, tmp_path, monkeypatch):
+    path = tmp_path / "writes.spool"
+    pairs = [(w, e) for w in range(1, 4) for e in range(1, 5)]
+    path.write_text("".join(
+        json.dumps({"id": f"r{i}", "values": {"workout_id": w, "exercise_id": e, **ENTRY}}) + "\n"
+        for i, (w, e) in enumerate(pairs)
+    ))
+    # Replayed rows trickle in, so the writer drains the queue several times
+    # before the last one is queued; the spool must keep them until then
+    record = WriteBehind._record
+    replayed_by = []
+
+    def slow_record(self, tracking_id, status, **fields):
+        if status == "queued":
+            replayed_by[:] = [self]
+            time.sleep(0.02)
+        record(self, tracking_id, status, **fields)
+
+    truncated_with = []
+    truncate = Spool.truncate
+
+    def checked_truncate(self):
+        truncated_with.append([replayed_by[0].status(f"r{i}") for i in range(len(pairs))])
+        truncate(self)
+
+    monkeypatch.setattr(WriteBehind, "_record", slow_record)
+    monkeypatch.setattr(Spool, "truncate", checked_truncate)
+    worker = create_app({**app.config, "WRITE_BEHIND": True, "WRITE_BEHIND_SPOOL": str(path),
+                         "WRITE_BEHIND_BATCH_ROWS": 2, "WRITE_BEHIND_INTERVAL_MS": 1})
+    writes = worker.extensions["write_behind"]
+    try:
+        assert writes.flush(timeout=5)
+        assert truncated_with
+        for statuses in truncated_with:
+            assert all(s is not None and s["status"] != "queued" for s in statuses)
+    finally:
+        writes.close()